@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.services.payload_cache import bump_price_version
+from dashboard.services.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute PortfolioDailyRollup rows from PortfolioSnapshot (backfill or after manual snapshot edits)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            help='Only rebuild this user',
+        )
+
+    def handle(self, *args, **options):
+        user_ids = [options['user_id']] if options['user_id'] else None
+        rows = refresh_rollups(user_ids)
+        bump_price_version()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} rollup rows'))
@@ -1,39 +1,53 @@
 # dashboard/management/commands/sync_holdings.py
-from django.core.management.base import BaseCommand
-from django.db import transaction
-from journals.models import StockTrade
-from dashboard.models import PortfolioHolding, PortfolioSnapshot
-from dashboard.views.services import process_trade_for_portfolio
+import time
+from datetime import datetime
 
-class Command(BaseCommand):
-    help = 'Rebuilds the entire portfolio history (holdings and snapshots) from trades.'
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 
-    @transaction.atomic
-    def handle(self, *args, **options):
-        self.stdout.write('Rebuilding portfolio data from scratch...')
+from dashboard.services.holdings import rebuild_stock_holdings
 
-        # 1. Clear existing portfolio data
-        self.stdout.write('Deleting existing PortfolioHolding and PortfolioSnapshot data...')
-        deleted_snapshots, _ = PortfolioSnapshot.objects.all().delete()
-        deleted_holdings, _ = PortfolioHolding.objects.all().delete()
-        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted_snapshots} snapshots and {deleted_holdings} holdings.'))
 
-        # 2. Get all trades in chronological order
-        trades = StockTrade.objects.order_by('trade_date', 'created_at').values_list('id', flat=True)
-        total_trades = len(trades)
+class Command(BaseCommand):
+    help = 'Rebuilds portfolio holdings by replaying trades per (user, ticker) and marks the daily timeseries for recomputation.'
 
-        if total_trades == 0:
-            self.stdout.write(self.style.SUCCESS('No trades found to process.'))
-            return
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Only replay positions whose journal or trades changed at/after this '
+                 'ISO date or datetime (e.g. the "Watermark" printed by the previous run)',
+        )
 
-        self.stdout.write(f'Found {total_trades} trades to process.')
+    def handle(self, *args, **options):
+        since = self.parse_since(options['since'])
+        watermark = timezone.now()
+        started = time.perf_counter()
 
-        # 3. Process each trade
-        for i, trade_id in enumerate(trades):
-            self.stdout.write(f'Processing trade {i + 1}/{total_trades} (ID: {trade_id})...')
-            try:
-                process_trade_for_portfolio(trade_id)
-            except Exception as e:
-                self.stderr.write(self.style.ERROR(f'Error processing trade {trade_id}: {e}'))
+        if since is None:
+            self.stdout.write('Rebuilding portfolio data from scratch...')
+        else:
+            self.stdout.write(f'Replaying positions changed since {since.isoformat()}...')
 
-        self.stdout.write(self.style.SUCCESS('Successfully rebuilt all portfolio data.'))
\ No newline at end of file
+        positions = rebuild_stock_holdings(since=since)
+        if positions == 0:
+            self.stdout.write(self.style.SUCCESS('No trades found to process.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Rebuilt {positions} holdings '
+                f'in {time.perf_counter() - started:.2f}s.'
+            ))
+        self.stdout.write(f'Watermark: {watermark.isoformat()}')
+
+    def parse_since(self, value):
+        if not value:
+            return None
+        since = parse_datetime(value)
+        if since is None:
+            day = parse_date(value)
+            if day is None:
+                raise CommandError(f'Invalid --since value: {value}')
+            since = datetime.combine(day, datetime.min.time())
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
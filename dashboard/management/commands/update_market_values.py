@@ -1,15 +1,16 @@
+import time
+
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from decimal import Decimal
-import yfinance as yf
-import FinanceDataReader as fdr
-from datetime import date
 
-from dashboard.models import PortfolioHolding, PortfolioSnapshot
+from dashboard.models import PortfolioHolding
+from dashboard.services.payload_cache import bump_price_version
+from dashboard.services.prices import get_latest_closes
+from dashboard.services.timeseries import refresh_today_snapshots
 
 
 class Command(BaseCommand):
-    help = 'Update market values for all portfolio holdings and create snapshots'
+    help = 'Refresh closing prices for all stock holdings and recompute today\'s portfolio snapshots'
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -17,114 +18,84 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be updated without making changes',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Number of concurrent price fetches (default: 4)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=200,
+            help='Tickers per price request (default: 200)',
+        )
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
-        
+        workers = max(1, options['workers'])
+        chunk_size = max(1, options['chunk_size'])
+        verbose = options['verbosity'] > 1
+
         if dry_run:
             self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
-        
-        # 모든 보유 자산 조회
-        holdings = PortfolioHolding.objects.all()
-        
-        if not holdings.exists():
+
+        # 주식 보유 자산만 조회 (부동산 시세 API 가 없으므로 계약가 기준 스냅샷을 덮어쓰지 않음)
+        # TODO: 실제 부동산 가격 API 연동
+        started = time.perf_counter()
+        holdings = list(PortfolioHolding.objects.filter(asset_type='stock'))
+
+        if not holdings:
             self.stdout.write(self.style.WARNING('No portfolio holdings found'))
             return
-        
-        updated_count = 0
+
+        # 보유자 수와 무관하게 티커별로 한 번만 조회
+        tickers = {
+            h.stock_ticker_symbol for h in holdings
+            if h.stock_ticker_symbol
+        }
+        prices = self.get_current_prices(tickers, workers, chunk_size)
+        fetched = time.perf_counter()
+
         error_count = 0
-        
-        for holding in holdings:
+        for ticker in sorted(tickers):
+            current_price = prices.get(ticker)
+            if current_price is None:
+                self.stdout.write(self.style.ERROR(f'Could not get price for {ticker}'))
+                error_count += 1
+            elif verbose:
+                self.stdout.write(f'{ticker}: Price={current_price}')
+
+        user_ids = {h.user_id for h in holdings}
+        snapshot_count = 0
+        if not dry_run:
+            # 스냅샷은 시계열 엔진만 씀 - 보유자 전체의 당일분을 새 종가로 일괄 재계산
             try:
-                current_price = self.get_current_price(holding)
-                if current_price is None:
-                    self.stdout.write(
-                        self.style.ERROR(f'Could not get price for {holding.asset_key}')
-                    )
-                    error_count += 1
-                    continue
-                
-                # market_value 계산
-                market_value = holding.total_quantity * current_price
-                
-                if not dry_run:
-                    # PortfolioSnapshot에 저장
-                    snapshot, created = PortfolioSnapshot.objects.get_or_create(
-                        user_id=holding.user_id,
-                        snapshot_date=timezone.now().date(),
-                        asset_key=holding.asset_key,
-                        defaults={
-                            'asset_type': holding.asset_type,
-                            'stock_ticker_symbol': holding.stock_ticker_symbol,
-                            'property_info_id': holding.property_info_id,
-                            'quantity': holding.total_quantity,
-                            'avg_buy_price': holding.avg_buy_price,
-                            'invested_amount': holding.invested_amount,
-                            'market_price': current_price,
-                            'market_value': market_value,
-                            'currency_code': holding.currency_code,
-                        }
-                    )
-                    
-                    if not created:
-                        # 기존 스냅샷 업데이트
-                        snapshot.market_price = current_price
-                        snapshot.market_value = market_value
-                        snapshot.save()
-                
-                self.stdout.write(
-                    f'{"[DRY RUN] " if dry_run else ""}Updated {holding.asset_key}: '
-                    f'Price={current_price}, Value={market_value}'
-                )
-                updated_count += 1
-                
+                snapshot_count = refresh_today_snapshots(user_ids, today=timezone.localdate())
             except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(f'Error updating {holding.asset_key}: {str(e)}')
-                )
+                self.stdout.write(self.style.ERROR(f'Error updating snapshots: {e}'))
                 error_count += 1
-        
+            bump_price_version()
+        finished = time.perf_counter()
+
+        self.stdout.write(
+            f'{len(holdings)} holdings, {len(tickers)} distinct tickers: '
+            f'prices {fetched - started:.2f}s, snapshots {finished - fetched:.2f}s, '
+            f'total {finished - started:.2f}s'
+        )
         self.stdout.write(
             self.style.SUCCESS(
-                f'{"[DRY RUN] " if dry_run else ""}Completed: {updated_count} updated, {error_count} errors'
+                f'{"[DRY RUN] " if dry_run else ""}Completed: {snapshot_count} snapshots for '
+                f'{len(user_ids)} users, {error_count} errors'
             )
         )
 
-    def get_current_price(self, holding):
-        """자산 유형에 따라 현재 가격을 조회합니다."""
+    def get_current_prices(self, tickers, workers, chunk_size):
+        """티커별 최신 종가를 로컬 일봉 저장소에서 일괄 조회합니다."""
         try:
-            if holding.asset_type == 'stock':
-                if holding.stock_ticker_symbol:
-                    # 한국 주식 (KOSPI/KOSDAQ)
-                    if holding.stock_ticker_symbol.endswith('.KS') or holding.stock_ticker_symbol.endswith('.KQ'):
-                        ticker = holding.stock_ticker_symbol
-                    else:
-                        # .KS 추가 (KOSPI)
-                        ticker = f"{holding.stock_ticker_symbol}.KS"
-                    
-                    try:
-                        # FinanceDataReader로 한국 주식 가격 조회
-                        df = fdr.DataReader(ticker, date.today())
-                        if not df.empty:
-                            return Decimal(str(df['Close'].iloc[-1]))
-                    except:
-                        pass
-                    
-                    # yfinance로 시도
-                    ticker_obj = yf.Ticker(holding.stock_ticker_symbol)
-                    hist = ticker_obj.history(period='1d')
-                    if not hist.empty:
-                        return Decimal(str(hist['Close'].iloc[-1]))
-                
-            elif holding.asset_type == 'real_estate':
-                # 부동산 가격은 별도 API 필요 (현재는 임시값)
-                # TODO: 실제 부동산 가격 API 연동
-                return Decimal('1000000')  # 임시값
-            
-            return None
-            
+            return get_latest_closes(tickers, workers=workers, chunk_size=chunk_size)
         except Exception as e:
             self.stdout.write(
-                self.style.ERROR(f'Error fetching price for {holding.asset_key}: {str(e)}')
+                self.style.ERROR(f'Error fetching prices: {str(e)}')
             )
-            return None
+            return {}
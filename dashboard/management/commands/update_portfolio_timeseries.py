@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.services.timeseries import update_user_timeseries
+from journals.models import REDeal, StockTrade
+
+
+class Command(BaseCommand):
+    help = 'Append daily portfolio valuation snapshots since the last run for each user'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            help='Only update this user',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Recompute the whole history instead of only the new days',
+        )
+
+    def handle(self, *args, **options):
+        if options['user_id']:
+            user_ids = [options['user_id']]
+        else:
+            user_ids = sorted(
+                set(StockTrade.objects.values_list('user_id', flat=True).distinct())
+                | set(REDeal.objects.values_list('user_id', flat=True).distinct())
+            )
+
+        total_rows = 0
+        for user_id in user_ids:
+            try:
+                rows = update_user_timeseries(user_id, force=options['force'])
+                total_rows += rows
+                self.stdout.write(f'User {user_id}: {rows} snapshot rows written')
+            except Exception as e:
+                self.stderr.write(self.style.ERROR(f'Error updating timeseries for user {user_id}: {e}'))
+
+        self.stdout.write(self.style.SUCCESS(f'Completed: {len(user_ids)} users, {total_rows} rows'))
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_portfoliotimeseriesstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyPriceCoverage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticker', models.CharField(max_length=20, unique=True)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('fetched_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyPrice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticker', models.CharField(max_length=20)),
+                ('date', models.DateField()),
+                ('open', models.DecimalField(blank=True, decimal_places=6, max_digits=20, null=True)),
+                ('high', models.DecimalField(blank=True, decimal_places=6, max_digits=20, null=True)),
+                ('low', models.DecimalField(blank=True, decimal_places=6, max_digits=20, null=True)),
+                ('close', models.DecimalField(decimal_places=6, max_digits=20)),
+                ('volume', models.BigIntegerField(blank=True, null=True)),
+                ('source', models.CharField(default='yfinance', max_length=10)),
+            ],
+            options={
+                'ordering': ['ticker', 'date'],
+                'unique_together': {('ticker', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0003_dailyprice'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PortfolioDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.BigIntegerField()),
+                ('snapshot_date', models.DateField()),
+                ('asset_type', models.CharField(max_length=20)),
+                ('market_value', models.DecimalField(decimal_places=6, default=0, max_digits=24)),
+                ('invested_amount', models.DecimalField(decimal_places=6, default=0, max_digits=24)),
+                ('market_value_krw', models.DecimalField(decimal_places=6, default=0, max_digits=24)),
+                ('invested_amount_krw', models.DecimalField(decimal_places=6, default=0, max_digits=24)),
+                ('asset_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('user_id', 'snapshot_date', 'asset_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:47
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def rebuild_rollups(apps, schema_editor):
+    # 기존 행은 통화가 섞인 합계라서 통화별로 다시 집계
+    PortfolioSnapshot = apps.get_model('dashboard', 'PortfolioSnapshot')
+    PortfolioDailyRollup = apps.get_model('dashboard', 'PortfolioDailyRollup')
+    PortfolioDailyRollup.objects.all().delete()
+    rows = (
+        PortfolioSnapshot.objects.order_by()
+        .values('user_id', 'snapshot_date', 'asset_type', 'currency_code')
+        .annotate(total_value=Sum('market_value'), total_invested=Sum('invested_amount'), assets=Count('id'))
+    )
+    PortfolioDailyRollup.objects.bulk_create(
+        [
+            PortfolioDailyRollup(
+                user_id=row['user_id'], snapshot_date=row['snapshot_date'], asset_type=row['asset_type'],
+                currency_code=row['currency_code'],
+                market_value=row['total_value'] or Decimal('0'),
+                invested_amount=row['total_invested'] or Decimal('0'),
+                asset_count=row['assets'],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0004_portfoliodailyrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='portfoliodailyrollup',
+            name='currency_code',
+            field=models.CharField(default='KRW', max_length=3),
+        ),
+        migrations.RemoveField(
+            model_name='portfoliodailyrollup',
+            name='invested_amount_krw',
+        ),
+        migrations.RemoveField(
+            model_name='portfoliodailyrollup',
+            name='market_value_krw',
+        ),
+        migrations.AlterUniqueTogether(
+            name='portfoliodailyrollup',
+            unique_together={('user_id', 'snapshot_date', 'asset_type', 'currency_code')},
+        ),
+        migrations.RunPython(rebuild_rollups, migrations.RunPython.noop),
+    ]
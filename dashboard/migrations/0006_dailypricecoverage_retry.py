@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0005_portfoliodailyrollup_currency'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailypricecoverage',
+            name='retry_after',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dailypricecoverage',
+            name='retry_end',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dailypricecoverage',
+            name='retry_start',
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
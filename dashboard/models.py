@@ -67,7 +67,16 @@ class PortfolioHolding(models.Model):
             self.asset_key = f"re:{self.property_info_id}"
         else:
             raise ValueError("stock_ticker_symbol 또는 property_info_id 중 하나만 입력하세요.")
-        return super().save(*a, **kw)
+        result = super().save(*a, **kw)
+        from dashboard.services.payload_cache import bump_dashboard_version
+        bump_dashboard_version(self.user_id)
+        return result
+
+    def delete(self, *a, **kw):
+        result = super().delete(*a, **kw)
+        from dashboard.services.payload_cache import bump_dashboard_version
+        bump_dashboard_version(self.user_id)
+        return result
 
     class Meta:
         unique_together = [("user_id", "asset_key")]
@@ -138,4 +147,62 @@ class PortfolioSnapshot(models.Model):
                       Q(stock_ticker_symbol__isnull=True,  property_info_id__isnull=False),
                 name="chk_snap_poly_exactly_one_key",
             ),
-        ]
\ No newline at end of file
+        ]
+
+class PortfolioDailyRollup(models.Model):
+    """(user, 날짜, 자산 유형, 통화) 별 스냅샷 합계 - 시계열 엔진이 스냅샷을 쓸 때 refresh_rollups 로 갱신
+
+    금액은 해당 통화 그대로 저장하고 원화 환산은 조회 시점 환율로 한 번에 한다
+    (재계산해도 과거 행이 바뀌지 않고, 한 번의 조회 안에서는 모든 날짜가 같은 환율을 씀).
+    """
+    user_id = models.BigIntegerField()
+    snapshot_date = models.DateField()
+    asset_type = models.CharField(max_length=20)
+    currency_code = models.CharField(max_length=3, default="KRW")
+
+    market_value = models.DecimalField(max_digits=24, decimal_places=6, default=0)
+    invested_amount = models.DecimalField(max_digits=24, decimal_places=6, default=0)
+    asset_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # 유니크 인덱스가 (user_id, snapshot_date) 범위 조회도 처리
+        unique_together = [("user_id", "snapshot_date", "asset_type", "currency_code")]
+
+
+class PortfolioTimeseriesState(models.Model):
+    """사용자별 일별 평가 시계열 계산 진행 상황 (증분 계산 워터마크)"""
+    user_id = models.BigIntegerField(unique=True)
+    # 이 날짜까지의 스냅샷은 확정 (당일은 장중 가격이 바뀌므로 항상 재계산)
+    computed_through = models.DateField(null=True, blank=True)
+    # 마지막 계산 시각 (None 이면 다음 조회 때 즉시 재계산)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class DailyPrice(models.Model):
+    """티커별 일봉 (yfinance / FinanceDataReader 로컬 캐시)"""
+    ticker = models.CharField(max_length=20)
+    date = models.DateField()
+    open = models.DecimalField(max_digits=20, decimal_places=6, null=True, blank=True)
+    high = models.DecimalField(max_digits=20, decimal_places=6, null=True, blank=True)
+    low = models.DecimalField(max_digits=20, decimal_places=6, null=True, blank=True)
+    close = models.DecimalField(max_digits=20, decimal_places=6)
+    volume = models.BigIntegerField(null=True, blank=True)
+    source = models.CharField(max_length=10, default="yfinance")  # 'yfinance' | 'fdr'
+
+    class Meta:
+        unique_together = [("ticker", "date")]
+        ordering = ["ticker", "date"]
+
+
+class DailyPriceCoverage(models.Model):
+    """티커별로 업스트림에서 이미 조회한 날짜 구간 (휴장일 재조회 방지)"""
+    ticker = models.CharField(max_length=20, unique=True)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    fetched_at = models.DateTimeField()
+    # 빈 결과로 기록된 구간 (일시적 실패일 수 있으므로 retry_after 이후 한 번 더 확인)
+    retry_start = models.DateField(null=True, blank=True)
+    retry_end = models.DateField(null=True, blank=True)
+    retry_after = models.DateTimeField(null=True, blank=True)
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import threading
+import time
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Optional
+
+from django.conf import settings
+
+from dashboard.services.http import yfinance_session
+
+__all__ = [
+    "FxRateProvider",
+    "fx_rates",
+]
+
+
+# 원화 기준 환율 심볼 (yfinance)
+FX_SYMBOLS = {
+    "USD": "USDKRW=X",
+    "JPY": "JPYKRW=X",
+    "EUR": "EURKRW=X",
+    "CNY": "CNYKRW=X",
+}
+
+# 조회 실패 시 사용하는 기본 환율
+FALLBACK_RATES = {
+    "USD": Decimal("1300"),
+    "JPY": Decimal("9"),
+    "EUR": Decimal("1450"),
+    "CNY": Decimal("180"),
+}
+
+
+def fetch_krw_rates(currencies: Iterable[str]) -> Dict[str, Decimal]:
+    """yfinance에서 통화별 원화 환율을 한 번의 요청으로 조회"""
+    import yfinance as yf
+
+    symbols = {code: FX_SYMBOLS[code] for code in currencies if code in FX_SYMBOLS}
+    if not symbols:
+        return {}
+
+    data = yf.download(
+        list(symbols.values()),
+        period="5d",
+        progress=False,
+        auto_adjust=False,
+        threads=False,
+        session=yfinance_session(),
+    )
+    if data is None or data.empty:
+        return {}
+
+    closes = data["Close"].ffill()
+    rates = {}
+    for code, symbol in symbols.items():
+        column = closes[symbol] if symbol in closes else None
+        if column is None or column.dropna().empty:
+            continue
+        rates[code] = Decimal(str(float(column.dropna().iloc[-1])))
+    return rates
+
+
+class FxRateProvider:
+    """프로세스 공용 환율 캐시 (TTL + stale-while-revalidate)
+
+    - TTL 이내: 메모리 값 반환 (hit)
+    - TTL 경과 ~ max_stale 이내: 기존 값을 반환하고 백그라운드에서 갱신
+    - 값이 없거나 max_stale 초과: 동기 조회 (miss)
+    - 조회 실패: 기존 값(없으면 기본 환율)을 쓰되 신선한 값으로 기록하지 않고 retry_after 초 뒤 재시도
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        max_stale: Optional[float] = None,
+        fetcher: Optional[Callable[[Iterable[str]], Dict[str, Decimal]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        retry_after: Optional[float] = None,
+    ):
+        self.ttl = ttl if ttl is not None else getattr(settings, "FX_RATE_TTL_SECONDS", 600)
+        self.max_stale = max_stale if max_stale is not None else getattr(settings, "FX_RATE_MAX_STALE_SECONDS", 6 * 3600)
+        self.fetcher = fetcher or fetch_krw_rates
+        self.clock = clock
+        self.retry_after = retry_after if retry_after is not None else getattr(settings, "FX_RATE_RETRY_SECONDS", 60)
+
+        self._rates: Dict[str, Decimal] = {}
+        self._fetched_at: Optional[float] = None
+        # 조회 실패 후 이 시각까지는 다시 조회하지 않음
+        self._retry_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "fetches": 0, "errors": 0}
+
+    @property
+    def currencies(self):
+        return tuple(FX_SYMBOLS)
+
+    def get_rate(self, currency_code: str) -> Decimal:
+        """통화 코드 -> 원화 환율 (KRW는 1)"""
+        code = (currency_code or "KRW").upper()
+        if code == "KRW":
+            return Decimal("1")
+        return self.get_rates().get(code, FALLBACK_RATES.get(code, Decimal("1")))
+
+    def get_rates(self) -> Dict[str, Decimal]:
+        """전체 환율 테이블 반환"""
+        now = self.clock()
+        with self._lock:
+            age = None if self._fetched_at is None else now - self._fetched_at
+            if age is not None and age < self.ttl:
+                self._stats["hits"] += 1
+                return dict(self._rates)
+            if self._retry_at is not None and now < self._retry_at:
+                self._stats["stale_hits"] += 1
+                return dict(self._rates)
+            if age is not None and age < self.max_stale:
+                self._stats["stale_hits"] += 1
+                rates = dict(self._rates)
+                start_refresh = not self._refreshing
+                self._refreshing = True
+            else:
+                self._stats["misses"] += 1
+                rates = None
+                start_refresh = False
+
+        if rates is not None:
+            if start_refresh:
+                threading.Thread(target=self._background_refresh, daemon=True).start()
+            return rates
+
+        self.refresh()
+        with self._lock:
+            return dict(self._rates)
+
+    def refresh(self) -> Dict[str, Decimal]:
+        """환율을 즉시 다시 조회해서 캐시를 갱신"""
+        try:
+            fetched = self.fetcher(self.currencies) or {}
+        except Exception as e:
+            print(f"환율 조회 실패: {e}")
+            fetched = {}
+
+        with self._lock:
+            self._stats["fetches"] += 1
+            # 조회되지 않은 통화는 이전 값 -> 기본값 순으로 채움
+            merged = dict(FALLBACK_RATES)
+            merged.update(self._rates)
+            merged.update(fetched)
+            self._rates = merged
+            if fetched:
+                self._fetched_at = self.clock()
+                self._retry_at = None
+            else:
+                # 실패는 신선한 값으로 기록하지 않음 (_fetched_at 유지, 짧은 간격 뒤 재시도)
+                self._stats["errors"] += 1
+                self._retry_at = self.clock() + self.retry_after
+            return dict(self._rates)
+
+    def is_fresh(self) -> bool:
+        """마지막 조회가 성공했고 max_stale 이내이면 True (기본 환율만 있으면 False)"""
+        with self._lock:
+            return self._fetched_at is not None and self.clock() - self._fetched_at < self.max_stale
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def stats(self) -> Dict[str, object]:
+        """hit/miss 카운터 (대시보드가 웜 상태에서 조회를 하지 않는지 확인용)"""
+        with self._lock:
+            data = dict(self._stats)
+            data["age_seconds"] = None if self._fetched_at is None else self.clock() - self._fetched_at
+            return data
+
+    def reset(self):
+        """캐시와 카운터 초기화 (테스트용)"""
+        with self._lock:
+            self._rates = {}
+            self._fetched_at = None
+            self._retry_at = None
+            self._refreshing = False
+            for key in self._stats:
+                self._stats[key] = 0
+
+
+fx_rates = FxRateProvider()
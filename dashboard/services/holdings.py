@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+from itertools import groupby
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Min, Q, Sum
+
+from dashboard.models import PortfolioHolding
+from dashboard.services.payload_cache import bump_dashboard_version
+
+__all__ = ["rebuild_stock_holdings", "sync_real_estate_holdings"]
+
+
+BULK_BATCH_SIZE = 1000
+STREAM_CHUNK_SIZE = 2000
+# 한 쿼리에 OR 로 넣는 (user, ticker) 조건 수
+PAIR_BATCH_SIZE = 200
+
+
+class _Ledger:
+    """(user, ticker) 단위 누적 매수/매도 상태 (StockJournal 집계와 같은 평균단가 기준)"""
+
+    __slots__ = ("buy_qty", "buy_value", "sell_qty", "sell_value")
+
+    def __init__(self):
+        self.buy_qty = Decimal("0")
+        self.buy_value = Decimal("0")
+        self.sell_qty = Decimal("0")
+        self.sell_value = Decimal("0")
+
+    def apply(self, side, price, quantity):
+        if side == "BUY":
+            self.buy_qty += quantity
+            self.buy_value += price * quantity
+        else:
+            self.sell_qty += quantity
+            self.sell_value += price * quantity
+
+    @property
+    def net_qty(self):
+        return self.buy_qty - self.sell_qty
+
+    @property
+    def avg_buy_price(self):
+        return self.buy_value / self.buy_qty if self.buy_qty > 0 else None
+
+    @property
+    def invested_amount(self):
+        avg = self.avg_buy_price
+        return self.net_qty * avg if self.net_qty > 0 and avg is not None else Decimal("0")
+
+    @property
+    def realized_profit(self):
+        avg = self.avg_buy_price
+        if self.sell_qty > 0 and avg is not None:
+            return self.sell_value - avg * self.sell_qty
+        return Decimal("0")
+
+
+def _touched_pairs(since):
+    """since 이후 변경된 저널/거래의 (user_id, ticker) 목록"""
+    from journals.models import StockJournal, StockTrade
+
+    pairs = set(
+        StockJournal.objects.filter(updated_at__gte=since)
+        .values_list("user_id", "ticker_symbol_id")
+    )
+    pairs |= set(
+        StockTrade.objects.filter(Q(updated_at__gte=since) | Q(created_at__gte=since))
+        .values_list("user_id", "ticker_symbol_id")
+    )
+    return pairs
+
+
+def rebuild_stock_holdings(since: Optional[datetime] = None, pairs: Optional[Iterable] = None) -> int:
+    """
+    거래를 (user, ticker) 별로 한 번씩 순서대로 재생해서 보유 현황을 재구성.
+    since 가 주어지면 그 이후 변경된 (user, ticker) 만, pairs 가 주어지면 해당 (user, ticker) 만 다시 계산한다.
+    일별 스냅샷은 시계열 엔진만 쓰므로 여기서는 워터마크만 되돌린다. 반환값: 재구성한 보유 종목 수
+    """
+    if since is not None:
+        pairs = _touched_pairs(since)
+    if pairs is None:
+        return _rebuild_pairs(None)
+
+    # (user, ticker) 조건을 OR 로 묶으므로 SQLite 식 깊이 제한 안에서 나눠 처리
+    pairs = list(set(pairs))
+    return sum(
+        _rebuild_pairs(set(pairs[i:i + PAIR_BATCH_SIZE]))
+        for i in range(0, len(pairs), PAIR_BATCH_SIZE)
+    )
+
+
+def _rebuild_pairs(pairs: Optional[set]) -> int:
+    """pairs 가 None 이면 전체, 아니면 해당 (user, ticker) 만 재구성"""
+    from journals.models import StockInfo, StockJournal, StockTrade
+    from dashboard.services.timeseries import mark_timeseries_stale
+
+    trades = StockTrade.objects.all()
+    holdings_qs = PortfolioHolding.objects.filter(asset_type="stock")
+    journals = StockJournal.objects.all()
+
+    if pairs is not None:
+        pair_q = Q()
+        for user_id, ticker in pairs:
+            pair_q |= Q(user_id=user_id, ticker_symbol_id=ticker)
+        trades = trades.filter(pair_q)
+        journals = journals.filter(pair_q)
+        asset_q = Q()
+        for user_id, ticker in pairs:
+            asset_q |= Q(user_id=user_id, asset_key=f"stock:{ticker}")
+        holdings_qs = holdings_qs.filter(asset_q)
+        journal_ids = list(journals.values_list("id", flat=True))
+    else:
+        journal_ids = list(journals.filter(trades__isnull=False).distinct().values_list("id", flat=True))
+
+    stock_infos = {
+        info.ticker_symbol: info
+        for info in StockInfo.objects.filter(ticker_symbol__in=trades.values("ticker_symbol_id"))
+    }
+
+    rows = (
+        trades.order_by("user_id", "ticker_symbol_id", "trade_date", "created_at", "id")
+        .values_list("user_id", "ticker_symbol_id", "side", "price_per_share", "quantity")
+        .iterator(chunk_size=STREAM_CHUNK_SIZE)
+    )
+
+    # bulk 삭제/생성은 save()/delete() 훅을 거치지 않으므로 캐시 무효화 대상을 직접 모음
+    user_ids = set(holdings_qs.values_list("user_id", flat=True).distinct())
+    pair_count = 0
+    with transaction.atomic():
+        holdings_qs.delete()
+
+        holdings = []
+        for (user_id, ticker), pair_rows in groupby(rows, key=lambda r: (r[0], r[1])):
+            info = stock_infos.get(ticker)
+            currency = (info.currency if info else None) or "KRW"
+            ledger = _Ledger()
+            for _, _, side, price, quantity in pair_rows:
+                ledger.apply(side, price, quantity)
+
+            holdings.append(PortfolioHolding(
+                user_id=user_id,
+                asset_type="stock",
+                stock_ticker_symbol=ticker,
+                # bulk_create 는 save() 를 거치지 않으므로 직접 지정
+                asset_key=f"stock:{ticker}",
+                asset_name=info.stock_name if info else ticker,
+                sector_or_region=(info.sector if info else None) or "기타",
+                currency_code=currency,
+                total_quantity=ledger.net_qty,
+                avg_buy_price=ledger.avg_buy_price,
+                invested_amount=ledger.invested_amount,
+                realized_profit=ledger.realized_profit,
+                total_buy_amount=ledger.buy_value,
+                total_sell_amount=ledger.sell_value,
+            ))
+            user_ids.add(user_id)
+            pair_count += 1
+            if len(holdings) >= BULK_BATCH_SIZE:
+                PortfolioHolding.objects.bulk_create(holdings, batch_size=BULK_BATCH_SIZE)
+                holdings.clear()
+
+        if holdings:
+            PortfolioHolding.objects.bulk_create(holdings, batch_size=BULK_BATCH_SIZE)
+
+        # 저널 집계는 저널당 한 번만 재계산
+        for journal in StockJournal.objects.filter(id__in=journal_ids):
+            journal.recalculate_aggregates()
+
+    bump_dashboard_version(*user_ids)
+    # 일별 시계열은 재구성한 가장 이른 거래일부터 다시 계산
+    for user_id, first_date in trades.values("user_id").annotate(first=Min("trade_date")).values_list("user_id", "first"):
+        mark_timeseries_stale(user_id, first_date)
+    return pair_count
+
+
+def sync_real_estate_holdings(user_id, property_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    사용자의 REDeal 계약을 부동산별로 합산해서 부동산 보유 현황을 맞춤.
+    시계열 엔진과 같은 기준 (계약 금액 합계, asset_key=re:{property_info_id}).
+    property_ids 가 주어지면 해당 부동산만 갱신한다. 반환값: 갱신한 보유 자산 수
+    """
+    from journals.models import REDeal
+
+    deals = REDeal.objects.filter(user_id=user_id)
+    holdings = PortfolioHolding.objects.filter(user_id=user_id, asset_type="real_estate")
+    if property_ids is not None:
+        property_ids = set(property_ids)
+        deals = deals.filter(property_info_id__in=property_ids)
+        holdings = holdings.filter(property_info_id__in=property_ids)
+
+    rows = (
+        deals.order_by()
+        .values("property_info_id", "property_info__building_name", "property_info__address_base", "property_info__dong")
+        .annotate(amount=Sum("amount_main"))
+    )
+    synced = set()
+    for row in rows:
+        property_id, amount = row["property_info_id"], row["amount"] or Decimal("0")
+        region = " ".join(filter(None, [row["property_info__address_base"], row["property_info__dong"]]))
+        PortfolioHolding.objects.update_or_create(
+            user_id=user_id,
+            asset_key=f"re:{property_id}",
+            defaults={
+                "asset_type": "real_estate",
+                "property_info_id": property_id,
+                "asset_name": row["property_info__building_name"],
+                "sector_or_region": region or "기타",
+                "currency_code": "KRW",
+                "total_quantity": Decimal("1"),
+                "avg_buy_price": amount,
+                "invested_amount": amount,
+                "realized_profit": Decimal("0"),
+                "total_buy_amount": amount,
+                "total_sell_amount": Decimal("0"),
+            },
+        )
+        synced.add(property_id)
+
+    # 계약이 모두 삭제된 부동산은 보유 현황에서도 제거 (delete() 훅으로 캐시 무효화)
+    for holding in holdings.exclude(property_info_id__in=synced):
+        holding.delete()
+    return len(synced)
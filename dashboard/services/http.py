@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+__all__ = [
+    "HttpClient",
+    "http_client",
+    "set_yfinance_session",
+    "yfinance_session",
+]
+
+
+# (connect, read) 초 단위 기본 타임아웃
+DEFAULT_TIMEOUT = (3.05, 10)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# 호스트별 지연 시간 통계에 남기는 최근 요청 수
+LATENCY_WINDOW = 200
+
+
+class _HostStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.recent = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, elapsed_ms: float, ok: bool):
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.recent.append(elapsed_ms)
+
+    def as_dict(self) -> Dict[str, object]:
+        recent = sorted(self.recent)
+
+        def pct(p):
+            return round(recent[min(len(recent) - 1, int(len(recent) * p))], 1) if recent else None
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.requests, 1) if self.requests else None,
+            "p50_ms": pct(0.5),
+            "p95_ms": pct(0.95),
+            "max_ms": round(self.max_ms, 1),
+        }
+
+
+class HttpClient:
+    """프로세스 공용 HTTP 클라이언트
+
+    - requests.Session 하나를 공유해서 호스트별 keep-alive 연결을 재사용 (TLS 핸드셰이크 절약)
+    - 호스트별 동시 요청 수 제한 (세마포어), 연결 풀 크기도 같은 값
+    - 기본 타임아웃, 429/5xx 및 연결 오류는 지수 백오프로 재시도 (GET/HEAD 만)
+    - 호스트별 요청 수/오류/지연 시간 통계
+    """
+
+    def __init__(
+        self,
+        per_host_limit: Optional[int] = None,
+        retries: Optional[int] = None,
+        backoff: Optional[float] = None,
+        timeout=None,
+    ):
+        self.per_host_limit = per_host_limit or getattr(settings, "HTTP_PER_HOST_LIMIT", 8)
+        self.retries = retries if retries is not None else getattr(settings, "HTTP_RETRIES", 2)
+        self.backoff = backoff if backoff is not None else getattr(settings, "HTTP_RETRY_BACKOFF", 0.5)
+        self.timeout = timeout or DEFAULT_TIMEOUT
+
+        self._lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._stats: Dict[str, _HostStats] = {}
+
+    def _build_session(self) -> requests.Session:
+        retry = Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=self.retries,
+            status=self.retries,
+            backoff_factor=self.backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            # 재시도를 다 써도 예외 대신 마지막 응답을 돌려줌 (호출부가 status_code 로 판단)
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=self.per_host_limit,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+
+    def _slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return slot
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """session.request 와 같은 인자 (timeout 생략 시 기본값 적용)"""
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlsplit(url).netloc.lower()
+        ok = False
+        with self._slot(host):
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+                ok = response.status_code < 500
+                return response
+            finally:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                with self._lock:
+                    self._stats.setdefault(host, _HostStats()).record(elapsed_ms, ok)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        """호스트별 요청 수/오류 수/지연 시간(ms)"""
+        with self._lock:
+            return {host: stats.as_dict() for host, stats in self._stats.items()}
+
+    def reset(self):
+        """세션과 통계 초기화 (테스트용)"""
+        with self._lock:
+            session, self._session = self._session, None
+            self._stats = {}
+        if session is not None:
+            session.close()
+
+
+http_client = HttpClient()
+
+
+_yf_lock = threading.Lock()
+_yf_session = None
+_yf_session_set = False
+
+
+def set_yfinance_session(session):
+    """yfinance 호출에 쓸 세션 주입 (None 이면 yfinance 기본 세션 사용)"""
+    global _yf_session, _yf_session_set
+    with _yf_lock:
+        _yf_session, _yf_session_set = session, True
+
+
+def yfinance_session():
+    """yfinance 호출들이 공유하는 세션
+
+    Yahoo 는 curl_cffi 세션(브라우저 지문)을 요구하므로 curl_cffi 세션 하나를 만들어
+    모든 yf.download / yf.Ticker 호출에 넘긴다. 쿠키/crumb 과 연결이 재사용된다.
+    """
+    global _yf_session, _yf_session_set
+    if _yf_session_set:
+        return _yf_session
+    with _yf_lock:
+        if not _yf_session_set:
+            try:
+                from curl_cffi import requests as curl_requests
+
+                _yf_session = curl_requests.Session(impersonate="chrome")
+            except Exception as e:
+                print(f"yfinance 공용 세션 생성 실패, 기본 세션 사용: {e}")
+                _yf_session = None
+            _yf_session_set = True
+        return _yf_session
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Dict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+__all__ = [
+    "get_journal_statistics",
+    "invalidate_journal_statistics",
+]
+
+
+# 글 저장/삭제 시 바로 무효화하므로 TTL 은 "최근 30일" 경계가 밀리는 정도만 허용
+JOURNAL_STATS_TTL_SECONDS = getattr(settings, "JOURNAL_STATS_TTL_SECONDS", 10 * 60)
+RECENT_DAYS = 30
+
+
+def _cache_key(user_id) -> str:
+    return f"dashboard:journal_stats:{user_id}"
+
+
+def compute_journal_statistics(user_id) -> Dict[str, int]:
+    """전체/자산 유형별/최근 30일 글 수를 조건부 COUNT 한 번으로 집계"""
+    from home.models import Post
+
+    since = timezone.now() - timedelta(days=RECENT_DAYS)
+    counts = Post.objects.filter(user_id=user_id).aggregate(
+        total_entries=Count("id"),
+        stock_entries=Count("id", filter=Q(asset_type="stock")),
+        real_estate_entries=Count("id", filter=Q(asset_type="real_estate")),
+        recent_entries=Count("id", filter=Q(created_at__gte=since)),
+    )
+    return {
+        "total_entries": counts["total_entries"],
+        "stock_entries": counts["stock_entries"],
+        "real_estate_entries": counts["real_estate_entries"],
+        "recent_entries": counts["recent_entries"],
+    }
+
+
+def get_journal_statistics(user_id) -> Dict[str, int]:
+    """사용자별 캐시 (Post 저장/삭제 시 invalidate_journal_statistics 로 삭제)"""
+    key = _cache_key(user_id)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_journal_statistics(user_id)
+        cache.set(key, stats, JOURNAL_STATS_TTL_SECONDS)
+    return stats
+
+
+def invalidate_journal_statistics(user_id):
+    cache.delete(_cache_key(user_id))
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import time
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+__all__ = [
+    "bump_dashboard_version",
+    "bump_price_version",
+    "get_cached_payload",
+]
+
+
+# 환율/당일 시세처럼 이벤트 없이 바뀌는 값이 있으므로 버전과 별개로 TTL 적용
+PAYLOAD_TTL_SECONDS = getattr(settings, "DASHBOARD_PAYLOAD_TTL_SECONDS", 5 * 60)
+
+PRICE_VERSION_KEY = "dashboard:price_version"
+
+
+def _user_version_key(user_id) -> str:
+    return f"dashboard:user_version:{user_id}"
+
+
+def _payload_key(user_id, kind, asset_type, interval) -> str:
+    return f"dashboard:payload:{user_id}:{kind}:{asset_type or 'all'}:{interval}"
+
+
+def _is_process_local() -> bool:
+    # LocMem 은 프로세스마다 따로라서 다른 워커/관리 명령의 버전 갱신이 보이지 않음
+    return isinstance(caches["default"], LocMemCache)
+
+
+def _new_version() -> int:
+    return time.time_ns()
+
+
+def _ensure_version(key):
+    version = _new_version()
+    if cache.add(key, version, None):
+        return version
+    return cache.get(key, version)
+
+
+def bump_dashboard_version(*user_ids):
+    """사용자 대시보드 캐시 무효화 (거래/계약/보유 자산/매매일지 변경 시)"""
+    ids = {uid for uid in user_ids if uid is not None}
+    if ids:
+        version = _new_version()
+        cache.set_many({_user_version_key(uid): version for uid in ids}, None)
+
+
+def bump_price_version():
+    """전체 대시보드 캐시 무효화 (가격 저장소/종가 갱신 시)"""
+    cache.set(PRICE_VERSION_KEY, _new_version(), None)
+
+
+def get_cached_payload(user_id, kind: str, asset_type: Optional[str], interval: str, build: Callable[[], dict]) -> dict:
+    """(user, kind, asset_type, interval) 단위 캐시
+
+    payload 는 만들 때의 (사용자 버전, 가격 버전) 과 함께 저장하고, 두 버전과 payload 를
+    get_many 한 번으로 읽어 버전이 같으면 그대로 반환한다.
+    공유되지 않는 캐시 백엔드에서는 무효화를 보장할 수 없으므로 캐시하지 않는다.
+    """
+    if _is_process_local():
+        return build()
+
+    user_key = _user_version_key(user_id)
+    payload_key = _payload_key(user_id, kind, asset_type, interval)
+    found = cache.get_many([user_key, PRICE_VERSION_KEY, payload_key])
+
+    user_version = found.get(user_key)
+    price_version = found.get(PRICE_VERSION_KEY)
+    entry = found.get(payload_key)
+    if entry is not None and user_version is not None and price_version is not None \
+            and entry["versions"] == (user_version, price_version):
+        return entry["payload"]
+
+    # 버전이 없으면 새로 발급 (캐시 초기화/축출 이후). 동시에 올라간 버전은 덮어쓰지 않음
+    if user_version is None:
+        user_version = _ensure_version(user_key)
+    if price_version is None:
+        price_version = _ensure_version(PRICE_VERSION_KEY)
+
+    payload = build()
+    # 일시적인 조회 실패가 TTL 동안 계속 보이지 않도록 오류 응답은 저장하지 않음
+    if payload.get("status") != "error":
+        cache.set(payload_key, {"versions": (user_version, price_version), "payload": payload}, PAYLOAD_TTL_SECONDS)
+    return payload
+
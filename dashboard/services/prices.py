@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from dashboard.models import DailyPrice, DailyPriceCoverage
+from dashboard.services.http import yfinance_session
+
+__all__ = [
+    "ensure_history",
+    "get_daily_bars",
+    "get_recent_bars",
+    "get_latest_close",
+    "get_latest_closes",
+    "load_daily_closes",
+    "period_to_days",
+]
+
+
+# 당일(장중) 일봉 재조회 최소 간격
+TODAY_TTL_SECONDS = getattr(settings, "PRICE_STORE_TODAY_TTL_SECONDS", 15 * 60)
+
+# 빈 결과도 커버리지로 기록하되, 일시적 실패일 수 있으므로 이 간격 후 한 번 더 확인
+# 짧은 구간(휴장일일 가능성이 큼)은 짧게, 긴 구간(상장폐지/잘못된 티커일 가능성이 큼)은 길게
+EMPTY_RANGE_FAILURE_DAYS = 5
+EMPTY_RETRY_SECONDS = getattr(settings, "PRICE_STORE_EMPTY_RETRY_SECONDS", TODAY_TTL_SECONDS)
+EMPTY_LONG_RETRY_SECONDS = getattr(settings, "PRICE_STORE_EMPTY_LONG_RETRY_SECONDS", 6 * 60 * 60)
+
+BULK_BATCH_SIZE = 1000
+
+# yfinance 기간 문자열 -> 달력 일수
+PERIOD_DAYS = {
+    "1d": 7,
+    "2d": 7,
+    "5d": 10,
+    "1mo": 31,
+    "30d": 30,
+    "3mo": 92,
+    "6mo": 183,
+    "1y": 365,
+    "2y": 730,
+    "5y": 1826,
+}
+
+
+def period_to_days(period: str, default: int = 31) -> int:
+    return PERIOD_DAYS.get(period, default)
+
+
+def _is_krx_code(ticker: str) -> bool:
+    return len(ticker) == 6 and ticker.isdigit()
+
+
+def _fdr_symbol(ticker: str) -> str:
+    """FinanceDataReader 심볼 (005930.KS -> 005930, ^KS11 -> KS11)"""
+    if ticker.endswith((".KS", ".KQ")):
+        return ticker[:-3]
+    return ticker.lstrip("^")
+
+
+def _to_decimal(value) -> Optional[Decimal]:
+    if value is None:
+        return None
+    value = float(value)
+    if math.isnan(value):
+        return None
+    return Decimal(str(round(value, 6)))
+
+
+def _rows_from_frame(ticker, frame, source) -> List[DailyPrice]:
+    rows = []
+    if frame is None or frame.empty or "Close" not in frame:
+        return rows
+    for index, bar in frame.iterrows():
+        close = _to_decimal(bar.get("Close"))
+        if close is None:
+            continue
+        volume = bar.get("Volume")
+        rows.append(DailyPrice(
+            ticker=ticker,
+            date=index.date() if hasattr(index, "date") else index,
+            open=_to_decimal(bar.get("Open")),
+            high=_to_decimal(bar.get("High")),
+            low=_to_decimal(bar.get("Low")),
+            close=close,
+            volume=None if volume is None or math.isnan(float(volume)) else int(volume),
+            source=source,
+        ))
+    return rows
+
+
+def _fetch_yfinance(tickers: List[str], start: date, end: date) -> Dict[str, List[DailyPrice]]:
+    """여러 티커를 yf.download 한 번으로 조회"""
+    import yfinance as yf
+
+    try:
+        data = yf.download(
+            tickers,
+            start=start.isoformat(),
+            end=(end + timedelta(days=1)).isoformat(),
+            progress=False,
+            auto_adjust=False,
+            threads=True,
+            session=yfinance_session(),
+        )
+    except Exception as e:
+        print(f"yfinance 일봉 조회 실패 ({', '.join(tickers)}): {e}")
+        return {}
+    if data is None or data.empty:
+        return {}
+
+    result = {}
+    for ticker in tickers:
+        try:
+            frame = data.xs(ticker, axis=1, level=1)
+        except KeyError:
+            continue
+        rows = _rows_from_frame(ticker, frame.dropna(how="all"), "yfinance")
+        if rows:
+            result[ticker] = rows
+    return result
+
+
+def _fetch_fdr(ticker: str, start: date, end: date) -> List[DailyPrice]:
+    import FinanceDataReader as fdr
+
+    try:
+        frame = fdr.DataReader(_fdr_symbol(ticker), start, end)
+    except Exception as e:
+        print(f"FDR 일봉 조회 실패 ({ticker}): {e}")
+        return []
+    return _rows_from_frame(ticker, frame, "fdr")
+
+
+def _fetch(tickers: List[str], start: date, end: date) -> Dict[str, List[DailyPrice]]:
+    """KRX 종목코드는 FDR, 나머지는 yfinance 우선 (실패 시 서로 대체)"""
+    krx = [t for t in tickers if _is_krx_code(t)]
+    others = [t for t in tickers if not _is_krx_code(t)]
+
+    result = {}
+    for ticker in krx:
+        rows = _fetch_fdr(ticker, start, end)
+        if rows:
+            result[ticker] = rows
+    if others:
+        result.update(_fetch_yfinance(others, start, end))
+
+    missing = [t for t in tickers if t not in result]
+    if missing:
+        yf_missing = [t for t in missing if _is_krx_code(t)]
+        for ticker in missing:
+            if ticker in yf_missing:
+                continue
+            rows = _fetch_fdr(ticker, start, end)
+            if rows:
+                result[ticker] = rows
+        # 종목코드만으로는 시장을 알 수 없으므로 코스피(.KS) 다음 코스닥(.KQ) 순으로 시도
+        for suffix in (".KS", ".KQ"):
+            if not yf_missing:
+                break
+            fetched = _fetch_yfinance([f"{t}{suffix}" for t in yf_missing], start, end)
+            for ticker in list(yf_missing):
+                rows = fetched.get(f"{ticker}{suffix}")
+                if rows:
+                    for row in rows:
+                        row.ticker = ticker
+                    result[ticker] = rows
+                    yf_missing.remove(ticker)
+    return result
+
+
+def _needs_refresh(coverage: DailyPriceCoverage, now) -> bool:
+    """커버리지 마지막 날 당일에 조회했다면 장중 값일 수 있으므로 TTL 후 재조회"""
+    fetched_on = timezone.localdate(coverage.fetched_at)
+    if fetched_on > coverage.end_date:
+        return False
+    return (now - coverage.fetched_at).total_seconds() >= TODAY_TTL_SECONDS
+
+
+def _missing_ranges(coverage, start, end, now) -> List[Tuple[date, date]]:
+    if coverage is None:
+        return [(start, end)]
+    ranges = []
+    if start < coverage.start_date:
+        ranges.append((start, coverage.start_date - timedelta(days=1)))
+    if end > coverage.end_date or (end == coverage.end_date and _needs_refresh(coverage, now)):
+        # 마지막 날은 장중 값이었을 수 있으므로 다시 포함
+        ranges.append((coverage.end_date, end))
+    if coverage.retry_after is not None and now >= coverage.retry_after:
+        # 빈 결과로 기록된 구간을 그대로 다시 확인 (요청 범위와 무관하게 구간 전체)
+        ranges.append((coverage.retry_start, coverage.retry_end))
+    return ranges
+
+
+def _record_empty(coverage, start, end, now):
+    """빈 결과 구간을 커버리지에 기록. 같은 구간을 재확인했는데 또 비어 있으면 확정"""
+    rechecked = (
+        coverage.retry_after is not None and coverage.retry_after <= now
+        and start <= coverage.retry_start and end >= coverage.retry_end
+    )
+    if rechecked:
+        coverage.retry_start = coverage.retry_end = coverage.retry_after = None
+        return
+    coverage.retry_start = min(coverage.retry_start or start, start)
+    coverage.retry_end = max(coverage.retry_end or end, end)
+    short = (coverage.retry_end - coverage.retry_start).days < EMPTY_RANGE_FAILURE_DAYS
+    delay = EMPTY_RETRY_SECONDS if short else EMPTY_LONG_RETRY_SECONDS
+    coverage.retry_after = now + timedelta(seconds=delay)
+
+
+def _chunks(items, size):
+    if not size:
+        return [items]
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _fetch_pending(pending, workers, chunk_size):
+    """[(start, end, tickers)] 조회 결과 목록 (workers > 1 이면 스레드 풀에서 병렬 조회)"""
+    jobs = [
+        (fetch_start, fetch_end, chunk)
+        for (fetch_start, fetch_end), group in pending.items()
+        for chunk in _chunks(group, chunk_size)
+    ]
+    if workers <= 1 or len(jobs) <= 1:
+        return [(start, end, chunk, _fetch(chunk, start, end)) for start, end, chunk in jobs]
+
+    # 네트워크 조회만 병렬로 하고 DB 쓰기는 호출 스레드에서 처리
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_fetch, chunk, start, end) for start, end, chunk in jobs]
+        return [(start, end, chunk, future.result()) for (start, end, chunk), future in zip(jobs, futures)]
+
+
+def ensure_history(tickers: Iterable[str], start: date, end: Optional[date] = None,
+                   workers: int = 1, chunk_size: Optional[int] = None):
+    """로컬에 없는 구간만 업스트림에서 받아 저장"""
+    now = timezone.now()
+    today = timezone.localdate()
+    end = min(end or today, today)
+    tickers = sorted({t for t in tickers if t})
+    if not tickers or start > end:
+        return
+
+    coverages = {c.ticker: c for c in DailyPriceCoverage.objects.filter(ticker__in=tickers)}
+    pending = defaultdict(list)
+    for ticker in tickers:
+        for fetch_range in dict.fromkeys(_missing_ranges(coverages.get(ticker), start, end, now)):
+            pending[fetch_range].append(ticker)
+    if not pending:
+        return
+
+    # 대시보드 캐시는 종가 갱신 작업(update_close_prices / update_market_values)에서만 무효화
+    # (요청 경로의 차트/시장 패널 조회가 전체 사용자 캐시를 비우지 않도록)
+    covered = {}
+    for fetch_start, fetch_end, group, fetched in _fetch_pending(pending, workers, chunk_size):
+        rows = [row for ticker_rows in fetched.values() for row in ticker_rows]
+        if rows:
+            DailyPrice.objects.bulk_create(
+                rows,
+                batch_size=BULK_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=["ticker", "date"],
+                update_fields=["open", "high", "low", "close", "volume", "source"],
+            )
+        for ticker in group:
+            coverage = covered.get(ticker) or coverages.get(ticker)
+            if coverage is None:
+                coverage = DailyPriceCoverage(ticker=ticker, start_date=fetch_start, end_date=fetch_end)
+            if ticker in fetched:
+                # 재확인 대상 구간을 모두 받아왔으면 더 확인할 필요 없음
+                if coverage.retry_start and fetch_start <= coverage.retry_start and fetch_end >= coverage.retry_end:
+                    coverage.retry_start = coverage.retry_end = coverage.retry_after = None
+            else:
+                # 상장폐지/잘못된 티커도 매 요청마다 다시 받지 않도록 빈 구간도 기록
+                _record_empty(coverage, fetch_start, fetch_end, now)
+            coverage.start_date = min(coverage.start_date, fetch_start)
+            coverage.end_date = max(coverage.end_date, fetch_end)
+            coverage.fetched_at = now
+            covered[ticker] = coverage
+
+    if covered:
+        DailyPriceCoverage.objects.bulk_create(
+            list(covered.values()),
+            update_conflicts=True,
+            unique_fields=["ticker"],
+            update_fields=["start_date", "end_date", "fetched_at", "retry_start", "retry_end", "retry_after"],
+        )
+
+
+def get_daily_bars(ticker: str, start: date, end: Optional[date] = None) -> List[DailyPrice]:
+    """ticker 의 start~end 일봉 (로컬 저장소 기준)"""
+    end = end or timezone.localdate()
+    ensure_history([ticker], start, end)
+    return list(DailyPrice.objects.filter(ticker=ticker, date__gte=start, date__lte=end).order_by("date"))
+
+
+def get_recent_bars(ticker: str, days: int) -> List[DailyPrice]:
+    """최근 days 달력일의 일봉"""
+    today = timezone.localdate()
+    return get_daily_bars(ticker, today - timedelta(days=days), today)
+
+
+def get_latest_close(ticker: str, lookback_days: int = 14) -> Optional[Decimal]:
+    bars = get_recent_bars(ticker, lookback_days)
+    return bars[-1].close if bars else None
+
+
+def get_latest_closes(tickers: Iterable[str], lookback_days: int = 14,
+                      workers: int = 1, chunk_size: Optional[int] = None) -> Dict[str, Decimal]:
+    """여러 티커의 최신 종가 {ticker: close} (저장소 갱신 후 쿼리 한 번으로 조회)"""
+    tickers = sorted({t for t in tickers if t})
+    today = timezone.localdate()
+    start = today - timedelta(days=lookback_days)
+    ensure_history(tickers, start, today, workers=workers, chunk_size=chunk_size)
+
+    latest = {}
+    rows = (
+        DailyPrice.objects.filter(ticker__in=tickers, date__gte=start, date__lte=today)
+        .order_by("ticker", "date")
+        .values_list("ticker", "close")
+    )
+    for ticker, close in rows:
+        latest[ticker] = close
+    return latest
+
+
+def load_daily_closes(tickers: Iterable[str], start: date, end: date) -> Dict[str, List[Tuple[date, Decimal]]]:
+    """여러 티커의 일별 종가 {ticker: [(date, close), ...]}"""
+    tickers = sorted(set(tickers))
+    ensure_history(tickers, start, end)
+    result = defaultdict(list)
+    rows = (
+        DailyPrice.objects.filter(ticker__in=tickers, date__gte=start, date__lte=end)
+        .order_by("ticker", "date")
+        .values_list("ticker", "date", "close")
+    )
+    for ticker, day, close in rows:
+        result[ticker].append((day, close))
+    return dict(result)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from dashboard.models import PortfolioDailyRollup, PortfolioSnapshot
+from dashboard.services.fx import fx_rates
+
+__all__ = [
+    "refresh_rollups",
+    "totals_by_date",
+]
+
+
+BULK_BATCH_SIZE = 1000
+
+
+def refresh_rollups(user_ids: Optional[Iterable[int]] = None, start: Optional[date] = None,
+                    end: Optional[date] = None) -> int:
+    """
+    스냅샷을 (user, 날짜, 자산 유형, 통화) 별로 합산해서 롤업 행을 다시 쓴다.
+    user_ids 가 None 이면 전체 사용자, start/end 로 날짜 범위를 좁힌다. 반환값: 쓴 롤업 행 수
+    """
+    snapshots = PortfolioSnapshot.objects.all()
+    rollups = PortfolioDailyRollup.objects.all()
+    if user_ids is not None:
+        user_ids = list(set(user_ids))
+        if not user_ids:
+            return 0
+        snapshots = snapshots.filter(user_id__in=user_ids)
+        rollups = rollups.filter(user_id__in=user_ids)
+    if start:
+        snapshots = snapshots.filter(snapshot_date__gte=start)
+        rollups = rollups.filter(snapshot_date__gte=start)
+    if end:
+        snapshots = snapshots.filter(snapshot_date__lte=end)
+        rollups = rollups.filter(snapshot_date__lte=end)
+
+    rows = [
+        PortfolioDailyRollup(
+            user_id=row["user_id"],
+            snapshot_date=row["snapshot_date"],
+            asset_type=row["asset_type"],
+            currency_code=row["currency_code"],
+            market_value=row["total_value"] or Decimal("0"),
+            invested_amount=row["total_invested"] or Decimal("0"),
+            asset_count=row["assets"],
+        )
+        for row in (
+            snapshots.order_by()
+            .values("user_id", "snapshot_date", "asset_type", "currency_code")
+            .annotate(total_value=Sum("market_value"), total_invested=Sum("invested_amount"), assets=Count("id"))
+        )
+    ]
+
+    with transaction.atomic():
+        rollups.delete()
+        PortfolioDailyRollup.objects.bulk_create(rows, batch_size=BULK_BATCH_SIZE)
+    return len(rows)
+
+
+def totals_by_date(rollups) -> Dict[date, List[Decimal]]:
+    """롤업 queryset -> {날짜: [원화 평가액, 원화 투자금]} (조회 시점 환율로 환산)"""
+    totals: Dict[date, List[Decimal]] = {}
+    rows = (
+        rollups.order_by()
+        .values("snapshot_date", "currency_code")
+        .annotate(total_value=Sum("market_value"), total_invested=Sum("invested_amount"))
+        .values_list("snapshot_date", "currency_code", "total_value", "total_invested")
+    )
+    for day, currency, market_value, invested in rows:
+        rate = fx_rates.get_rate(currency)
+        total = totals.setdefault(day, [Decimal("0"), Decimal("0")])
+        total[0] += (market_value or Decimal("0")) * rate
+        total[1] += (invested or Decimal("0")) * rate
+    return totals
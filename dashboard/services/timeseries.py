@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from dashboard.models import PortfolioDailyRollup, PortfolioHolding, PortfolioSnapshot, PortfolioTimeseriesState
+from dashboard.services.payload_cache import bump_dashboard_version
+from dashboard.services.prices import load_daily_closes
+from dashboard.services.rollups import refresh_rollups, totals_by_date
+
+__all__ = [
+    "INTERVAL_WINDOWS",
+    "get_portfolio_timeseries",
+    "mark_timeseries_stale",
+    "refresh_today_snapshots",
+    "update_user_timeseries",
+]
+
+
+# interval -> (조회 기간(일), 샘플링 간격(일)); 기간 None 은 전체 이력
+INTERVAL_WINDOWS = {
+    "daily": (30, 1),
+    "weekly": (91, 1),
+    "monthly": (365, 7),
+    "yearly": (None, 30),
+}
+
+# 당일 스냅샷(장중 가격) 재계산 최소 간격
+TODAY_REFRESH_SECONDS = 15 * 60
+
+# 과거 종가 조회 시 휴장일 대비 여유 기간
+PRICE_LOOKBACK_DAYS = 10
+
+BULK_BATCH_SIZE = 1000
+
+
+def mark_timeseries_stale(user_id, from_date):
+    """from_date 이후 시계열을 다시 계산하도록 워터마크를 되돌림 (대시보드 캐시도 무효화)"""
+    bump_dashboard_version(user_id)
+    if not from_date:
+        return
+    if isinstance(from_date, str):
+        from_date = date.fromisoformat(from_date)
+    states = PortfolioTimeseriesState.objects.filter(user_id=user_id)
+    states.filter(computed_through__gte=from_date).update(computed_through=from_date - timedelta(days=1))
+    states.update(refreshed_at=None)
+
+
+def _load_events(user_id):
+    """사용자의 주식 거래/부동산 계약을 날짜순 이벤트로 로드"""
+    return _load_events_for([user_id]).get(user_id, ([], []))
+
+
+def _load_events_for(user_ids):
+    """여러 사용자의 이벤트를 쿼리 두 번으로 로드 -> {user_id: (trades, deals)}"""
+    from journals.models import REDeal, StockTrade
+
+    events = defaultdict(lambda: ([], []))
+    trades = (
+        StockTrade.objects.filter(user_id__in=user_ids)
+        .order_by("trade_date", "id")
+        .values_list(
+            "user_id", "ticker_symbol_id", "ticker_symbol__currency", "side",
+            "trade_date", "price_per_share", "quantity",
+        )
+    )
+    for user_id, *trade in trades:
+        events[user_id][0].append(tuple(trade))
+    deals = (
+        REDeal.objects.filter(user_id__in=user_ids)
+        .order_by("contract_date", "id")
+        .values_list("user_id", "property_info_id", "contract_date", "amount_main")
+    )
+    for user_id, *deal in deals:
+        events[user_id][1].append(tuple(deal))
+    return dict(events)
+
+
+class _Position:
+    __slots__ = ("quantity", "cost", "currency", "last_price")
+
+    def __init__(self, currency):
+        self.quantity = Decimal("0")
+        self.cost = Decimal("0")
+        self.currency = currency or "KRW"
+        self.last_price = None
+
+    def apply(self, side, price, quantity):
+        if side == "BUY":
+            self.quantity += quantity
+            self.cost += price * quantity
+        elif self.quantity > 0:
+            # 이동평균 원가 기준으로 매도분 원가 차감
+            sold = min(quantity, self.quantity)
+            self.cost -= self.cost * sold / self.quantity
+            self.quantity -= sold
+        self.last_price = price
+
+    @property
+    def avg_price(self):
+        return self.cost / self.quantity if self.quantity > 0 else None
+
+
+def _build_snapshots(user_id, start, end, trades, deals, closes=None):
+    """
+    start~end 의 일별 스냅샷 객체 생성 (start 이전 이벤트는 포지션 상태로만 반영).
+    closes 를 주면 가격 저장소를 다시 조회하지 않고 그 종가를 쓴다 (여러 사용자 일괄 계산용).
+    """
+    positions: Dict[str, _Position] = {}
+    trades_by_date = defaultdict(list)
+    for ticker, currency, side, trade_date, price, quantity in trades:
+        if trade_date < start:
+            positions.setdefault(ticker, _Position(currency)).apply(side, price, quantity)
+        else:
+            trades_by_date[trade_date].append((ticker, currency, side, price, quantity))
+
+    properties: Dict[int, Decimal] = {}
+    deals_by_date = defaultdict(list)
+    for property_id, contract_date, amount in deals:
+        if contract_date < start:
+            properties[property_id] = properties.get(property_id, Decimal("0")) + amount
+        else:
+            deals_by_date[contract_date].append((property_id, amount))
+
+    tickers = {ticker for ticker, position in positions.items() if position.quantity > 0}
+    tickers |= {event[0] for events in trades_by_date.values() for event in events}
+    if closes is None:
+        closes = load_daily_closes(tickers, start - timedelta(days=PRICE_LOOKBACK_DAYS), end) if tickers else {}
+    close_cursor = {ticker: 0 for ticker in closes}
+
+    snapshots = []
+    day = start
+    while day <= end:
+        for ticker, currency, side, price, quantity in trades_by_date.get(day, ()):
+            positions.setdefault(ticker, _Position(currency)).apply(side, price, quantity)
+        for property_id, amount in deals_by_date.get(day, ()):
+            properties[property_id] = properties.get(property_id, Decimal("0")) + amount
+
+        for ticker, position in positions.items():
+            # 당일까지의 마지막 종가 (휴장일은 직전 종가 유지)
+            series = closes.get(ticker)
+            if series:
+                i = close_cursor[ticker]
+                while i < len(series) and series[i][0] <= day:
+                    position.last_price = series[i][1]
+                    i += 1
+                close_cursor[ticker] = i
+            if position.quantity <= 0:
+                continue
+            market_price = position.last_price or position.avg_price
+            snapshots.append(PortfolioSnapshot(
+                user_id=user_id,
+                snapshot_date=day,
+                asset_type="stock",
+                stock_ticker_symbol=ticker,
+                asset_key=f"stock:{ticker}",
+                quantity=position.quantity,
+                avg_buy_price=position.avg_price,
+                invested_amount=position.cost,
+                market_price=market_price,
+                market_value=position.quantity * market_price,
+                currency_code=position.currency,
+            ))
+
+        for property_id, amount in properties.items():
+            snapshots.append(PortfolioSnapshot(
+                user_id=user_id,
+                snapshot_date=day,
+                asset_type="real_estate",
+                property_info_id=property_id,
+                asset_key=f"re:{property_id}",
+                quantity=Decimal("1"),
+                avg_buy_price=amount,
+                invested_amount=amount,
+                market_price=amount,
+                market_value=amount,
+                currency_code="KRW",
+            ))
+        day += timedelta(days=1)
+    return snapshots
+
+
+def _is_current(state, today) -> bool:
+    """전일까지 확정됐고 당일 값도 최근에 계산했으면 True"""
+    if not state.computed_through or state.computed_through < today - timedelta(days=1):
+        return False
+    return bool(state.refreshed_at) and (timezone.now() - state.refreshed_at).total_seconds() < TODAY_REFRESH_SECONDS
+
+
+def update_user_timeseries(user_id, today: Optional[date] = None, force: bool = False) -> int:
+    """
+    워터마크 이후의 일별 스냅샷만 계산해서 추가 (생성된 행 수 반환).
+    PortfolioSnapshot 은 이 함수만 쓴다 (거래/계약/종가 변경은 mark_timeseries_stale 로 워터마크만 되돌림).
+    """
+    today = today or timezone.localdate()
+    state, _ = PortfolioTimeseriesState.objects.get_or_create(user_id=user_id)
+
+    if not force and _is_current(state, today):
+        return 0
+
+    trades, deals = _load_events(user_id)
+    first_dates = [t[3] for t in trades[:1]] + [d[1] for d in deals[:1]]
+    if first_dates:
+        start = min(first_dates)
+        if state.computed_through and not force:
+            start = max(start, state.computed_through + timedelta(days=1))
+    elif state.computed_through:
+        # 거래가 모두 삭제된 경우 이후 스냅샷만 정리
+        start = state.computed_through + timedelta(days=1)
+    else:
+        # 거래가 없는 사용자는 빈 시계열로 확정 (조회할 때마다 재계산을 예약하지 않도록)
+        state.computed_through = today - timedelta(days=1)
+        state.refreshed_at = timezone.now()
+        state.save()
+        return 0
+    if start > today:
+        return 0
+
+    snapshots = _build_snapshots(user_id, start, today, trades, deals)
+    with transaction.atomic():
+        PortfolioSnapshot.objects.filter(user_id=user_id, snapshot_date__gte=start).delete()
+        PortfolioSnapshot.objects.bulk_create(snapshots, batch_size=BULK_BATCH_SIZE)
+        refresh_rollups([user_id], start=start)
+        # 당일 값은 확정되지 않았으므로 전일까지만 확정 처리
+        state.computed_through = today - timedelta(days=1)
+        state.refreshed_at = timezone.now()
+        state.save()
+    # 재계산 전에 만들어진 대시보드 캐시 무효화
+    bump_dashboard_version(user_id)
+    return len(snapshots)
+
+
+def refresh_today_snapshots(user_ids, today: Optional[date] = None) -> int:
+    """
+    종가 갱신 후 여러 사용자의 당일 스냅샷을 한 번에 다시 씀 (생성된 행 수 반환).
+    전일까지 확정된 사용자는 이벤트/종가를 일괄 조회하고 삭제/생성/롤업을 한 트랜잭션으로 처리하며,
+    워터마크가 밀린 사용자만 update_user_timeseries 로 개별 계산한다.
+    """
+    from journals.models import StockTrade
+
+    today = today or timezone.localdate()
+    user_ids = set(user_ids)
+    current = set(
+        PortfolioTimeseriesState.objects.filter(user_id__in=user_ids, computed_through__gte=today - timedelta(days=1))
+        .values_list("user_id", flat=True)
+    )
+
+    written = 0
+    for user_id in sorted(user_ids - current):
+        written += update_user_timeseries(user_id, today=today, force=False)
+    if not current:
+        return written
+
+    # 당일 가격이 필요한 종목: 보유 중이거나 당일 거래가 있는 종목
+    tickers = set(
+        PortfolioHolding.objects.filter(user_id__in=current, asset_type="stock", total_quantity__gt=0)
+        .values_list("stock_ticker_symbol", flat=True)
+    )
+    tickers |= set(
+        StockTrade.objects.filter(user_id__in=current, trade_date=today).values_list("ticker_symbol_id", flat=True)
+    )
+    tickers.discard(None)
+    closes = load_daily_closes(tickers, today - timedelta(days=PRICE_LOOKBACK_DAYS), today) if tickers else {}
+
+    events = _load_events_for(current)
+    snapshots = []
+    for user_id in current:
+        trades, deals = events.get(user_id, ([], []))
+        snapshots.extend(_build_snapshots(user_id, today, today, trades, deals, closes=closes))
+
+    with transaction.atomic():
+        PortfolioSnapshot.objects.filter(user_id__in=current, snapshot_date__gte=today).delete()
+        PortfolioSnapshot.objects.bulk_create(snapshots, batch_size=BULK_BATCH_SIZE)
+        refresh_rollups(current, start=today)
+        PortfolioTimeseriesState.objects.filter(user_id__in=current).update(refreshed_at=timezone.now())
+    bump_dashboard_version(*current)
+    return written + len(snapshots)
+
+
+_pending_lock = threading.Lock()
+_pending_users = set()
+
+
+def _background_update(user_id):
+    try:
+        update_user_timeseries(user_id)
+    except Exception as e:
+        print(f"포트폴리오 시계열 갱신 오류 (user {user_id}): {e}")
+    finally:
+        connection.close()
+        with _pending_lock:
+            _pending_users.discard(user_id)
+
+
+def _schedule_update(user_id):
+    """사용자당 최대 하나의 백그라운드 재계산 시작"""
+    if not getattr(settings, "PORTFOLIO_TIMESERIES_BACKGROUND_REFRESH", True):
+        return
+    with _pending_lock:
+        if user_id in _pending_users:
+            return
+        _pending_users.add(user_id)
+    threading.Thread(target=_background_update, args=(user_id,), daemon=True).start()
+
+
+def get_portfolio_timeseries(user_id, asset_type=None, interval="weekly", today: Optional[date] = None):
+    """
+    날짜별 롤업으로 만든 차트용 시계열 (원화 기준).
+    요청 경로에서는 재계산하지 않음 - 오래됐으면 저장된 값을 반환하고 백그라운드 재계산을 시작한다.
+    """
+    today = today or timezone.localdate()
+    state = PortfolioTimeseriesState.objects.filter(user_id=user_id).first()
+    if state is None or not _is_current(state, today):
+        _schedule_update(user_id)
+
+    window, step = INTERVAL_WINDOWS.get(interval, INTERVAL_WINDOWS["weekly"])
+    # 날짜별 롤업 (자산 수와 무관하게 O(일수) 행)
+    rollups = PortfolioDailyRollup.objects.filter(user_id=user_id, snapshot_date__lte=today)
+    if asset_type:
+        rollups = rollups.filter(asset_type=asset_type)
+    if window:
+        rollups = rollups.filter(snapshot_date__gte=today - timedelta(days=window - 1))
+
+    totals = totals_by_date(rollups)
+
+    timeseries = []
+    prev_value = None
+    for day in sorted(totals):
+        if (today - day).days % step:
+            continue
+        market_value, invested = totals[day]
+        cumulative_return_rate = (market_value - invested) / invested * 100 if invested > 0 else Decimal("0")
+        daily_return_rate = (market_value - prev_value) / prev_value * 100 if prev_value else Decimal("0")
+        timeseries.append({
+            "date": day.strftime("%Y-%m-%d"),
+            "market_value": float(market_value),
+            "invested_amount": float(invested),
+            "return_rate": float(daily_return_rate),
+            "cumulative_return_rate": float(cumulative_return_rate),
+        })
+        prev_value = market_value
+    return timeseries
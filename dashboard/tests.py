@@ -1,3 +1,774 @@
-from django.test import TestCase
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from journals.models import REDeal, REPropertyInfo, StockInfo, StockJournal, StockTrade
+from .models import (
+    DailyPrice, DailyPriceCoverage, PortfolioDailyRollup, PortfolioHolding, PortfolioSnapshot, PortfolioTimeseriesState,
+)
+from .services.fx import FxRateProvider, fx_rates
+from .services.http import HttpClient
+from .services.prices import ensure_history, load_daily_closes
+from .services.rollups import refresh_rollups, totals_by_date
+from .services.timeseries import get_portfolio_timeseries, update_user_timeseries
+from .views.services import CurrencyConverter, DashboardDataCalculator
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _FlakyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    failures_left = 0
+    client_ports = set()
+
+    def do_GET(self):
+        type(self).client_ports.add(self.client_address[1])
+        if type(self).failures_left > 0:
+            type(self).failures_left -= 1
+            status, body = 503, b'busy'
+        else:
+            status, body = 200, b'ok'
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpClientTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _FlakyHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/'
+        _FlakyHandler.failures_left = 0
+        _FlakyHandler.client_ports = set()
+        self.client = HttpClient(per_host_limit=2, retries=2, backoff=0)
+        self.addCleanup(self.client.reset)
+
+    def test_reuses_connection_and_records_host_latency(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get(self.url).text, 'ok')
+        # keep-alive: 세 요청이 연결 하나로 처리됨
+        self.assertEqual(len(_FlakyHandler.client_ports), 1)
+        stats = self.client.stats()[f'127.0.0.1:{self.server.server_port}']
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['errors'], 0)
+        self.assertIsNotNone(stats['p95_ms'])
+
+    def test_retries_server_errors_then_returns_last_response(self):
+        _FlakyHandler.failures_left = 2
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        _FlakyHandler.failures_left = 5
+        self.assertEqual(self.client.get(self.url).status_code, 503)
+        stats = self.client.stats()[f'127.0.0.1:{self.server.server_port}']
+        self.assertEqual((stats['requests'], stats['errors']), (2, 1))
+
+
+class FxRateProviderTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.calls = 0
+
+        def fetcher(currencies):
+            self.calls += 1
+            return {'USD': Decimal('1400'), 'JPY': Decimal('9.5')}
+
+        self.provider = FxRateProvider(ttl=60, max_stale=600, fetcher=fetcher, clock=self.clock)
+
+    def test_warm_cache_does_not_refetch(self):
+        self.assertEqual(self.provider.get_rate('USD'), Decimal('1400'))
+        for _ in range(10):
+            self.provider.get_rate('USD')
+        stats = self.provider.stats()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 10)
+
+    def test_missing_currency_falls_back_to_default(self):
+        self.assertEqual(self.provider.get_rate('KRW'), Decimal('1'))
+        self.assertEqual(self.provider.get_rate('EUR'), Decimal('1450'))
+
+    def test_expired_entry_is_served_stale_then_refreshed(self):
+        self.provider.get_rate('USD')
+        self.clock.now = 120
+        self.assertEqual(self.provider.get_rate('USD'), Decimal('1400'))
+        self.assertEqual(self.provider.stats()['stale_hits'], 1)
+
+        # 백그라운드 갱신 완료 대기
+        deadline = time.monotonic() + 5
+        while self.provider._refreshing and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.calls, 2)
+
+        self.clock.now = 10_000
+        self.provider.get_rate('USD')
+        self.assertEqual(self.provider.stats()['misses'], 2)
+
+    def test_failed_fetch_is_not_cached_as_fresh(self):
+        failing = FxRateProvider(
+            ttl=60, max_stale=600, retry_after=30, fetcher=mock.Mock(side_effect=OSError), clock=self.clock
+        )
+        self.assertEqual(failing.get_rate('USD'), Decimal('1300'))
+        self.assertFalse(failing.is_fresh())
+        self.assertIsNone(failing.stats()['age_seconds'])
+
+        # 재시도 간격 안에서는 다시 조회하지 않고, 지나면 다시 조회
+        self.clock.now = 10
+        failing.get_rate('USD')
+        self.assertEqual(failing.fetcher.call_count, 1)
+        failing.fetcher = mock.Mock(return_value={'USD': Decimal('1400')})
+        self.clock.now = 31
+        self.assertEqual(failing.get_rate('USD'), Decimal('1400'))
+        self.assertTrue(failing.is_fresh())
+
+
+class CurrencyConverterTests(TestCase):
+    def setUp(self):
+        fx_rates.reset()
+        patcher = mock.patch.object(fx_rates, 'fetcher', return_value={'USD': Decimal('1000')})
+        self.fetcher = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(fx_rates.reset)
+
+    def test_convert_many_resolves_rates_once(self):
+        converted = CurrencyConverter.convert_many(
+            [Decimal('2'), 3, None, Decimal('5')], ['USD', 'KRW', 'USD', 'XYZ']
+        )
+        self.assertEqual(converted, [Decimal('2000'), Decimal('3'), Decimal('0'), Decimal('5')])
+        self.assertEqual(self.fetcher.call_count, 1)
+
+    def test_breakdowns_use_batched_conversion(self):
+        PortfolioHolding.objects.create(
+            user_id=1, asset_type='stock', stock_ticker_symbol='AAPL', asset_name='Apple',
+            sector_or_region='Technology', currency_code='USD',
+            total_quantity=Decimal('2'), avg_buy_price=Decimal('10'), invested_amount=Decimal('20'),
+        )
+        PortfolioHolding.objects.create(
+            user_id=1, asset_type='stock', stock_ticker_symbol='005930.KS', asset_name='삼성전자',
+            sector_or_region='Technology', currency_code='KRW',
+            total_quantity=Decimal('1'), avg_buy_price=Decimal('70000'), invested_amount=Decimal('70000'),
+        )
+        calculator = DashboardDataCalculator(user_id=1)
+        self.assertEqual(calculator.get_sector_breakdown(), {'Technology': 90000.0})
+
+        holdings = {h['ticker']: h for h in calculator.get_stock_holdings()}
+        self.assertEqual(holdings['AAPL']['market_value_krw'], 20000.0)
+        self.assertEqual(holdings['005930.KS']['invested_amount_krw'], 70000.0)
+        self.assertEqual(self.fetcher.call_count, 1)
+
+
+class PortfolioTimeseriesTests(TestCase):
+    def setUp(self):
+        fx_rates.reset()
+        patcher = mock.patch.object(fx_rates, 'fetcher', return_value={})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = get_user_model().objects.create_user(
+            my_ID='tsuser', email='ts@example.com', password='password123', nickname='ts'
+        )
+        self.stock_info = StockInfo.objects.create(ticker_symbol='005930.KS', stock_name='Samsung', currency='KRW')
+        self.journal = StockJournal.objects.create(
+            user=self.user, ticker_symbol=self.stock_info, target_price=1, stop_price=1
+        )
+        self.closes = {'005930.KS': [
+            (date(2025, 1, 2), Decimal('110')),
+            (date(2025, 1, 3), Decimal('120')),
+            (date(2025, 1, 6), Decimal('130')),
+        ]}
+        patcher = mock.patch('dashboard.services.timeseries.load_daily_closes', return_value=self.closes)
+        self.load_closes = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def add_trade(self, side, trade_date, price, quantity):
+        StockTrade.objects.create(
+            journal=self.journal, user=self.user, ticker_symbol=self.stock_info,
+            side=side, trade_date=trade_date, price_per_share=Decimal(price), quantity=Decimal(quantity)
+        )
+
+    def test_replays_trades_against_daily_closes(self):
+        self.add_trade('BUY', date(2025, 1, 1), '100', '10')
+        self.add_trade('SELL', date(2025, 1, 3), '120', '5')
+
+        update_user_timeseries(self.user.id, today=date(2025, 1, 4))
+        values = dict(
+            PortfolioSnapshot.objects.filter(user_id=self.user.id)
+            .values_list('snapshot_date', 'market_value')
+        )
+        self.assertEqual(values[date(2025, 1, 1)], Decimal('1000'))
+        self.assertEqual(values[date(2025, 1, 2)], Decimal('1100'))
+        self.assertEqual(values[date(2025, 1, 3)], Decimal('600'))
+        # 휴장일은 직전 종가 유지
+        self.assertEqual(values[date(2025, 1, 4)], Decimal('600'))
+
+    def test_incremental_run_appends_only_new_days(self):
+        self.add_trade('BUY', date(2025, 1, 1), '100', '10')
+        self.assertEqual(update_user_timeseries(self.user.id, today=date(2025, 1, 4)), 4)
+        # 같은 날 재호출은 캐시된 결과 사용
+        self.assertEqual(update_user_timeseries(self.user.id, today=date(2025, 1, 4)), 0)
+        # 다음 날은 확정되지 않은 전일 + 당일만 다시 계산
+        self.assertEqual(update_user_timeseries(self.user.id, today=date(2025, 1, 6)), 3)
+        self.assertEqual(PortfolioSnapshot.objects.filter(user_id=self.user.id).count(), 6)
+
+    def test_backdated_trade_rewinds_watermark(self):
+        self.add_trade('BUY', date(2025, 1, 1), '100', '10')
+        update_user_timeseries(self.user.id, today=date(2025, 1, 6))
+        self.add_trade('BUY', date(2025, 1, 3), '120', '10')
+
+        # 요청 경로에서는 재계산하지 않고 백그라운드 재계산만 예약
+        with mock.patch('dashboard.services.timeseries._schedule_update') as schedule:
+            get_portfolio_timeseries(self.user.id, interval='daily', today=date(2025, 1, 6))
+        schedule.assert_called_once_with(self.user.id)
+        self.load_closes.reset_mock()
+        self.assertFalse(self.load_closes.called)
+
+        update_user_timeseries(self.user.id, today=date(2025, 1, 6))
+        with mock.patch('dashboard.services.timeseries._schedule_update') as schedule:
+            series = get_portfolio_timeseries(self.user.id, interval='daily', today=date(2025, 1, 6))
+        self.assertFalse(schedule.called)
+        by_date = {row['date']: row for row in series}
+        self.assertEqual(by_date['2025-01-02']['market_value'], 1100.0)
+        self.assertEqual(by_date['2025-01-06']['market_value'], 2600.0)
+        self.assertEqual(by_date['2025-01-06']['invested_amount'], 2200.0)
+
+
+class PriceStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.requests = []
+
+        def fetch(tickers, start, end):
+            self.requests.append((tuple(tickers), start, end))
+            result = {}
+            for ticker in tickers:
+                rows = []
+                day = start
+                while day <= end:
+                    rows.append(DailyPrice(ticker=ticker, date=day, close=Decimal(day.day), source='test'))
+                    day += timedelta(days=1)
+                result[ticker] = rows
+            return result
+
+        patcher = mock.patch('dashboard.services.prices._fetch', side_effect=fetch)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fetches_each_range_once_for_all_tickers(self):
+        closes = load_daily_closes(['AAPL', 'MSFT'], date(2025, 1, 1), date(2025, 1, 10))
+        self.assertEqual(len(closes['AAPL']), 10)
+        self.assertEqual(self.requests, [(('AAPL', 'MSFT'), date(2025, 1, 1), date(2025, 1, 10))])
+
+        # 이미 저장된 구간은 업스트림을 다시 호출하지 않음
+        load_daily_closes(['AAPL', 'MSFT'], date(2025, 1, 3), date(2025, 1, 8))
+        self.assertEqual(len(self.requests), 1)
+
+    def test_fetch_does_not_invalidate_dashboard_caches(self):
+        from .services.payload_cache import PRICE_VERSION_KEY
+
+        cache.set(PRICE_VERSION_KEY, 1, None)
+        ensure_history(['AAPL'], date(2025, 1, 1), date(2025, 1, 3))
+        self.assertEqual(cache.get(PRICE_VERSION_KEY), 1)
+
+    def test_empty_range_is_covered_and_rechecked_once(self):
+        with mock.patch('dashboard.services.prices._fetch', return_value={}) as failing:
+            ensure_history(['AAPL'], date(2025, 1, 6), date(2025, 1, 7))
+            # 재시도 간격 안에서는 다시 조회하지 않음
+            ensure_history(['AAPL'], date(2025, 1, 6), date(2025, 1, 7))
+        self.assertEqual(failing.call_count, 1)
+        coverage = DailyPriceCoverage.objects.get(ticker='AAPL')
+        self.assertEqual((coverage.retry_start, coverage.retry_end), (date(2025, 1, 6), date(2025, 1, 7)))
+
+        # 재시도 간격이 지나면 빈 구간만 다시 받고, 데이터가 오면 재확인 표시를 지움
+        DailyPriceCoverage.objects.update(retry_after=timezone.now() - timedelta(seconds=1))
+        ensure_history(['AAPL'], date(2025, 1, 6), date(2025, 1, 7))
+        self.assertEqual(self.requests, [(('AAPL',), date(2025, 1, 6), date(2025, 1, 7))])
+        self.assertIsNone(DailyPriceCoverage.objects.get(ticker='AAPL').retry_after)
+
+    def test_backfills_only_missing_edges(self):
+        ensure_history(['AAPL'], date(2025, 1, 5), date(2025, 1, 10))
+        ensure_history(['AAPL'], date(2025, 1, 1), date(2025, 1, 15))
+        self.assertEqual(self.requests[1:], [
+            (('AAPL',), date(2025, 1, 1), date(2025, 1, 4)),
+            (('AAPL',), date(2025, 1, 10), date(2025, 1, 15)),
+        ])
+        coverage = DailyPriceCoverage.objects.get(ticker='AAPL')
+        self.assertEqual((coverage.start_date, coverage.end_date), (date(2025, 1, 1), date(2025, 1, 15)))
+        self.assertEqual(DailyPrice.objects.filter(ticker='AAPL').count(), 15)
+
+    def test_delisted_ticker_is_not_refetched_on_every_request(self):
+        with mock.patch('dashboard.services.prices._fetch', return_value={}) as failing:
+            ensure_history(['GONE'], date(2025, 1, 1), date(2025, 1, 31))
+            ensure_history(['GONE'], date(2025, 1, 1), date(2025, 1, 31))
+            self.assertEqual(failing.call_count, 1)
+
+            # 긴 빈 구간은 한 번 더 확인한 뒤에도 비어 있으면 확정
+            DailyPriceCoverage.objects.update(retry_after=timezone.now() - timedelta(seconds=1))
+            ensure_history(['GONE'], date(2025, 1, 1), date(2025, 1, 31))
+            ensure_history(['GONE'], date(2025, 1, 1), date(2025, 1, 31))
+        self.assertEqual(failing.call_count, 2)
+        coverage = DailyPriceCoverage.objects.get(ticker='GONE')
+        self.assertEqual((coverage.start_date, coverage.end_date), (date(2025, 1, 1), date(2025, 1, 31)))
+        self.assertIsNone(coverage.retry_after)
+
+
+class PriceFetchFallbackTests(SimpleTestCase):
+    def test_krx_code_falls_back_to_kosdaq_suffix(self):
+        from .services import prices
+
+        def yf(tickers, start, end):
+            return {t: [DailyPrice(ticker=t, date=end, close=Decimal('1'), source='yfinance')]
+                    for t in tickers if t.endswith('.KQ')}
+
+        with mock.patch.object(prices, '_fetch_fdr', return_value=[]), \
+                mock.patch.object(prices, '_fetch_yfinance', side_effect=yf) as yf_fetch:
+            result = prices._fetch(['247540'], date(2025, 1, 2), date(2025, 1, 2))
+        self.assertEqual([row.ticker for row in result['247540']], ['247540'])
+        self.assertEqual([call.args[0] for call in yf_fetch.call_args_list], [['247540.KS'], ['247540.KQ']])
+
+
+class UpdateMarketValuesCommandTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.fetched = []
+        self.close = Decimal('50')
+
+        def fetch(tickers, start, end):
+            self.fetched.extend(tickers)
+            return {
+                ticker: [DailyPrice(ticker=ticker, date=end, close=self.close, source='test')]
+                for ticker in tickers
+            }
+
+        patcher = mock.patch('dashboard.services.prices._fetch', side_effect=fetch)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        fx = mock.patch.object(fx_rates, 'fetcher', return_value={})
+        fx.start()
+        self.addCleanup(fx.stop)
+        fx_rates.reset()
+
+        self.today = timezone.localdate()
+        self.users = []
+        for n in range(3):
+            user = get_user_model().objects.create_user(
+                my_ID=f'mv{n}', email=f'mv{n}@example.com', password='password123', nickname=f'mv{n}'
+            )
+            self.users.append(user)
+            for ticker in ('AAPL', 'MSFT'):
+                info, _ = StockInfo.objects.get_or_create(ticker_symbol=ticker, defaults={'stock_name': ticker, 'currency': 'USD'})
+                journal = StockJournal.objects.create(user=user, ticker_symbol=info, target_price=1, stop_price=1)
+                StockTrade.objects.create(
+                    journal=journal, user=user, ticker_symbol=info, side='BUY',
+                    trade_date=self.today, price_per_share=Decimal('10'), quantity=Decimal('2'),
+                )
+        self.fetched.clear()
+
+    def test_fetches_each_ticker_once_and_recomputes_today_through_the_engine(self):
+        call_command('update_market_values', workers=2, chunk_size=1, stdout=StringIO())
+        self.assertEqual(sorted(set(self.fetched)), ['AAPL', 'MSFT'])
+
+        snapshots = PortfolioSnapshot.objects.filter(snapshot_date=self.today)
+        self.assertEqual(snapshots.count(), 6)
+        self.assertEqual(set(snapshots.values_list('market_value', flat=True)), {Decimal('100')})
+
+        # 재실행 시 같은 날 스냅샷은 새 종가로 다시 계산됨 (행이 늘지 않음)
+        self.close = Decimal('60')
+        DailyPriceCoverage.objects.update(fetched_at=timezone.now() - timedelta(days=1))
+        out = StringIO()
+        # 전일까지 확정된 사용자는 사용자별 재계산 없이 일괄 처리
+        with mock.patch('dashboard.services.timeseries.update_user_timeseries') as per_user:
+            call_command('update_market_values', stdout=out)
+        per_user.assert_not_called()
+        self.assertIn('Completed: 6 snapshots for 3 users, 0 errors', out.getvalue())
+        self.assertEqual(snapshots.count(), 6)
+        self.assertEqual(set(snapshots.values_list('market_value', flat=True)), {Decimal('120')})
+
+
+class ClosePriceJobTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            my_ID='closeuser', email='close@example.com', password='password123', nickname='close'
+        )
+        self.fetch_calls = []
+
+        def fetch(tickers, start, end):
+            self.fetch_calls.append(list(tickers))
+            return {
+                ticker: [DailyPrice(ticker=ticker, date=end, close=Decimal('42.5'), source='test')]
+                for ticker in tickers if ticker != 'GONE'
+            }
+
+        patcher = mock.patch('dashboard.services.prices._fetch', side_effect=fetch)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        for ticker in ('AAPL', 'MSFT', 'GONE', 'UNUSED'):
+            StockInfo.objects.create(ticker_symbol=ticker, stock_name=ticker, currency='USD')
+        StockJournal.objects.create(user=self.user, ticker_symbol_id='AAPL', target_price=1, stop_price=1)
+        StockJournal.objects.create(user=self.user, ticker_symbol_id='GONE', target_price=1, stop_price=1)
+        PortfolioHolding.objects.create(
+            user_id=self.user.id, asset_type='stock', stock_ticker_symbol='MSFT', asset_name='MSFT',
+            currency_code='USD', total_quantity=Decimal('2'), avg_buy_price=Decimal('10'),
+            invested_amount=Decimal('20'),
+        )
+
+    def test_updates_referenced_tickers_in_one_download(self):
+        out = StringIO()
+        call_command('update_close_prices', stdout=out, stderr=StringIO())
+        self.assertEqual(self.fetch_calls, [['AAPL', 'GONE', 'MSFT']])
+        self.assertIn('Updated 2/3', out.getvalue())
+
+        msft = StockInfo.objects.get(pk='MSFT')
+        self.assertEqual(msft.last_close_price, Decimal('42.5'))
+        self.assertEqual(msft.last_close_date, timezone.localdate())
+        self.assertIsNotNone(msft.last_close_updated_at)
+        self.assertIsNone(StockInfo.objects.get(pk='UNUSED').last_close_price)
+
+    def test_holdings_use_fresh_close_and_flag_stale_one(self):
+        call_command('update_close_prices', stdout=StringIO(), stderr=StringIO())
+        with mock.patch.object(fx_rates, 'fetcher', return_value={'USD': Decimal('1000')}):
+            holding = DashboardDataCalculator(self.user.id).get_stock_holdings()[0]
+        self.assertEqual(holding['market_value'], 85.0)
+        self.assertFalse(holding['price_is_stale'])
+
+        StockInfo.objects.filter(pk='MSFT').update(last_close_date=timezone.localdate() - timedelta(days=30))
+        with mock.patch.object(fx_rates, 'fetcher', return_value={'USD': Decimal('1000')}):
+            holding = DashboardDataCalculator(self.user.id).get_stock_holdings()[0]
+        # 오래된 종가는 쓰지 않고 평단가로 평가
+        self.assertEqual(holding['market_value'], 20.0)
+        self.assertTrue(holding['price_is_stale'])
+
+
+class JournalStatisticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            my_ID='statsuser', email='stats@example.com', password='password123', nickname='stats'
+        )
+
+    def post(self, asset_type):
+        from home.models import Post
+
+        return Post.objects.create(user=self.user, content='entry', embed_payload_json={'asset_type': asset_type})
+
+    def test_single_aggregate_cached_until_posts_change(self):
+        from home.models import Post
+
+        self.post('stock')
+        self.post('stock')
+        old = self.post('real_estate')
+        Post.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=40))
+        self.post('other')
+        calculator = DashboardDataCalculator(self.user.id)
+
+        with self.assertNumQueries(1):
+            stats = calculator.get_journal_statistics()
+        self.assertEqual(stats, {
+            'total_entries': 4, 'stock_entries': 2, 'real_estate_entries': 1, 'recent_entries': 3,
+        })
+        with self.assertNumQueries(0):
+            calculator.get_journal_statistics()
+
+        self.post('stock').delete()
+        self.post('real_estate')
+        self.assertEqual(calculator.get_journal_statistics()['real_estate_entries'], 2)
+
+
+class DashboardPayloadCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            my_ID='cacheuser', email='cache@example.com', password='password123', nickname='cache'
+        )
+        self.client.force_login(self.user)
+        self.info = StockInfo.objects.create(ticker_symbol='005930.KS', stock_name='삼성전자', currency='KRW')
+        self.journal = StockJournal.objects.create(user=self.user, ticker_symbol=self.info, target_price=1, stop_price=1)
+        fx = mock.patch.object(fx_rates, 'fetcher', return_value={'USD': Decimal('1000')})
+        fx.start()
+        self.addCleanup(fx.stop)
+        builds = mock.patch.object(
+            DashboardDataCalculator, 'get_data_payload', autospec=True,
+            side_effect=lambda calc: {'asset_type': calc.asset_type, 'interval': calc.interval},
+        )
+        self.builds = builds.start()
+        self.addCleanup(builds.stop)
+
+    def get(self, url='/dashboard/api/stock/', **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_unchanged_dashboard_is_served_from_cache(self):
+        self.assertEqual(self.get(interval='daily'), {'asset_type': 'stock', 'interval': 'daily'})
+        self.get(interval='daily')
+        self.assertEqual(self.builds.call_count, 1)
+        # 키가 (asset_type, interval) 별로 분리됨
+        self.get(interval='weekly')
+        self.get('/dashboard/api/total/', interval='daily')
+        self.assertEqual(self.builds.call_count, 3)
+
+    def test_error_payload_is_not_cached(self):
+        self.builds.side_effect = lambda calc: {'status': 'error'}
+        self.get()
+        self.get()
+        self.assertEqual(self.builds.call_count, 2)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_process_local_cache_is_bypassed(self):
+        self.get()
+        self.get()
+        self.assertEqual(self.builds.call_count, 2)
+
+    def test_trades_holdings_and_prices_invalidate(self):
+        from .services.payload_cache import bump_price_version
+
+        self.get()
+        StockTrade.objects.create(
+            journal=self.journal, user=self.user, ticker_symbol=self.info, side=StockTrade.Side.BUY,
+            trade_date=date(2025, 1, 2), price_per_share=Decimal('100'), quantity=Decimal('1'),
+        )
+        self.get()
+        self.assertEqual(self.builds.call_count, 2)
+
+        PortfolioHolding.objects.get(user_id=self.user.id).delete()
+        self.get()
+        bump_price_version()
+        self.get()
+        self.get()
+        self.assertEqual(self.builds.call_count, 4)
+
+
+class DashboardQueryPlanTests(TestCase):
+    def setUp(self):
+        self.user_id = 4242
+        StockInfo.objects.create(
+            ticker_symbol='AAPL', stock_name='Apple', currency='USD',
+            last_close_price=Decimal('20'), last_close_date=timezone.localdate(),
+        )
+        PortfolioHolding.objects.create(
+            user_id=self.user_id, asset_type='stock', stock_ticker_symbol='AAPL', asset_name='Apple',
+            sector_or_region='IT', currency_code='USD', total_quantity=Decimal('2'),
+            avg_buy_price=Decimal('10'), invested_amount=Decimal('20'),
+        )
+        PortfolioHolding.objects.create(
+            user_id=self.user_id, asset_type='stock', stock_ticker_symbol='UNKNOWN', asset_name='Unknown',
+            sector_or_region='기타', currency_code='KRW', total_quantity=Decimal('1'),
+            avg_buy_price=Decimal('500'), invested_amount=Decimal('500'),
+        )
+        PortfolioHolding.objects.create(
+            user_id=self.user_id, asset_type='real_estate', property_info_id=7, asset_name='아파트',
+            sector_or_region='서울', currency_code='KRW', total_quantity=Decimal('1'),
+            invested_amount=Decimal('100000'),
+        )
+        for day, value in ((date(2025, 1, 1), Decimal('100')), (date(2025, 1, 2), Decimal('150'))):
+            PortfolioSnapshot.objects.create(
+                user_id=self.user_id, snapshot_date=day, asset_type='stock', stock_ticker_symbol='AAPL',
+                quantity=Decimal('1'), market_value=value, currency_code='KRW',
+            )
+        # 같은 날짜의 두 번째 자산 - 변화량은 자산 간이 아니라 날짜 간 총액 차이여야 함
+        PortfolioSnapshot.objects.create(
+            user_id=self.user_id, snapshot_date=date(2025, 1, 2), asset_type='real_estate', property_info_id=7,
+            quantity=Decimal('1'), market_value=Decimal('1000'), currency_code='KRW',
+        )
+        fx = mock.patch.object(fx_rates, 'fetcher', return_value={'USD': Decimal('1000')})
+        fx.start()
+        self.addCleanup(fx.stop)
+        fx_rates.reset()
+        self.addCleanup(fx_rates.reset)
+        fx_rates.get_rates()
+        refresh_rollups([self.user_id])
+
+    def test_every_section_comes_from_two_queries(self):
+        calculator = DashboardDataCalculator(self.user_id)
+        with self.assertNumQueries(2):
+            holdings = calculator._get_holdings_data()
+            total_value = calculator.get_total_value()
+            change = calculator.get_total_change()
+            calculator.get_total_change_percent()
+            stocks = calculator.get_stock_holdings()
+            real_estate = calculator.get_real_estate_holdings()
+            sectors = calculator.get_sector_breakdown()
+            regions = calculator.get_region_breakdown()
+
+        self.assertEqual(holdings['holdings_count'], 3)
+        self.assertEqual(total_value, 20 * 1000 + 500 + 100000)
+        self.assertEqual(change, 1050.0)
+        apple, unknown = stocks
+        self.assertEqual((apple['market_value'], apple['price_is_stale']), (40.0, False))
+        self.assertEqual((unknown['market_value'], unknown['price_is_stale']), (500.0, True))
+        self.assertEqual(real_estate[0]['region'], '서울')
+        self.assertEqual(sectors, {'IT': 20000.0, '기타': 500.0})
+        self.assertEqual(regions, {'서울': 100000.0})
+
+
+class PortfolioRollupTests(TestCase):
+    def setUp(self):
+        fx = mock.patch.object(fx_rates, 'fetcher', return_value={'USD': Decimal('1000')})
+        fx.start()
+        self.addCleanup(fx.stop)
+        fx_rates.reset()
+        self.addCleanup(fx_rates.reset)
+
+    def _snapshot(self, user_id, day, ticker, value, currency='KRW', asset_type='stock'):
+        ref = {'stock_ticker_symbol': ticker} if asset_type == 'stock' else {'property_info_id': ticker}
+        PortfolioSnapshot.objects.create(
+            user_id=user_id, snapshot_date=day, asset_type=asset_type, **ref,
+            quantity=Decimal('1'), market_value=value, invested_amount=value, currency_code=currency,
+        )
+
+    def test_one_row_per_date_asset_type_and_currency(self):
+        day = date(2025, 3, 3)
+        self._snapshot(1, day, 'AAPL', Decimal('2'), currency='USD')
+        self._snapshot(1, day, 'MSFT', Decimal('3'), currency='USD')
+        self._snapshot(1, day, '005930', Decimal('500'))
+        self._snapshot(1, day, 1, Decimal('10000'), asset_type='real_estate')
+        self._snapshot(2, day, '005930', Decimal('7'))
+
+        self.assertEqual(refresh_rollups([1]), 3)
+
+        usd = PortfolioDailyRollup.objects.get(user_id=1, snapshot_date=day, asset_type='stock', currency_code='USD')
+        self.assertEqual((usd.asset_count, usd.market_value), (2, Decimal('5')))
+        self.assertFalse(PortfolioDailyRollup.objects.filter(user_id=2).exists())
+
+        # 원화 환산은 조회 시점 환율로 (저장된 행에는 환율이 들어가지 않음)
+        totals = totals_by_date(PortfolioDailyRollup.objects.filter(user_id=1))
+        self.assertEqual(totals[day][0], Decimal('15500'))
+        fx_rates._rates['USD'] = Decimal('2000')
+        totals = totals_by_date(PortfolioDailyRollup.objects.filter(user_id=1))
+        self.assertEqual(totals[day][0], Decimal('20500'))
+
+    def test_refresh_replaces_rows_in_range(self):
+        first, second = date(2025, 3, 3), date(2025, 3, 4)
+        self._snapshot(1, first, '005930', Decimal('100'))
+        self._snapshot(1, second, '005930', Decimal('200'))
+        refresh_rollups([1])
+
+        PortfolioSnapshot.objects.filter(snapshot_date=second).update(market_value=Decimal('300'))
+        PortfolioSnapshot.objects.filter(snapshot_date=first).update(market_value=Decimal('0'))
+        refresh_rollups([1], start=second, end=second)
+
+        values = dict(PortfolioDailyRollup.objects.filter(user_id=1).values_list('snapshot_date', 'market_value'))
+        self.assertEqual(values, {first: Decimal('100'), second: Decimal('300')})
+
+
+class RealEstateHoldingTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            my_ID='reuser', email='re@example.com', password='password123', nickname='re'
+        )
+        self.prop = REPropertyInfo.objects.create(
+            property_type='아파트', building_name='래미안', address_base='서울 강남구', dong='역삼동',
+            lat=Decimal('37.5'), lng=Decimal('127.0'),
+        )
+
+    def add_deal(self, amount, contract_date=date(2025, 1, 1)):
+        return REDeal.objects.create(
+            user=self.user, property_info=self.prop, deal_type='매매', contract_date=contract_date,
+            amount_main=Decimal(amount), area_m2=Decimal('84'), floor=10,
+        )
+
+    def test_deals_sync_holding_keyed_by_property(self):
+        first = self.add_deal('500000000')
+        second = self.add_deal('100000000', date(2025, 2, 1))
+
+        holding = PortfolioHolding.objects.get(user_id=self.user.id, asset_type='real_estate')
+        self.assertEqual(holding.asset_key, f're:{self.prop.property_info_id}')
+        self.assertEqual(holding.invested_amount, Decimal('600000000'))
+        self.assertEqual(holding.sector_or_region, '서울 강남구 역삼동')
+
+        second.delete()
+        self.assertEqual(PortfolioHolding.objects.get(pk=holding.pk).invested_amount, Decimal('500000000'))
+        first.delete()
+        self.assertFalse(PortfolioHolding.objects.filter(user_id=self.user.id).exists())
+
+
+class SyncHoldingsCommandTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            my_ID='syncuser', email='sync@example.com', password='password123', nickname='sync'
+        )
+        self.stock_info = StockInfo.objects.create(
+            ticker_symbol='AAPL', stock_name='Apple', currency='USD', sector='Technology'
+        )
+        self.journal = StockJournal.objects.create(
+            user=self.user, ticker_symbol=self.stock_info, target_price=1, stop_price=1
+        )
+        for side, trade_date, price, quantity in [
+            ('BUY', date(2025, 1, 1), '100', '10'),
+            ('BUY', date(2025, 1, 2), '130', '10'),
+            ('SELL', date(2025, 1, 3), '150', '5'),
+        ]:
+            StockTrade.objects.create(
+                journal=self.journal, user=self.user, ticker_symbol=self.stock_info, side=side,
+                trade_date=trade_date, price_per_share=Decimal(price), quantity=Decimal(quantity)
+            )
+
+    def test_replays_trades_into_holding_without_writing_snapshots(self):
+        PortfolioHolding.objects.all().delete()
+        PortfolioSnapshot.objects.all().delete()
+        PortfolioTimeseriesState.objects.create(user_id=self.user.id, computed_through=date(2025, 2, 1))
+        call_command('sync_holdings', stdout=StringIO())
+
+        holding = PortfolioHolding.objects.get(user_id=self.user.id, asset_key='stock:AAPL')
+        self.assertEqual(holding.total_quantity, Decimal('15'))
+        self.assertEqual(holding.avg_buy_price, Decimal('115'))
+        self.assertEqual(holding.realized_profit, Decimal('175'))
+        self.assertEqual(holding.sector_or_region, 'Technology')
+
+        # 일별 스냅샷은 시계열 엔진 몫 - 워터마크만 첫 거래일 전날로 되돌림
+        self.assertFalse(PortfolioSnapshot.objects.exists())
+        state = PortfolioTimeseriesState.objects.get(user_id=self.user.id)
+        self.assertEqual(state.computed_through, date(2024, 12, 31))
+
+    def test_deleting_journal_drops_holding_and_rewinds_timeseries(self):
+        from .services.payload_cache import _user_version_key
+
+        PortfolioTimeseriesState.objects.create(user_id=self.user.id, computed_through=date(2025, 2, 1))
+        cache.set(_user_version_key(self.user.id), 1, None)
+        self.journal.delete()
+
+        self.assertFalse(StockTrade.objects.filter(user=self.user).exists())
+        self.assertFalse(PortfolioHolding.objects.filter(user_id=self.user.id).exists())
+        self.assertNotEqual(cache.get(_user_version_key(self.user.id)), 1)
+        state = PortfolioTimeseriesState.objects.get(user_id=self.user.id)
+        self.assertEqual(state.computed_through, date(2024, 12, 31))
+
+    def test_since_skips_untouched_positions(self):
+        PortfolioHolding.objects.filter(user_id=self.user.id).update(total_quantity=Decimal('999'))
+        future = (timezone.now() + timedelta(days=1)).isoformat()
+        call_command('sync_holdings', since=future, stdout=StringIO())
+        self.assertEqual(PortfolioHolding.objects.get(user_id=self.user.id).total_quantity, Decimal('999'))
+
+        call_command('sync_holdings', since='2025-01-01', stdout=StringIO())
+        self.assertEqual(PortfolioHolding.objects.get(user_id=self.user.id).total_quantity, Decimal('15'))
+
+    def test_many_pairs_are_rebuilt_in_batches(self):
+        from .services.holdings import rebuild_stock_holdings
+
+        PortfolioHolding.objects.filter(user_id=self.user.id).update(total_quantity=Decimal('999'))
+        # 한 쿼리로 OR 하면 SQLite 식 깊이 제한(1000)을 넘는 개수
+        pairs = {(self.user.id + 1, f'T{i}') for i in range(1500)} | {(self.user.id, 'AAPL')}
+        self.assertEqual(rebuild_stock_holdings(pairs=pairs), 1)
+        self.assertEqual(PortfolioHolding.objects.get(user_id=self.user.id).total_quantity, Decimal('15'))
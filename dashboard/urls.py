@@ -28,6 +28,7 @@ urlpatterns = [
     path("api/total/", api_total, name="api_total"),
     path("api/stock/", api_stock, name="api_stock"),
     path("api/real_estate/", api_real_estate, name="api_real_estate"),
+    path("api/total/timeseries/", api_total_timeseries, name="api_total_timeseries"),
     path("api/portfolio/", api_portfolio, name="api_portfolio"),
     path("api/journal_entries/", api_journal_entries, name="api_journal_entries"),
 ]
\ No newline at end of file
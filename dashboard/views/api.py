@@ -1,5 +1,7 @@
 # apps/dashboard/views/api.py
 from django.http import JsonResponse, HttpRequest
+
+from dashboard.services.payload_cache import get_cached_payload
 # from .services import build_total_card_payload, build_asset_line_payload, build_total_timeseries_payload
 # from .utils import get_uid, parse_interval, parse_granularity
 
@@ -21,7 +23,7 @@ def api_total(request: HttpRequest) -> JsonResponse:
             asset_type=None,  # 전체 자산
             interval=interval
         )
-        data = calculator.get_data_payload()
+        data = get_cached_payload(request.user.id, 'card', None, interval, calculator.get_data_payload)
         
         return JsonResponse(data)
         
@@ -43,7 +45,7 @@ def api_stock(request: HttpRequest) -> JsonResponse:
             asset_type='stock',  # 주식 자산만
             interval=interval
         )
-        data = calculator.get_data_payload()
+        data = get_cached_payload(request.user.id, 'card', 'stock', interval, calculator.get_data_payload)
         
         return JsonResponse(data)
         
@@ -65,7 +67,7 @@ def api_real_estate(request: HttpRequest) -> JsonResponse:
             asset_type='real_estate',  # 부동산 자산만
             interval=interval
         )
-        data = calculator.get_data_payload()
+        data = get_cached_payload(request.user.id, 'card', 'real_estate', interval, calculator.get_data_payload)
         
         return JsonResponse(data)
         
@@ -104,28 +106,34 @@ def api_portfolio(request: HttpRequest) -> JsonResponse:
             interval=interval
         )
         
-        # 포트폴리오 전용 데이터 구조
-        stock_holdings = calculator.get_stock_holdings()
-        real_estate_holdings = calculator.get_real_estate_holdings()
+        def build():
+            # 포트폴리오 전용 데이터 구조
+            stock_holdings = calculator.get_stock_holdings()
+            real_estate_holdings = calculator.get_real_estate_holdings()
         
-        print(f"=== 포트폴리오 API 디버깅 ===")
-        print(f"stock_holdings 개수: {len(stock_holdings) if stock_holdings else 0}")
-        print(f"real_estate_holdings 개수: {len(real_estate_holdings) if real_estate_holdings else 0}")
-        print(f"stock_holdings 내용: {stock_holdings}")
-        print(f"real_estate_holdings 내용: {real_estate_holdings}")
+            print(f"=== 포트폴리오 API 디버깅 ===")
+            print(f"stock_holdings 개수: {len(stock_holdings) if stock_holdings else 0}")
+            print(f"real_estate_holdings 개수: {len(real_estate_holdings) if real_estate_holdings else 0}")
+            print(f"stock_holdings 내용: {stock_holdings}")
+            print(f"real_estate_holdings 내용: {real_estate_holdings}")
         
-        data = {
-            'total_value': calculator.get_total_value(),
-            'total_change': calculator.get_total_change(),
-            'total_change_percent': calculator.get_total_change_percent(),
-            'stock_holdings': stock_holdings,
-            'real_estate_holdings': real_estate_holdings,
-            'sector_breakdown': calculator.get_sector_breakdown(),
-            'region_breakdown': calculator.get_region_breakdown(),
-            'timeseries_data': calculator.get_timeseries_data(),
-            'recent_journal_entries': calculator.get_recent_journal_entries(),
-            'journal_statistics': calculator.get_journal_statistics()
-        }
+            data = {
+                'total_value': calculator.get_total_value(),
+                'total_change': calculator.get_total_change(),
+                'total_change_percent': calculator.get_total_change_percent(),
+                'stock_holdings': stock_holdings,
+                'real_estate_holdings': real_estate_holdings,
+                'sector_breakdown': calculator.get_sector_breakdown(),
+                'region_breakdown': calculator.get_region_breakdown(),
+                'timeseries_data': calculator.get_timeseries_data(),
+                'recent_journal_entries': calculator.get_recent_journal_entries(),
+                'journal_statistics': calculator.get_journal_statistics()
+            }
+        
+            return data
+
+        # 변경이 없으면 캐시 한 번 읽기로 응답
+        data = get_cached_payload(request.user.id, 'portfolio', None, interval, build)
         
         return JsonResponse(data)
         
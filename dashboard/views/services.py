@@ -1,50 +1,64 @@
 # apps/dashboard/views/services.py
-from django.db.models import Sum, Q
+from functools import cached_property
+
+from django.db.models import Exists, OuterRef, Q, Subquery, Sum
 from decimal import Decimal
-from datetime import datetime, timedelta
-from dashboard.models import PortfolioHolding, PortfolioSnapshot, AssetLogUnified
+from dashboard.models import PortfolioDailyRollup, PortfolioHolding, AssetLogUnified
 from journals.models import StockJournal, StockInfo, StockTrade
+from dashboard.services.fx import fx_rates
+from dashboard.services.journal_stats import get_journal_statistics
+from dashboard.services.rollups import totals_by_date
+from dashboard.services.timeseries import get_portfolio_timeseries
 import requests
-import yfinance as yf
 
 
 class CurrencyConverter:
-    """통화 변환 클래스"""
+    """통화 변환 클래스 (환율은 프로세스 공용 캐시에서 조회)"""
     
+    @staticmethod
+    def get_rate(currency_code):
+        """통화 코드 -> 원화 환율"""
+        return fx_rates.get_rate(currency_code)
+
     @staticmethod
     def get_usd_to_krw_rate():
         """USD to KRW 환율 조회"""
-        try:
-            # yfinance를 사용하여 환율 정보 가져오기
-            ticker = yf.Ticker("USDKRW=X")
-            # Ticker.info 대신 Ticker.history() 사용
-            hist = ticker.history(period="1d")
-            if not hist.empty:
-                # 가장 최근의 종가 반환
-                return hist['Close'].iloc[-1]
-            else:
-                # 데이터가 없을 경우 기본값 사용
-                return 1300.0
-        except Exception as e:
-            print(f"yfinance 환율 조회 실패: {e}")
-            # API 실패 시 기본값 사용
-            return 1300.0
+        return float(fx_rates.get_rate('USD'))
     
     @staticmethod
     def convert_to_krw(amount, currency_code):
         """통화를 원화로 변환"""
-        if currency_code == 'KRW':
+        if not currency_code or currency_code == 'KRW':
             return amount
-        elif currency_code == 'USD':
-            rate = CurrencyConverter.get_usd_to_krw_rate()
-            # amount를 Decimal로 변환하고 rate도 Decimal로 변환
+        elif currency_code in fx_rates.currencies:
+            rate_decimal = fx_rates.get_rate(currency_code)
+            # amount를 Decimal로 변환
             amount_decimal = Decimal(str(amount)) if not isinstance(amount, Decimal) else amount
-            rate_decimal = Decimal(str(rate))
             return amount_decimal * rate_decimal
         else:
-            # 다른 통화는 일단 그대로 반환 (필요시 추가)
+            # 지원하지 않는 통화는 그대로 반환
             return amount
 
+    @staticmethod
+    def convert_many(amounts, currencies):
+        """금액 목록을 한 번에 원화로 변환
+
+        환율 테이블은 호출당 한 번만 조회하고, 통화별 환율을 재사용합니다.
+        반환값은 입력 순서를 유지한 Decimal 리스트입니다.
+        """
+        rates = fx_rates.get_rates()
+        supported = fx_rates.currencies
+        converted = []
+        for amount, currency_code in zip(amounts, currencies):
+            if amount is None:
+                amount_decimal = Decimal('0')
+            else:
+                amount_decimal = amount if isinstance(amount, Decimal) else Decimal(str(amount))
+            if currency_code and currency_code != 'KRW' and currency_code in supported:
+                amount_decimal = amount_decimal * rates[currency_code]
+            converted.append(amount_decimal)
+        return converted
+
 
 class DashboardDataCalculator:
     """대시보드 데이터 계산 서비스"""
@@ -53,6 +67,48 @@ class DashboardDataCalculator:
         self.user_id = user_id
         self.asset_type = asset_type
         self.interval = interval
+
+    # 요청 한 번에 필요한 원본 데이터 (각 섹션은 여기서 파생, 쿼리 2회)
+    @cached_property
+    def _holdings(self):
+        """사용자의 전체 보유 자산 (주식은 StockInfo 종가/통화를 서브쿼리로 함께 조회)"""
+        infos = StockInfo.objects.filter(ticker_symbol=OuterRef('stock_ticker_symbol'))
+        return list(
+            PortfolioHolding.objects.filter(user_id=self.user_id)
+            .annotate(
+                info_exists=Exists(infos),
+                info_currency=Subquery(infos.values('currency')[:1]),
+                info_close=Subquery(infos.values('last_close_price')[:1]),
+                info_close_date=Subquery(infos.values('last_close_date')[:1]),
+            )
+            .order_by('id')
+        )
+
+    @cached_property
+    def _recent_totals(self):
+        """가장 최근 두 날짜의 원화 환산 총 평가액 [최신, 이전] (날짜별 롤업 기준)"""
+        rollups = PortfolioDailyRollup.objects.filter(user_id=self.user_id)
+        dates = rollups.order_by('-snapshot_date').values('snapshot_date').distinct()[:2]
+        # 두 날짜 모두 조회 시점 환율 하나로 환산 (실행마다 다른 환율이 섞이지 않음)
+        totals = totals_by_date(rollups.filter(snapshot_date__in=Subquery(dates)))
+        return [float(totals[day][0]) for day in sorted(totals, reverse=True)]
+
+    def _holdings_of(self, asset_type=None):
+        if not asset_type:
+            return self._holdings
+        return [h for h in self._holdings if h.asset_type == asset_type]
+
+    @staticmethod
+    def _stock_info_of(holding):
+        """주석으로 함께 읽은 값으로 만든 (저장되지 않은) StockInfo, 종목 정보가 없으면 None"""
+        if not holding.info_exists:
+            return None
+        return StockInfo(
+            ticker_symbol=holding.stock_ticker_symbol,
+            currency=holding.info_currency,
+            last_close_price=holding.info_close,
+            last_close_date=holding.info_close_date,
+        )
     
     def get_data_payload(self):
         """데이터 페이로드 생성"""
@@ -88,79 +144,47 @@ class DashboardDataCalculator:
         print(f"user_id: {self.user_id}")
         print(f"asset_type: {self.asset_type}")
 
-        # 먼저 사용자가 가진 실제 매매일지 데이터 확인
-        from journals.models import StockJournal, REDeal
-        stock_journals = StockJournal.objects.filter(user_id=self.user_id)
-        re_deals = REDeal.objects.filter(user_id=self.user_id)
-        print(f"실제 StockJournal 개수: {stock_journals.count()}")
-        print(f"실제 REDeal 개수: {re_deals.count()}")
-
         # PortfolioHolding 테이블이 비어있으면 동기화가 안된 상태
-        holdings_count = PortfolioHolding.objects.filter(user_id=self.user_id).count()
+        holdings_count = len(self._holdings)
         print(f"PortfolioHolding 개수: {holdings_count}")
 
-        if holdings_count == 0 and (stock_journals.exists() or re_deals.exists()):
-            print("⚠️  매매일지는 있지만 PortfolioHolding이 비어있음 - 동기화 필요")
-            # 임시로 실시간 계산해서 반환
-            return self._calculate_from_journals_directly()
+        if holdings_count == 0:
+            from journals.models import StockJournal, REDeal
+            if StockJournal.objects.filter(user_id=self.user_id).exists() or REDeal.objects.filter(user_id=self.user_id).exists():
+                print("⚠️  매매일지는 있지만 PortfolioHolding이 비어있음 - 동기화 필요")
+                # 임시로 실시간 계산해서 반환
+                return self._calculate_from_journals_directly()
 
-        # 필터 조건 설정
-        filters = {'user_id': self.user_id}
-        if self.asset_type:
-            filters['asset_type'] = self.asset_type
-
-        print(f"필터 조건: {filters}")
-
-        # 보유 자산 조회
-        holdings = PortfolioHolding.objects.filter(**filters)
-        print(f"필터링된 PortfolioHolding 개수: {holdings.count()}")
+        # 보유 자산 (asset_type 필터는 메모리에서 적용)
+        holdings = self._holdings_of(self.asset_type)
+        print(f"필터링된 PortfolioHolding 개수: {len(holdings)}")
 
         for holding in holdings:
             print(f"  - {holding.asset_name}: {holding.invested_amount}")
 
-        # 총 투자 금액 계산 (통화 변환 적용)
-        total_invested = Decimal('0')
-        for holding in holdings:
-            converted_amount = CurrencyConverter.convert_to_krw(
-                holding.invested_amount,
-                holding.currency_code
-            )
-            total_invested += converted_amount
+        currencies = [holding.currency_code for holding in holdings]
 
-        # 총 시장 가치 계산 (최신 스냅샷에서)
-        snapshot_filters = {'user_id': self.user_id}
-        if self.asset_type:
-            snapshot_filters['asset_type'] = self.asset_type
-
-        latest_snapshots = PortfolioSnapshot.objects.filter(
-            **snapshot_filters
-        ).order_by('-snapshot_date')[:1]
-
-        print(f"Debug: asset_type={self.asset_type}, snapshot_filters={snapshot_filters}")
-        print(f"Debug: found {latest_snapshots.count()} snapshots")
-
-        # 스냅샷 상세 정보 출력
-        for snapshot in latest_snapshots:
-            print(f"📸 스냅샷 상세: date={snapshot.snapshot_date}, market_value={snapshot.market_value}, currency={snapshot.currency_code}")
-
-        total_market_value = Decimal('0')
+        # 총 투자 금액 계산 (통화 변환 적용)
+        total_invested = sum(
+            CurrencyConverter.convert_many([holding.invested_amount for holding in holdings], currencies),
+            Decimal('0')
+        )
 
         # 스냅샷의 market_value가 0인 경우가 많아서, holdings에서 직접 계산
         print("💰 스냅샷 대신 PortfolioHolding에서 직접 시장가치 계산")
+        market_values = []
         for holding in holdings:
             if holding.asset_type == 'stock':
                 # 주식: 보유수량 × 평균매수가 (임시로 매수가를 시장가로 사용)
                 if holding.total_quantity and holding.avg_buy_price:
-                    # Decimal 타입으로 안전하게 곱셈
-                    market_value = Decimal(str(holding.total_quantity)) * Decimal(str(holding.avg_buy_price))
-                    converted_value = CurrencyConverter.convert_to_krw(market_value, holding.currency_code)
-                    total_market_value += converted_value
-                    print(f"📈 {holding.asset_name}: {holding.total_quantity} × {holding.avg_buy_price} = {converted_value} KRW")
+                    market_values.append(holding.total_quantity * holding.avg_buy_price)
+                else:
+                    market_values.append(Decimal('0'))
             else:
                 # 부동산: 투자금액을 시장가치로 사용
-                converted_value = CurrencyConverter.convert_to_krw(holding.invested_amount, holding.currency_code)
-                total_market_value += converted_value
-                print(f"🏠 {holding.asset_name}: {converted_value} KRW")
+                market_values.append(holding.invested_amount)
+
+        total_market_value = sum(CurrencyConverter.convert_many(market_values, currencies), Decimal('0'))
 
         print(f"📊 최종 계산된 total_market_value: {total_market_value}")
 
@@ -175,7 +199,7 @@ class DashboardDataCalculator:
             'total_market_value': float(total_market_value),
             'return_rate': float(return_rate),
             'return_amount': float(total_market_value - total_invested),
-            'holdings_count': holdings.count()
+            'holdings_count': len(holdings)
         }
         print(f"🏦 기존 로직 최종 반환 데이터: {result}")
         return result
@@ -238,148 +262,47 @@ class DashboardDataCalculator:
         return result
     
     def _get_timeseries_data(self):
-        """시계열 데이터 조회 - 매매일지 작성 날짜 기반"""
-        print("📈 timeseries 데이터 실시간 계산 시작")
-
-        from journals.models import StockJournal, StockTrade, REDeal
-        from datetime import datetime, timedelta
-
-        # 실제 매매일지 작성 날짜 범위 구하기
-        earliest_stock_date = None
-        earliest_re_date = None
-
-        # 주식 매매일지 최초 작성일
-        if not self.asset_type or self.asset_type == 'stock':
-            earliest_stock_journal = StockJournal.objects.filter(user_id=self.user_id).order_by('created_at').first()
-            if earliest_stock_journal:
-                earliest_stock_date = earliest_stock_journal.created_at.date()
-                print(f"📅 최초 주식 매매일지 작성일: {earliest_stock_date}")
-
-        # 부동산 거래 최초 작성일
-        if not self.asset_type or self.asset_type == 'real_estate':
-            earliest_re_deal = REDeal.objects.filter(user_id=self.user_id).order_by('created_at').first()
-            if earliest_re_deal:
-                earliest_re_date = earliest_re_deal.created_at.date()
-                print(f"🏠 최초 부동산 거래 작성일: {earliest_re_date}")
-
-        # 전체 최초 작성일 결정
-        earliest_dates = [d for d in [earliest_stock_date, earliest_re_date] if d is not None]
-        if not earliest_dates:
-            print("📭 매매일지가 없어서 빈 시계열 반환")
-            return []
-
-        start_date = min(earliest_dates)
-        today = datetime.now().date()
-        print(f"📊 시계열 범위: {start_date} ~ {today}")
-
-        # 현재 holdings 데이터 기반 계산
-        filters = {'user_id': self.user_id}
-        if self.asset_type:
-            filters['asset_type'] = self.asset_type
-
-        holdings = PortfolioHolding.objects.filter(**filters)
-
-        # 총 투자금액과 현재 시장가치 계산
-        total_invested = Decimal('0')
-        total_market_value = Decimal('0')
-
-        for holding in holdings:
-            # 투자금액
-            converted_invested = CurrencyConverter.convert_to_krw(
-                holding.invested_amount, holding.currency_code
-            )
-            total_invested += converted_invested
-
-            # 시장가치 (매수가 기준)
-            if holding.asset_type == 'stock' and holding.total_quantity and holding.avg_buy_price:
-                # Decimal 타입으로 안전하게 곱셈
-                market_value = Decimal(str(holding.total_quantity)) * Decimal(str(holding.avg_buy_price))
-                converted_market = CurrencyConverter.convert_to_krw(market_value, holding.currency_code)
-                total_market_value += converted_market
-            else:
-                total_market_value += converted_invested
-
-        # 30일치 시계열 데이터 생성
-        timeseries = []
-        days_range = min(30, (today - start_date).days + 1)  # 최대 30일, 실제 기간이 더 짧으면 실제 기간
-
-        for i in range(days_range):
-            current_date = today - timedelta(days=days_range - 1 - i)
-
-            # 시간에 따른 가상의 변화 (실제로는 각 날짜별 실제 데이터가 필요)
-            progress_ratio = (i + 1) / days_range  # 0 ~ 1
-
-            # 초기에는 낮은 가치에서 시작해서 점진적으로 현재 가치로 증가
-            simulated_market_value = total_invested + (total_market_value - total_invested) * Decimal(str(progress_ratio))
-
-            # 수익률 계산
-            if total_invested > 0:
-                cumulative_return_rate = ((simulated_market_value - total_invested) / total_invested) * Decimal('100')
-            else:
-                cumulative_return_rate = Decimal('0')
-
-            # 일일 변화율 (전일 대비)
-            if i > 0:
-                prev_value = total_invested + (total_market_value - total_invested) * Decimal(str((i) / days_range))
-                daily_return_rate = ((simulated_market_value - prev_value) / prev_value) * Decimal('100') if prev_value > 0 else 0
-            else:
-                daily_return_rate = 0
-
-            timeseries.append({
-                'date': current_date.strftime('%Y-%m-%d'),
-                'market_value': float(simulated_market_value),
-                'invested_amount': float(total_invested),
-                'return_rate': float(daily_return_rate),
-                'cumulative_return_rate': float(cumulative_return_rate)
-            })
-
-        print(f"📊 생성된 timeseries 개수: {len(timeseries)}, 기간: {start_date} ~ {today}")
-        return timeseries
+        """시계열 데이터 조회 - 거래 이력을 일별 종가로 재생한 스냅샷 기반"""
+        return get_portfolio_timeseries(self.user_id, self.asset_type, self.interval)
     
     def get_total_value(self):
         """총 자산 가치 반환"""
-        holdings = PortfolioHolding.objects.filter(user_id=self.user_id)
-        total_value = Decimal('0')
-        for holding in holdings:
-            converted_amount = CurrencyConverter.convert_to_krw(holding.invested_amount, holding.currency_code)
-            total_value += converted_amount
+        holdings = self._holdings
+        total_value = sum(
+            CurrencyConverter.convert_many([h.invested_amount for h in holdings], [h.currency_code for h in holdings]),
+            Decimal('0')
+        )
         return float(total_value)
     
     def get_total_change(self):
-        """총 자산 변화량 반환"""
-        snapshots = PortfolioSnapshot.objects.filter(user_id=self.user_id).order_by('-snapshot_date')[:2]
-        if len(snapshots) >= 2:
-            # market_value 차이로 변화량 계산 (통화 변환 적용)
-            current_value = float(CurrencyConverter.convert_to_krw(snapshots[0].market_value or 0, snapshots[0].currency_code))
-            previous_value = float(CurrencyConverter.convert_to_krw(snapshots[1].market_value or 0, snapshots[1].currency_code))
+        """총 자산 변화량 반환 (최근 스냅샷 날짜와 그 이전 날짜의 총액 비교)"""
+        totals = self._recent_totals
+        if len(totals) >= 2:
+            current_value, previous_value = totals
             return current_value - previous_value
         return 0.0
     
     def get_total_change_percent(self):
         """총 자산 변화율 반환"""
-        snapshots = PortfolioSnapshot.objects.filter(user_id=self.user_id).order_by('-snapshot_date')[:2]
-        if len(snapshots) >= 2:
-            # market_value 차이로 변화율 계산 (통화 변환 적용)
-            current_value = float(CurrencyConverter.convert_to_krw(snapshots[0].market_value or 0, snapshots[0].currency_code))
-            previous_value = float(CurrencyConverter.convert_to_krw(snapshots[1].market_value or 0, snapshots[1].currency_code))
+        totals = self._recent_totals
+        if len(totals) >= 2:
+            current_value, previous_value = totals
             if previous_value > 0:
                 return ((current_value - previous_value) / previous_value) * 100
         return 0.0
     
     def get_stock_holdings(self):
         """주식 보유 자산 반환"""
-        holdings = PortfolioHolding.objects.filter(user_id=self.user_id, asset_type='stock')
-        
-        # Fetch all needed StockInfo objects in one query
-        ticker_symbols = [h.stock_ticker_symbol for h in holdings if h.stock_ticker_symbol]
-        stock_infos = StockInfo.objects.in_bulk(ticker_symbols) # Use in_bulk for a dict lookup
+        holdings = self._holdings_of('stock')
 
-        results = []
+        rows = []
         for h in holdings:
             print(f"보유 종목: {h.asset_name}, 통화: {h.currency_code}, 티커: {h.stock_ticker_symbol}")
-            stock_info = stock_infos.get(h.stock_ticker_symbol)
-            # Use last_close_price as current price, fallback to avg_buy_price
-            current_price = stock_info.last_close_price if stock_info and stock_info.last_close_price else h.avg_buy_price or 0
+            stock_info = self._stock_info_of(h)
+            # 배치 작업이 채운 종가 사용, 없거나 오래되면 평단가로 대체하고 stale 표시
+            fresh_price = stock_info.fresh_close_price() if stock_info else None
+            price_is_stale = fresh_price is None
+            current_price = fresh_price if fresh_price is not None else h.avg_buy_price or 0
             
             # StockInfo에서 통화 정보 가져오기 (더 정확한 판단을 위해)
             actual_currency = None
@@ -399,65 +322,97 @@ class DashboardDataCalculator:
             pnl = market_value - invested_amount
             pnl_percentage = (pnl / invested_amount) * Decimal('100') if invested_amount > 0 else 0
 
-            results.append({
+            rows.append({
                 'name': h.asset_name,
                 'ticker': h.stock_ticker_symbol or '',
                 'sector': h.sector_or_region,
-                'quantity': float(total_quantity),
-                'avg_buy_price': float(avg_buy_price),
-                'avg_buy_price_krw': float(CurrencyConverter.convert_to_krw(avg_buy_price, actual_currency)),
-                'invested_amount': float(invested_amount),
-                'invested_amount_krw': float(CurrencyConverter.convert_to_krw(invested_amount, actual_currency)),
-                'market_value': float(market_value),
-                'market_value_krw': float(CurrencyConverter.convert_to_krw(market_value, actual_currency)),
-                'pnl': float(pnl),
-                'pnl_krw': float(CurrencyConverter.convert_to_krw(pnl, actual_currency)),
-                'pnl_percentage': float(pnl_percentage),
+                'quantity': total_quantity,
+                'avg_buy_price': avg_buy_price,
+                'invested_amount': invested_amount,
+                'market_value': market_value,
+                'pnl': pnl,
+                'pnl_percentage': pnl_percentage,
                 'currency': actual_currency,
-                'country': 'US' if actual_currency == 'USD' else 'KR'
+                'country': 'US' if actual_currency == 'USD' else 'KR',
+                'price_is_stale': price_is_stale,
+                'price_as_of': stock_info.last_close_date if stock_info else None,
+            })
+
+        # 원화 환산은 컬럼 단위로 한 번에 처리
+        currencies = [row['currency'] for row in rows]
+        krw_columns = {
+            column: CurrencyConverter.convert_many([row[column] for row in rows], currencies)
+            for column in ('avg_buy_price', 'invested_amount', 'market_value', 'pnl')
+        }
+
+        results = []
+        for i, row in enumerate(rows):
+            results.append({
+                'name': row['name'],
+                'ticker': row['ticker'],
+                'sector': row['sector'],
+                'quantity': float(row['quantity']),
+                'avg_buy_price': float(row['avg_buy_price']),
+                'avg_buy_price_krw': float(krw_columns['avg_buy_price'][i]),
+                'invested_amount': float(row['invested_amount']),
+                'invested_amount_krw': float(krw_columns['invested_amount'][i]),
+                'market_value': float(row['market_value']),
+                'market_value_krw': float(krw_columns['market_value'][i]),
+                'pnl': float(row['pnl']),
+                'pnl_krw': float(krw_columns['pnl'][i]),
+                'pnl_percentage': float(row['pnl_percentage']),
+                'currency': row['currency'],
+                'country': row['country'],
+                'price_is_stale': row['price_is_stale'],
+                'price_as_of': row['price_as_of'].isoformat() if row['price_as_of'] else None,
             })
         return results
     
     def get_real_estate_holdings(self):
         """부동산 보유 자산 반환"""
-        holdings = PortfolioHolding.objects.filter(user_id=self.user_id, asset_type='real_estate')
+        holdings = self._holdings_of('real_estate')
+        market_values = CurrencyConverter.convert_many(
+            [h.invested_amount for h in holdings], [h.currency_code for h in holdings]
+        )
         return [
             {
                 'name': h.asset_name,
                 'region': h.sector_or_region,
                 'quantity': float(h.total_quantity),
-                'market_value': float(CurrencyConverter.convert_to_krw(h.invested_amount, h.currency_code)),
+                'market_value': float(market_value),
                 'currency': 'KRW'  # 모든 값을 원화로 변환
             }
-            for h in holdings
+            for h, market_value in zip(holdings, market_values)
         ]
     
     def get_sector_breakdown(self):
         """섹터별 분해 반환"""
-        holdings = PortfolioHolding.objects.filter(user_id=self.user_id, asset_type='stock')
+        rows = [(h.sector_or_region, h.invested_amount, h.currency_code) for h in self._holdings_of('stock')]
+        # 통화 변환 적용
+        converted_amounts = CurrencyConverter.convert_many(
+            [amount for _, amount, _ in rows], [code for _, _, code in rows]
+        )
         sector_data = {}
         
-        for holding in holdings:
-            sector = holding.sector_or_region
+        for (sector, _, _), converted_amount in zip(rows, converted_amounts):
             if sector not in sector_data:
                 sector_data[sector] = 0
-            # 통화 변환 적용
-            converted_amount = CurrencyConverter.convert_to_krw(holding.invested_amount, holding.currency_code)
             sector_data[sector] += float(converted_amount)
         
         return sector_data
     
     def get_region_breakdown(self):
         """지역별 분해 반환"""
-        holdings = PortfolioHolding.objects.filter(user_id=self.user_id, asset_type='real_estate')
+        rows = [(h.sector_or_region, h.invested_amount, h.currency_code) for h in self._holdings_of('real_estate')]
+        # 통화 변환 적용
+        converted_amounts = CurrencyConverter.convert_many(
+            [amount for _, amount, _ in rows], [code for _, _, code in rows]
+        )
         region_data = {}
         
-        for holding in holdings:
-            region = holding.sector_or_region
+        for (region, _, _), converted_amount in zip(rows, converted_amounts):
             if region not in region_data:
                 region_data[region] = 0
-            # 통화 변환 적용
-            converted_amount = CurrencyConverter.convert_to_krw(holding.invested_amount, holding.currency_code)
             region_data[region] += float(converted_amount)
         
         return region_data
@@ -493,38 +448,8 @@ class DashboardDataCalculator:
         return journal_entries
     
     def get_journal_statistics(self):
-        """매매일지 통계 반환"""
-        from home.models import Post
-        from accounts.models import User
-        from datetime import datetime, timedelta
-        
-        # Post 모델에서 직접 매매일지 데이터 가져오기
-        posts = Post.objects.filter(user_id=self.user_id)
-        
-        total_entries = posts.count()
-        
-        # asset_type별 분류
-        stock_entries = 0
-        real_estate_entries = 0
-        
-        for post in posts:
-            embed_data = post.embed_payload_json or {}
-            asset_type = embed_data.get('asset_type', 'other')
-            if asset_type == 'stock':
-                stock_entries += 1
-            elif asset_type == 'real_estate':
-                real_estate_entries += 1
-        
-        # 최근 30일간 작성한 매매일지 수
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        recent_entries = posts.filter(created_at__gte=thirty_days_ago).count()
-
-        return {
-            'total_entries': total_entries,
-            'stock_entries': stock_entries,
-            'real_estate_entries': real_estate_entries,
-            'recent_entries': recent_entries
-        }
+        """매매일지 통계 반환 (조건부 집계 한 번, 사용자별 캐시)"""
+        return get_journal_statistics(self.user_id)
 
 def build_total_card_payload(user_id, interval='weekly'):
     """총자산 카드 데이터 생성"""
@@ -538,12 +463,15 @@ def build_asset_line_payload(user_id, asset_type, interval='weekly'):
 
 def build_total_timeseries_payload(user_id, interval='weekly'):
     """총자산 시계열 데이터 생성"""
-    calculator = DashboardDataCalculator(user_id, None, interval)
-    return calculator.get_data_payload()
+    return {
+        'timeseries': get_portfolio_timeseries(user_id, None, interval),
+        'interval': interval,
+        'status': 'success'
+    }
 
 def process_trade_for_portfolio(trade_id):
     """
-    Updates PortfolioHolding and creates a PortfolioSnapshot from a single StockTrade.
+    Updates PortfolioHolding from a single StockTrade.
     This should be the single source of truth for portfolio updates.
     """
     try:
@@ -552,10 +480,8 @@ def process_trade_for_portfolio(trade_id):
         user = journal.user
         stock_info = journal.ticker_symbol
 
-        # It's crucial to recalculate journal aggregates before doing anything else.
-        journal.recalculate_aggregates()
-        # Reload the journal to get the fresh data from the update() call inside recalculate_aggregates
-        journal.refresh_from_db()
+        # Journal aggregates are already current: StockTrade.save() applies the
+        # trade's delta (StockJournal.apply_trade_delta) before calling this.
 
         # Now, update the PortfolioHolding with the fresh data from the journal
         holding, created = PortfolioHolding.objects.update_or_create(
@@ -576,26 +502,9 @@ def process_trade_for_portfolio(trade_id):
             }
         )
 
-        # Then, create a snapshot for the specific date of the trade.
-        # This captures the state of the holding *after* this trade.
-        # A more advanced implementation might need to update all subsequent snapshots,
-        # but for now, this creates the necessary historical record.
-        snapshot, snap_created = PortfolioSnapshot.objects.update_or_create(
-            user_id=user.id,
-            snapshot_date=trade.trade_date,
-            asset_key=holding.asset_key,
-            defaults={
-                'asset_type': 'stock',
-                'stock_ticker_symbol': holding.stock_ticker_symbol,
-                'quantity': journal.net_qty,
-                'avg_buy_price': journal.avg_buy_price,
-                'invested_amount': holding.invested_amount,
-                'market_price': trade.price_per_share, # Use the actual trade price for the snapshot
-                'market_value': Decimal(str(journal.net_qty)) * Decimal(str(trade.price_per_share)),
-                'currency_code': holding.currency_code,
-            }
-        )
-        print(f"Processed trade {trade.id}, {'created' if snap_created else 'updated'} snapshot for {trade.trade_date}.")
+        # Daily snapshots are written only by the timeseries engine; StockTrade.save()
+        # rewinds its watermark (mark_timeseries_stale) after calling this.
+        print(f"Processed trade {trade.id}, {'created' if created else 'updated'} holding {holding.asset_key}.")
 
     except StockTrade.DoesNotExist:
         print(f"StockTrade with id={trade_id} not found.")
@@ -4,6 +4,7 @@ Django settings for finote project.
 from pathlib import Path
 from decouple import config
 import os
+import tempfile
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -85,6 +86,19 @@ DATABASES = {
 }
 
 
+# Cache
+# 대시보드 캐시 버전은 gunicorn 워커/관리 명령/백그라운드 스레드가 함께 봐야 하므로
+# 프로세스별 LocMem 대신 같은 호스트에서 공유되는 파일 캐시 사용
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('CACHE_DIR', default=os.path.join(tempfile.gettempdir(), 'finote_cache')),
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from home.models import PAYLOAD_COLUMNS, Post, payload_columns
+
+
+class Command(BaseCommand):
+    help = 'Fills Post.asset_type / ticker_symbol / trade_date from embed_payload_json in primary-key batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Posts read and written per batch')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count posts whose columns differ from their payload',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        last_id = 0
+        scanned = changed_total = 0
+        while True:
+            batch = list(
+                Post.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .only('id', 'embed_payload_json', *PAYLOAD_COLUMNS)[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+            scanned += len(batch)
+
+            changed = []
+            for post in batch:
+                values = payload_columns(post.embed_payload_json)
+                if any(getattr(post, field) != value for field, value in values.items()):
+                    for field, value in values.items():
+                        setattr(post, field, value)
+                    changed.append(post)
+            # bulk_update 는 save() 를 거치지 않으므로 포트폴리오 갱신이 다시 돌지 않음
+            if changed and not options['dry_run']:
+                Post.objects.bulk_update(changed, list(PAYLOAD_COLUMNS))
+            changed_total += len(changed)
+
+        verb = 'would update' if options['dry_run'] else 'updated'
+        self.stdout.write(self.style.SUCCESS(f'Scanned {scanned} posts, {verb} {changed_total}.'))
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from home.services.news import NEWS_FEEDS, ingest_news
+
+
+class Command(BaseCommand):
+    help = 'Fetches the finance RSS feeds (conditional GET) and stores new articles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--feed',
+            action='append',
+            help='Feed URL to fetch (repeatable, default: built-in feeds)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Concurrent feed requests (default: 4)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running and ingest every N seconds (default: run once)',
+        )
+
+    def handle(self, *args, **options):
+        feeds = options['feed'] or NEWS_FEEDS
+        while True:
+            started = time.monotonic()
+            results = ingest_news(feeds, workers=options['workers'])
+            for result in results:
+                if result.error:
+                    status = f'error: {result.error}'
+                elif result.not_modified:
+                    status = 'not modified'
+                else:
+                    status = f'{len(result.articles)} articles'
+                self.stdout.write(f'{result.url}: {status}')
+            self.stdout.write(self.style.SUCCESS(f'Done in {time.monotonic() - started:.1f}s'))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
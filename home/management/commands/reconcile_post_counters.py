@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from home.services.counters import COUNTER_MODELS, find_drifted_posts, reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Compares the denormalized Post like/comment/bookmark/share counters with the related rows and repairs drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report drifted posts without updating them',
+        )
+
+    def handle(self, *args, **options):
+        drifted = find_drifted_posts()
+        for row in drifted:
+            changes = ', '.join(
+                f"{field} {row[field]} -> {row[f'actual_{field}']}"
+                for field in COUNTER_MODELS
+                if row[field] != row[f'actual_{field}']
+            )
+            self.stdout.write(self.style.WARNING(f"Post {row['id']}: {changes}"))
+
+        if drifted and not options['dry_run']:
+            fixed = reconcile_counters(row['id'] for row in drifted)
+            self.stdout.write(self.style.SUCCESS(f'Reconciled {fixed} posts.'))
+
+        self.stdout.write(self.style.SUCCESS(f'{len(drifted)} posts drifted.'))
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from home.services.market_panel import MARKET_PERIODS, refresh_market_panel
+
+
+class Command(BaseCommand):
+    help = 'Precomputes the home market panel (indices, stocks, FX) for every period.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--period',
+            action='append',
+            choices=MARKET_PERIODS,
+            help='Period to refresh (repeatable, default: all)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Parallel upstream fetches (default: 4)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running and refresh every N seconds (default: run once)',
+        )
+
+    def handle(self, *args, **options):
+        periods = options['period'] or MARKET_PERIODS
+        while True:
+            started = time.monotonic()
+            try:
+                written = refresh_market_panel(periods, workers=options['workers'])
+                self.stdout.write(self.style.SUCCESS(
+                    f'Refreshed {written} periods in {time.monotonic() - started:.1f}s'
+                ))
+            except Exception as e:
+                # 스케줄 모드에서는 한 번 실패해도 다음 주기에 재시도
+                self.stderr.write(f'시장 패널 갱신 실패: {e}')
+                if not options['interval']:
+                    raise
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
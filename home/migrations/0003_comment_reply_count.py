@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:00
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_reply_count(apps, schema_editor):
+    Comment = apps.get_model('home', 'Comment')
+    replies = (
+        Comment.objects.filter(parent=OuterRef('pk'))
+        .order_by()
+        .values('parent')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    Comment.objects.update(
+        reply_count=Coalesce(Subquery(replies, output_field=IntegerField()), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0002_post_cursor_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['journal', 'parent', 'created_at', 'id'], name='comment_thread_idx'),
+        ),
+        migrations.RunPython(backfill_reply_count, migrations.RunPython.noop),
+    ]
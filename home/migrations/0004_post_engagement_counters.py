@@ -0,0 +1,58 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:03
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Post = apps.get_model('home', 'Post')
+
+    def counted(model_name):
+        model = apps.get_model('home', model_name)
+        rows = (
+            model.objects.filter(journal=OuterRef('pk'))
+            .order_by()
+            .values('journal')
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        return Coalesce(Subquery(rows, output_field=IntegerField()), Value(0))
+
+    Post.objects.update(
+        likes_count=counted('Like'),
+        comments_count=counted('Comment'),
+        bookmarks_count=counted('Bookmark'),
+        shares_count=counted('Share'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0003_comment_reply_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='bookmarks_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='shares_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0004_post_engagement_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarketPanelSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(max_length=10, unique=True)),
+                ('payload', models.JSONField(default=dict)),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'market_panel_snapshots',
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0005_market_panel_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsFeedState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500, unique=True)),
+                ('etag', models.CharField(blank=True, default='', max_length=255)),
+                ('last_modified', models.CharField(blank=True, default='', max_length=64)),
+                ('checked_at', models.DateTimeField(blank=True, null=True)),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'news_feed_states',
+            },
+        ),
+        migrations.CreateModel(
+            name='NewsArticle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('link', models.URLField(max_length=500, unique=True)),
+                ('title', models.CharField(max_length=500)),
+                ('summary', models.TextField(blank=True, default='')),
+                ('image_url', models.URLField(blank=True, max_length=500, null=True)),
+                ('news_source', models.CharField(default='default', max_length=20)),
+                ('feed_url', models.URLField(max_length=500)),
+                ('published_at', models.DateTimeField()),
+                ('fetched_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'news_articles',
+                'ordering': ['-published_at', '-id'],
+                'indexes': [models.Index(fields=['-published_at', '-id'], name='news_recent_idx')],
+            },
+        ),
+    ]
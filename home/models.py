@@ -1,5 +1,33 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.conf import settings
+from django.utils.dateparse import parse_date
+
+from dashboard.services.journal_stats import invalidate_journal_statistics
+from dashboard.services.payload_cache import bump_dashboard_version
+
+
+# embed_payload_json 에서 뽑아 인덱스 컬럼으로 저장하는 필드
+PAYLOAD_COLUMNS = ('asset_type', 'ticker_symbol', 'trade_date')
+
+
+def payload_columns(payload):
+    """embed_payload_json -> {asset_type, ticker_symbol, trade_date} (없거나 잘못된 값은 빈 값)"""
+    payload = payload if isinstance(payload, dict) else {}
+    trade_date = None
+    raw_date = payload.get('trade_date') or payload.get('date')
+    if raw_date:
+        try:
+            trade_date = parse_date(str(raw_date)[:10])
+        except ValueError:
+            trade_date = None
+    return {
+        'asset_type': str(payload.get('asset_type') or '')[:20],
+        'ticker_symbol': str(payload.get('ticker_symbol') or '').strip()[:20],
+        'trade_date': trade_date,
+    }
+
 
 class Tag(models.Model):
     name = models.CharField(max_length=50, unique=True)  
@@ -28,6 +56,10 @@ class Post(models.Model):
     ]
     embed_style = models.CharField(max_length=20, choices=EMBED_STYLE_CHOICES, default='classic')
     embed_payload_json = models.JSONField()
+    # embed_payload_json 에서 저장 시 채우는 조회용 컬럼 (backfill_post_columns 로 기존 글 채움)
+    asset_type = models.CharField(max_length=20, blank=True, default='')
+    ticker_symbol = models.CharField(max_length=20, blank=True, default='')
+    trade_date = models.DateField(blank=True, null=True)
     
     content = models.TextField()
     screenshot_url = models.URLField(blank=True, null=True)
@@ -36,14 +68,34 @@ class Post(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # 반응 수 (비정규화, F() 로 증감 / reconcile_post_counters 로 보정)
+    likes_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
+    bookmarks_count = models.PositiveIntegerField(default=0)
+    shares_count = models.PositiveIntegerField(default=0)
+    
     def save(self, *args, **kwargs):
         """매매일지 저장 시 포트폴리오 데이터 자동 업데이트"""
+        for field, value in payload_columns(self.embed_payload_json).items():
+            setattr(self, field, value)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'embed_payload_json' in update_fields:
+            kwargs['update_fields'] = {*update_fields, *PAYLOAD_COLUMNS}
         super().save(*args, **kwargs)
+        invalidate_journal_statistics(self.user_id)
+        bump_dashboard_version(self.user_id)
         
         # 매매일지가 거래와 관련된 경우에만 포트폴리오 업데이트
         if self.stock_trade_id or self.re_deal_id or self._has_trade_data():
             self._update_portfolio_data()
     
+    def delete(self, *args, **kwargs):
+        user_id = self.user_id
+        result = super().delete(*args, **kwargs)
+        invalidate_journal_statistics(user_id)
+        bump_dashboard_version(user_id)
+        return result
+
     def _has_trade_data(self):
         """embed_payload_json에 거래 데이터가 있는지 확인"""
         if not self.embed_payload_json:
@@ -56,9 +108,8 @@ class Post(models.Model):
     def _update_portfolio_data(self):
         """포트폴리오 데이터 업데이트"""
         try:
-            from dashboard.models import PortfolioHolding, PortfolioSnapshot
+            from dashboard.models import PortfolioHolding
             from decimal import Decimal
-            from datetime import date
             
             # 거래 데이터에서 정보 추출
             embed_data = self.embed_payload_json or {}
@@ -95,74 +146,10 @@ class Post(models.Model):
                     if sector and not holding.sector_or_region:
                         holding.sector_or_region = sector
                     holding.save()
-                
-                # PortfolioSnapshot 업데이트
-                today = date.today()
-                snapshot, created = PortfolioSnapshot.objects.get_or_create(
-                    user_id=self.user.id,
-                    snapshot_date=today,
-                    asset_key=asset_key,
-                    defaults={
-                        'asset_type': 'stock',
-                        'stock_ticker_symbol': embed_data.get('ticker_symbol', ''),
-                        'quantity': Decimal('0'),
-                        'avg_buy_price': Decimal('0'),
-                        'invested_amount': Decimal('0'),
-                        'market_price': Decimal('0'),
-                        'market_value': Decimal('0'),
-                        'currency_code': embed_data.get('currency_code', 'KRW')
-                    }
-                )
-                
-            elif self.re_deal_id:
-                # 부동산 거래인 경우
-                asset_key = f"re:{self.re_deal_id}"
-                asset_name = embed_data.get('property_name', f'부동산 {self.re_deal_id}')
-                region = embed_data.get('region', '기타')
-                
-                # PortfolioHolding 업데이트
-                holding, created = PortfolioHolding.objects.get_or_create(
-                    user_id=self.user.id,
-                    asset_key=asset_key,
-                    defaults={
-                        'asset_type': 'real_estate',
-                        'property_info_id': self.re_deal_id,
-                        'asset_name': asset_name,
-                        'sector_or_region': region,
-                        'currency_code': embed_data.get('currency_code', 'KRW'),
-                        'total_quantity': Decimal('1'),
-                        'invested_amount': Decimal('0'),
-                        'realized_profit': Decimal('0'),
-                        'total_buy_amount': Decimal('0'),
-                        'total_sell_amount': Decimal('0')
-                    }
-                )
-                
-                if not created:
-                    if asset_name and not holding.asset_name:
-                        holding.asset_name = asset_name
-                    if region and not holding.sector_or_region:
-                        holding.sector_or_region = region
-                    holding.save()
-                
-                # PortfolioSnapshot 업데이트
-                today = date.today()
-                snapshot, created = PortfolioSnapshot.objects.get_or_create(
-                    user_id=self.user.id,
-                    snapshot_date=today,
-                    asset_key=asset_key,
-                    defaults={
-                        'asset_type': 'real_estate',
-                        'property_info_id': self.re_deal_id,
-                        'quantity': Decimal('1'),
-                        'avg_buy_price': Decimal('0'),
-                        'invested_amount': Decimal('0'),
-                        'market_price': Decimal('0'),
-                        'market_value': Decimal('0'),
-                        'currency_code': embed_data.get('currency_code', 'KRW')
-                    }
-                )
-                
+
+            # 부동산 보유 현황은 REDeal.save() 가 계약의 부동산 id 기준으로 갱신하고,
+            # 일별 스냅샷은 시계열 엔진만 씀 (거래/계약 저장 시 워터마크만 되돌림)
+
         except Exception as e:
             # 포트폴리오 업데이트 실패해도 매매일지 저장은 계속 진행
             print(f"포트폴리오 데이터 업데이트 실패: {e}")
@@ -170,9 +157,40 @@ class Post(models.Model):
     class Meta:
         ordering = ['-created_at']
         db_table = 'journal_posts'
+        indexes = [
+            # 피드/프로필 커서 페이지네이션 (created_at, id) 키
+            models.Index(fields=['-created_at', '-id'], name='post_feed_cursor_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='post_user_cursor_idx'),
+            # 종목별 글 / 자산 유형 집계 / 거래일 조회
+            models.Index(fields=['user', 'ticker_symbol', '-created_at'], name='post_user_ticker_idx'),
+            models.Index(fields=['user', 'asset_type'], name='post_user_asset_idx'),
+            models.Index(fields=['user', 'trade_date'], name='post_user_trade_date_idx'),
+        ]
+
+
+def _bump_post_counter(post_id, field, delta):
+    """Post 반응 수를 F() 로 증감 (0 미만으로 내려가지 않음)"""
+    Post.objects.filter(pk=post_id).update(**{field: Greatest(F(field) + delta, 0)})
+
+
+class PostCounterMixin:
+    """생성/삭제 시 journal 의 counter_field 를 함께 갱신"""
+    counter_field = None
 
+    def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        super().save(*args, **kwargs)
+        if is_new:
+            _bump_post_counter(self.journal_id, self.counter_field, 1)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        _bump_post_counter(self.journal_id, self.counter_field, -1)
+        return result
 
-class Like(models.Model):
+
+class Like(PostCounterMixin, models.Model):
+    counter_field = 'likes_count'
     journal = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='likes')
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)  # CREATE_AT
@@ -181,7 +199,8 @@ class Like(models.Model):
         unique_together = ('journal', 'user')
         db_table = 'likes_table'
 
-class Bookmark(models.Model):
+class Bookmark(PostCounterMixin, models.Model):
+    counter_field = 'bookmarks_count'
     journal = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='bookmarks')
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)  # CREATE_AT
@@ -190,7 +209,8 @@ class Bookmark(models.Model):
         unique_together = ('journal', 'user')
         db_table = 'bookmarks_table'
 
-class Share(models.Model):
+class Share(PostCounterMixin, models.Model):
+    counter_field = 'shares_count'
     journal = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='shares')
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -206,10 +226,35 @@ class Comment(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)  # CREATE_AT
     is_edited = models.BooleanField(default=False)
+    # 직속 대댓글 수 (비정규화, 답글 지연 로딩용)
+    reply_count = models.PositiveIntegerField(default=0)
+    
+    def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        super().save(*args, **kwargs)
+        if is_new:
+            _bump_post_counter(self.journal_id, 'comments_count', 1)
+        if is_new and self.parent_id:
+            Comment.objects.filter(pk=self.parent_id).update(reply_count=F('reply_count') + 1)
+    
+    def delete(self, *args, **kwargs):
+        parent_id = self.parent_id
+        result = super().delete(*args, **kwargs)
+        # 하위 대댓글도 CASCADE 로 함께 삭제되므로 삭제된 댓글 수 전체를 차감
+        removed = result[1].get(self._meta.label, 0)
+        if removed:
+            _bump_post_counter(self.journal_id, 'comments_count', -removed)
+        if parent_id:
+            Comment.objects.filter(pk=parent_id, reply_count__gt=0).update(reply_count=F('reply_count') - 1)
+        return result
     
     class Meta:
         ordering = ['created_at']
         db_table = 'comments_table'
+        indexes = [
+            # 게시글별 스레드 커서 페이지네이션
+            models.Index(fields=['journal', 'parent', 'created_at', 'id'], name='comment_thread_idx'),
+        ]
 
 class PostReport(models.Model):
     REPORT_REASONS = [
@@ -238,4 +283,42 @@ class HiddenPost(models.Model):
     
     class Meta:
         unique_together = ('user', 'journal')
-        db_table = 'hidden_posts_table'
\ No newline at end of file
+        db_table = 'hidden_posts_table'
+class MarketPanelSnapshot(models.Model):
+    """홈 시장 패널(지수/개별주식/환율) 기간별 사전 계산 결과"""
+    period = models.CharField(max_length=10, unique=True)  # '1d', '5d', '1mo' ...
+    payload = models.JSONField(default=dict)  # {'indices': [...], 'stocks': [...], 'exchange': [...]}
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'market_panel_snapshots'
+
+class NewsFeedState(models.Model):
+    """RSS 피드별 조건부 요청 상태 (ETag / Last-Modified)"""
+    url = models.URLField(max_length=500, unique=True)
+    etag = models.CharField(max_length=255, blank=True, default='')
+    last_modified = models.CharField(max_length=64, blank=True, default='')
+    checked_at = models.DateTimeField(null=True, blank=True)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'news_feed_states'
+
+
+class NewsArticle(models.Model):
+    """RSS 에서 수집한 뉴스 기사 (link 기준 중복 제거)"""
+    link = models.URLField(max_length=500, unique=True)
+    title = models.CharField(max_length=500)
+    summary = models.TextField(blank=True, default='')
+    image_url = models.URLField(max_length=500, blank=True, null=True)
+    news_source = models.CharField(max_length=20, default='default')
+    feed_url = models.URLField(max_length=500)
+    published_at = models.DateTimeField()
+    fetched_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'news_articles'
+        ordering = ['-published_at', '-id']
+        indexes = [
+            models.Index(fields=['-published_at', '-id'], name='news_recent_idx'),
+        ]
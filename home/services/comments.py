@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from home.models import Comment
+from home.services.feed import decode_cursor, encode_cursor
+
+__all__ = [
+    "load_comment_threads",
+    "load_replies",
+    "serialize_comment",
+]
+
+
+def serialize_comment(comment) -> Dict[str, Any]:
+    return {
+        'id': comment.id,
+        'my_ID': comment.user.my_ID,
+        'nickname': comment.user.nickname,
+        'content': comment.content,
+        'is_edited': comment.is_edited,
+        'created_at': comment.created_at.strftime('%Y-%m-%d %H:%M'),
+    }
+
+
+def _after(cursor: Optional[str]) -> Q:
+    """Keyset condition for ascending (created_at, id) order."""
+    if not cursor:
+        return Q()
+    created_at, pk = decode_cursor(cursor)
+    return Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+
+
+def load_comment_threads(post_id, cursor: Optional[str] = None, limit: int = 20,
+                         reply_preview: int = 3) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of top-level comments with their first `reply_preview` replies, in one query.
+
+    The page of top-level ids is a LIMITed subquery and replies are cut per thread with a
+    ROW_NUMBER() window, so the database returns exactly the rows that are rendered.
+    Raises InvalidCursor for a malformed cursor.
+    """
+    page_ids = (
+        Comment.objects.filter(_after(cursor), journal_id=post_id, parent__isnull=True)
+        .order_by('created_at', 'id')
+        .values('id')[:limit + 1]
+    )
+    rows = (
+        Comment.objects.filter(Q(id__in=page_ids) | Q(parent_id__in=page_ids))
+        .select_related('user')
+        .annotate(thread_rank=Window(
+            RowNumber(),
+            partition_by=[F('parent_id')],
+            order_by=[F('created_at').asc(), F('id').asc()],
+        ))
+        .filter(Q(parent__isnull=True) | Q(thread_rank__lte=reply_preview))
+        .order_by('created_at', 'id')
+    )
+
+    threads, replies = [], {}
+    for comment in rows:
+        if comment.parent_id is None:
+            threads.append(comment)
+        else:
+            replies.setdefault(comment.parent_id, []).append(comment)
+
+    next_cursor = None
+    if len(threads) > limit:
+        threads = threads[:limit]
+        next_cursor = encode_cursor(threads[-1])
+
+    data = []
+    for comment in threads:
+        preview = replies.get(comment.id, [])
+        item = serialize_comment(comment)
+        item.update({
+            'replies': [serialize_comment(reply) for reply in preview],
+            'replies_count': comment.reply_count,
+            'has_more_replies': comment.reply_count > len(preview),
+            'replies_cursor': encode_cursor(preview[-1]) if preview else None,
+        })
+        data.append(item)
+    return data, next_cursor
+
+
+def load_replies(comment_id, cursor: Optional[str] = None,
+                 limit: int = 20) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Direct replies of one comment after `cursor`, for lazily expanding a thread."""
+    replies = list(
+        Comment.objects.filter(_after(cursor), parent_id=comment_id)
+        .select_related('user')
+        .order_by('created_at', 'id')[:limit + 1]
+    )
+    next_cursor = None
+    if len(replies) > limit:
+        replies = replies[:limit]
+        next_cursor = encode_cursor(replies[-1])
+    return [serialize_comment(reply) for reply in replies], next_cursor
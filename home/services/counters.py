@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from typing import Dict, List
+
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from home.models import Bookmark, Comment, Like, Post, Share
+
+__all__ = [
+    "COUNTER_MODELS",
+    "count_subquery",
+    "find_drifted_posts",
+    "reconcile_counters",
+]
+
+
+# Post counter column -> related model that is counted
+COUNTER_MODELS = {
+    "likes_count": Like,
+    "comments_count": Comment,
+    "bookmarks_count": Bookmark,
+    "shares_count": Share,
+}
+
+
+def count_subquery(model):
+    """Per-post row count as a correlated subquery (several can be combined without JOIN fan-out)."""
+    counts = (
+        model.objects.filter(journal=OuterRef("pk"))
+        .order_by()
+        .values("journal")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def find_drifted_posts(queryset=None) -> List[Dict]:
+    """Posts whose stored counters differ from the related row counts, with both values."""
+    if queryset is None:
+        queryset = Post.objects.all()
+    actual = {f"actual_{field}": count_subquery(model) for field, model in COUNTER_MODELS.items()}
+    drift = Q()
+    for field in COUNTER_MODELS:
+        drift |= ~Q(**{field: F(f"actual_{field}")})
+    return list(
+        queryset.order_by().annotate(**actual).filter(drift)
+        .values("id", *COUNTER_MODELS, *actual)
+    )
+
+
+def reconcile_counters(post_ids) -> int:
+    """Rewrites every counter of the given posts from the related tables in one UPDATE."""
+    return Post.objects.filter(id__in=list(post_ids)).update(
+        **{field: count_subquery(model) for field, model in COUNTER_MODELS.items()}
+    )
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db.models import Exists, OuterRef, Q, Value
+
+from home.models import Bookmark, Like, Post, Share
+
+__all__ = [
+    "InvalidCursor",
+    "annotate_feed",
+    "decode_cursor",
+    "encode_cursor",
+    "feed_queryset",
+    "paginate_by_cursor",
+    "serialize_post",
+]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def annotate_feed(queryset, user=None):
+    """Annotate the viewer's like/bookmark/share flags in the same query.
+
+    Counters are denormalized columns on Post; flags are False for anonymous users.
+    """
+    if user is not None and user.is_authenticated:
+        return queryset.annotate(
+            is_liked_by_user=Exists(Like.objects.filter(journal=OuterRef("pk"), user=user)),
+            is_bookmarked_by_user=Exists(Bookmark.objects.filter(journal=OuterRef("pk"), user=user)),
+            is_shared_by_user=Exists(Share.objects.filter(journal=OuterRef("pk"), user=user)),
+        )
+    return queryset.annotate(
+        is_liked_by_user=Value(False),
+        is_bookmarked_by_user=Value(False),
+        is_shared_by_user=Value(False),
+    )
+
+
+def feed_queryset(user=None, queryset=None):
+    """Posts for feed rendering: author joined, tags prefetched, viewer flags annotated."""
+    if queryset is None:
+        queryset = Post.objects.all()
+    queryset = queryset.select_related("user").prefetch_related("tags")
+    return annotate_feed(queryset, user)
+
+
+def serialize_post(post) -> Dict[str, Any]:
+    """JSON shape used by the infinite-scroll endpoint for one feed_queryset row."""
+    return {
+        'id': post.id,
+        'username': post.user.my_ID,
+        'my_ID': post.user.my_ID,
+        'content': post.content,
+        'image_url': post.image.url if post.image else None,
+        'screenshot_url': post.screenshot_url,
+        'created_at': post.created_at.strftime('%Y-%m-%d %H:%M'),
+        'likes_count': post.likes_count,
+        'comments_count': post.comments_count,
+        'bookmarks_count': post.bookmarks_count,
+        'shares_count': post.shares_count,
+        'is_liked': post.is_liked_by_user,
+        'is_bookmarked': post.is_bookmarked_by_user,
+        'tags': [tag.name for tag in post.tags.all()],
+    }
+
+
+def encode_cursor(post) -> str:
+    """Opaque token for the (created_at, id) position of the last post on a page."""
+    raw = f"{post.created_at.isoformat()}|{post.pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        created_at, pk = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(str(e))
+
+
+def paginate_by_cursor(queryset, cursor: Optional[str], limit: int) -> Tuple[List[Post], Optional[str]]:
+    """Keyset page over (-created_at, -id): no OFFSET and no COUNT(*).
+
+    Returns the page and the cursor for the next one (None on the last page).
+    Raises InvalidCursor for a malformed cursor.
+    """
+    queryset = queryset.order_by("-created_at", "-id")
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    # One extra row tells whether another page exists
+    posts = list(queryset[:limit + 1])
+    if len(posts) > limit:
+        return posts[:limit], encode_cursor(posts[limit - 1])
+    return posts, None
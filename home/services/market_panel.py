@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, Iterable, List, Sequence
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from dashboard.models import DailyPrice
+from dashboard.services.fx import FX_SYMBOLS
+from dashboard.services.prices import ensure_history, period_to_days
+from home.models import MarketPanelSnapshot
+
+__all__ = [
+    "MARKET_PERIODS",
+    "build_panel",
+    "get_market_panel",
+    "get_market_section",
+    "refresh_market_panel",
+]
+
+
+MARKET_PERIODS = ("1d", "5d", "1mo", "6mo", "1y", "5y")
+SECTIONS = ("indices", "stocks", "exchange")
+
+# 이 시간이 지난 스냅샷은 읽을 때 백그라운드 갱신을 시작
+PANEL_TTL_SECONDS = getattr(settings, "MARKET_PANEL_TTL_SECONDS", 10 * 60)
+
+INDICES = [
+    {"name": "KOSPI", "symbol": "^KS11"},
+    {"name": "KOSDAQ", "symbol": "^KQ11"},
+    {"name": "NASDAQ", "symbol": "^IXIC"},
+    {"name": "S&P500", "symbol": "^GSPC"},
+]
+
+STOCKS = [
+    {"name": "테슬라", "symbol": "TSLA", "market": "US"},
+    {"name": "엔비디아", "symbol": "NVDA", "market": "US"},
+    {"name": "애플", "symbol": "AAPL", "market": "US"},
+    {"name": "삼성전자", "symbol": "005930", "market": "KR"},
+    {"name": "SK하이닉스", "symbol": "000660", "market": "KR"},
+    {"name": "카카오", "symbol": "035720", "market": "KR"},
+]
+
+EXCHANGE_PAIRS = [
+    {"name": f"{code}/KRW", "symbol": code, "ticker": FX_SYMBOLS[code]}
+    for code in ("USD", "JPY", "EUR", "CNY")
+]
+
+# 환율은 1달까지만 제공 (화면에서도 장기간 선택을 막음)
+EXCHANGE_PERIODS = ("1d", "5d", "1mo")
+
+_refresh_lock = threading.Lock()
+
+
+def _symbols() -> List[str]:
+    return [item["symbol"] for item in INDICES + STOCKS] + [pair["ticker"] for pair in EXCHANGE_PAIRS]
+
+
+def _lookback_days(period: str) -> int:
+    # 단기 기간도 휴장일 대비 한 달치를 본다
+    if period in ("1d", "5d"):
+        return period_to_days("1mo")
+    return period_to_days(period)
+
+
+def _change(closes: Sequence[float], period: str):
+    """(current, change, change_percent) with the comparison point the panel has always used."""
+    current = closes[-1]
+    if period == "1d":
+        prev = closes[-2] if len(closes) >= 2 else current
+    elif period == "5d":
+        prev = closes[-5] if len(closes) >= 5 else closes[0]
+    else:
+        prev = closes[0]
+    change = current - prev
+    change_percent = (change / prev) * 100 if prev != 0 else 0
+    return current, change, change_percent
+
+
+def build_panel(period: str, closes_by_symbol: Dict[str, List[float]]) -> Dict[str, list]:
+    """Panel JSON for one period from daily closes (oldest first) per symbol."""
+    indices = []
+    for item in INDICES:
+        closes = closes_by_symbol.get(item["symbol"])
+        if not closes:
+            print(f"데이터 부족: {item['name']}")
+            indices.append({
+                **item, "current_price": 0, "change": 0, "change_percent": 0,
+                "is_positive": True, "period": period, "error": True,
+            })
+            continue
+        current, change, change_percent = _change(closes, period)
+        indices.append({
+            **item,
+            "current_price": round(current, 2),
+            "change": round(change, 2),
+            "change_percent": round(change_percent, 2),
+            "is_positive": bool(change >= 0),
+            "period": period,
+        })
+
+    stocks = []
+    for item in STOCKS:
+        closes = closes_by_symbol.get(item["symbol"])
+        if not closes:
+            continue
+        current, change, change_percent = _change(closes, period)
+        is_kr = item["market"] == "KR"
+        stocks.append({
+            **item,
+            "current_price": int(current) if is_kr else round(current, 2),
+            "change": int(change) if is_kr else round(change, 2),
+            "change_percent": round(change_percent, 2),
+            "is_positive": bool(change >= 0),
+            "period": period,
+        })
+
+    exchange = []
+    if period in EXCHANGE_PERIODS:
+        for pair in EXCHANGE_PAIRS:
+            closes = closes_by_symbol.get(pair["ticker"])
+            if not closes:
+                continue
+            current, change, change_percent = _change(closes, period)
+            exchange.append({
+                "name": pair["name"],
+                "symbol": pair["symbol"],
+                "current_rate": round(current, 2 if pair["symbol"] == "JPY" else 0),
+                "change": round(change, 1),
+                "change_percent": round(change_percent, 2),
+                "is_positive": change_percent >= 0,
+                "period": period,
+            })
+
+    return {"indices": indices, "stocks": stocks, "exchange": exchange}
+
+
+def refresh_market_panel(periods: Iterable[str] = MARKET_PERIODS, workers: int = 4) -> int:
+    """
+    Recomputes the panel for every period and upserts one MarketPanelSnapshot per period.
+
+    Upstream data goes through the daily price store, so every symbol is fetched at
+    most once per refresh (only the missing range, batched and in parallel) and all
+    periods are sliced from the same closes. Returns the number of periods written.
+    """
+    periods = [p for p in periods if p in MARKET_PERIODS]
+    if not periods:
+        return 0
+    today = timezone.localdate()
+    start = today - timedelta(days=max(_lookback_days(p) for p in periods))
+    symbols = _symbols()
+    ensure_history(symbols, start, today, workers=workers)
+
+    bars = defaultdict(list)
+    rows = (
+        DailyPrice.objects.filter(ticker__in=symbols, date__gte=start, date__lte=today)
+        .order_by("ticker", "date")
+        .values_list("ticker", "date", "close")
+    )
+    for ticker, day, close in rows:
+        bars[ticker].append((day, float(close)))
+
+    now = timezone.now()
+    snapshots = []
+    for period in periods:
+        since = today - timedelta(days=_lookback_days(period))
+        closes = {ticker: [close for day, close in series if day >= since] for ticker, series in bars.items()}
+        snapshots.append(MarketPanelSnapshot(period=period, payload=build_panel(period, closes), refreshed_at=now))
+
+    MarketPanelSnapshot.objects.bulk_create(
+        snapshots,
+        update_conflicts=True,
+        unique_fields=["period"],
+        update_fields=["payload", "refreshed_at"],
+    )
+    return len(snapshots)
+
+
+def _background_refresh():
+    try:
+        refresh_market_panel()
+    except Exception as e:
+        print(f"시장 패널 갱신 오류: {e}")
+    finally:
+        connection.close()
+        _refresh_lock.release()
+
+
+def _schedule_refresh():
+    """Starts at most one background refresh per process."""
+    if not getattr(settings, "MARKET_PANEL_BACKGROUND_REFRESH", True):
+        return
+    if not _refresh_lock.acquire(blocking=False):
+        return
+    threading.Thread(target=_background_refresh, daemon=True).start()
+
+
+def get_market_panel(period: str = "1d") -> Dict[str, list]:
+    """
+    Precomputed panel for a period; never calls upstream on the request path.
+
+    A missing or expired snapshot is returned as-is (empty sections when missing)
+    and a background refresh is started.
+    """
+    snapshot = MarketPanelSnapshot.objects.filter(period=period).first()
+    if snapshot is None or (timezone.now() - snapshot.refreshed_at).total_seconds() > PANEL_TTL_SECONDS:
+        if period in MARKET_PERIODS:
+            _schedule_refresh()
+    payload = snapshot.payload if snapshot else {}
+    return {section: payload.get(section, []) for section in SECTIONS}
+
+
+def get_market_section(section: str, period: str = "1d") -> list:
+    return get_market_panel(period).get(section, [])
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import threading
+from calendar import timegm
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import feedparser
+import requests
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from dashboard.services.http import http_client
+from home.models import NewsArticle, NewsFeedState
+
+__all__ = [
+    "NEWS_FEEDS",
+    "FeedResult",
+    "fetch_feed",
+    "get_latest_news",
+    "ingest_news",
+]
+
+
+NEWS_FEEDS = [
+    'https://www.hankyung.com/feed/economy',
+    'https://www.yna.co.kr/rss/economy.xml',
+    'https://kr.investing.com/rss/news_285.rss',
+]
+
+# 마지막 수집 후 이 시간이 지나면 읽을 때 백그라운드 수집을 시작
+NEWS_TTL_SECONDS = getattr(settings, "NEWS_TTL_SECONDS", 10 * 60)
+FETCH_TIMEOUT_SECONDS = 10
+SUMMARY_LENGTH = 100
+
+_ingest_lock = threading.Lock()
+
+
+@dataclass
+class FeedResult:
+    url: str
+    status_code: Optional[int] = None
+    etag: str = ""
+    last_modified: str = ""
+    articles: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == 304
+
+
+def _news_source(link: str) -> str:
+    if 'hankyung' in link:
+        return 'hankyung'
+    if 'yna.co.kr' in link:
+        return 'yonhap'
+    if 'investing.com' in link:
+        return 'investing'
+    return 'default'
+
+
+def _normalize(entry, feed_url: str, now) -> Optional[Dict[str, Any]]:
+    link = (entry.get('link') or '').strip()
+    title = (entry.get('title') or '').strip()
+    if not link or not title:
+        return None
+    parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+    # feedparser 의 *_parsed 는 UTC struct_time
+    published_at = datetime.fromtimestamp(timegm(parsed), tz=dt_timezone.utc) if parsed else now
+    image_url = None
+    if entry.get('media_content'):
+        image_url = entry.media_content[0].get('url')
+    return {
+        'link': link[:500],
+        'title': title[:500],
+        'summary': entry.get('summary', '')[:SUMMARY_LENGTH] + '...',
+        'image_url': image_url,
+        'news_source': _news_source(link),
+        'feed_url': feed_url,
+        'published_at': min(published_at, now),
+    }
+
+
+def fetch_feed(url: str, etag: str = "", last_modified: str = "",
+               timeout: float = FETCH_TIMEOUT_SECONDS) -> FeedResult:
+    """Conditional GET of one feed; a 304 comes back with no articles and no parsing."""
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    try:
+        response = http_client.get(url, headers=headers, timeout=timeout)
+    except requests.RequestException as e:
+        return FeedResult(url=url, etag=etag, last_modified=last_modified, error=str(e))
+
+    result = FeedResult(
+        url=url,
+        status_code=response.status_code,
+        # 304 응답에 검증자가 없으면 기존 값을 유지
+        etag=response.headers.get('ETag', etag),
+        last_modified=response.headers.get('Last-Modified', last_modified),
+    )
+    if response.status_code != 200:
+        if response.status_code != 304:
+            result.error = f"HTTP {response.status_code}"
+        return result
+
+    now = timezone.now()
+    feed = feedparser.parse(response.content)
+    for entry in feed.entries:
+        article = _normalize(entry, url, now)
+        if article:
+            result.articles.append(article)
+    return result
+
+
+def ingest_news(feeds: Optional[Sequence[str]] = None, workers: int = 4) -> List[FeedResult]:
+    """
+    Fetches every feed concurrently and upserts the articles by link.
+
+    Only the HTTP round trips run in the pool; validators are read before and
+    written after on the calling thread, so unchanged feeds cost one 304 each.
+    """
+    feeds = list(feeds or NEWS_FEEDS)
+    states = {s.url: s for s in NewsFeedState.objects.filter(url__in=feeds)}
+
+    def fetch(url):
+        state = states.get(url)
+        return fetch_feed(url, state.etag if state else "", state.last_modified if state else "")
+
+    if workers > 1 and len(feeds) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(feeds))) as executor:
+            results = list(executor.map(fetch, feeds))
+    else:
+        results = [fetch(url) for url in feeds]
+
+    now = timezone.now()
+    articles = {}
+    for result in results:
+        if result.error:
+            print(f"RSS 수집 오류 ({result.url}): {result.error}")
+        for article in result.articles:
+            articles.setdefault(article['link'], article)
+    if articles:
+        NewsArticle.objects.bulk_create(
+            [NewsArticle(fetched_at=now, **article) for article in articles.values()],
+            update_conflicts=True,
+            unique_fields=['link'],
+            update_fields=['title', 'summary', 'image_url', 'fetched_at'],
+        )
+
+    NewsFeedState.objects.bulk_create(
+        [
+            NewsFeedState(
+                url=result.url,
+                etag=result.etag[:255],
+                last_modified=result.last_modified[:64],
+                checked_at=now,
+                status_code=result.status_code,
+            )
+            for result in results
+        ],
+        update_conflicts=True,
+        unique_fields=['url'],
+        update_fields=['etag', 'last_modified', 'checked_at', 'status_code'],
+    )
+    return results
+
+
+def _background_ingest():
+    try:
+        ingest_news()
+    except Exception as e:
+        print(f"뉴스 수집 오류: {e}")
+    finally:
+        connection.close()
+        _ingest_lock.release()
+
+
+def _schedule_ingest():
+    """Starts at most one background ingest per process."""
+    if not getattr(settings, "NEWS_BACKGROUND_REFRESH", True):
+        return
+    if not _ingest_lock.acquire(blocking=False):
+        return
+    threading.Thread(target=_background_ingest, daemon=True).start()
+
+
+def get_latest_news(limit: int = 9) -> List[Dict[str, Any]]:
+    """Newest stored articles in the shape the sidebar template expects; never fetches inline."""
+    checked = list(
+        NewsFeedState.objects.filter(url__in=NEWS_FEEDS, checked_at__isnull=False)
+        .values_list('checked_at', flat=True)
+    )
+    # 한 번도 수집하지 않은 피드가 있거나 가장 오래된 수집이 TTL 을 넘기면 갱신
+    if len(checked) < len(NEWS_FEEDS) or (timezone.now() - min(checked)).total_seconds() > NEWS_TTL_SECONDS:
+        _schedule_ingest()
+
+    now = timezone.now()
+    return [
+        {
+            'title': article.title,
+            'link': article.link,
+            'published': article.published_at,
+            'minutes_ago': int((now - article.published_at).total_seconds() / 60),
+            'summary': article.summary,
+            'image_url': article.image_url,
+            'news_source': article.news_source,
+        }
+        for article in NewsArticle.objects.all()[:limit]
+    ]
@@ -1,3 +1,359 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from dashboard.models import DailyPrice
+
+from .models import Bookmark, Comment, Like, MarketPanelSnapshot, NewsArticle, NewsFeedState, Post, Share, Tag
+from .services.market_panel import MARKET_PERIODS, refresh_market_panel
+from .services.news import get_latest_news, ingest_news
+
+
+class FeedQueryTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.viewer = User.objects.create_user(
+            my_ID='viewer', email='viewer@example.com', password='password123', nickname='viewer'
+        )
+        self.author = User.objects.create_user(
+            my_ID='author', email='author@example.com', password='password123', nickname='author'
+        )
+        tag = Tag.objects.create(name='주식')
+        self.posts = []
+        for i in range(25):
+            post = Post.objects.create(user=self.author, content=f'post {i}', embed_payload_json={})
+            post.tags.add(tag)
+            Like.objects.create(journal=post, user=self.author)
+            Comment.objects.create(journal=post, user=self.author, content='c')
+            self.posts.append(post)
+        Like.objects.create(journal=self.posts[-1], user=self.viewer)
+        Bookmark.objects.create(journal=self.posts[-1], user=self.viewer)
+        Share.objects.create(journal=self.posts[-2], user=self.viewer)
+
+    def fetch_page(self, cursor=None):
+        params = {'cursor': cursor} if cursor else {}
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('home:load_more_posts'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('COUNT(*)' in q['sql'] for q in ctx.captured_queries))
+        return response.json(), len(ctx.captured_queries)
+
+    def test_load_more_posts_query_count_is_constant(self):
+        self.client.login(my_ID='viewer', password='password123')
+        first, first_queries = self.fetch_page()
+        second, second_queries = self.fetch_page(first['next_cursor'])
+        self.assertEqual(len(first['posts']), 10)
+        self.assertEqual(first_queries, second_queries)
+        self.assertLessEqual(first_queries, 6)
+
+        newest = first['posts'][0]
+        self.assertEqual(newest['likes_count'], 2)
+        self.assertEqual(newest['comments_count'], 1)
+        self.assertEqual(newest['bookmarks_count'], 1)
+        self.assertTrue(newest['is_liked'])
+        self.assertTrue(newest['is_bookmarked'])
+        self.assertFalse(first['posts'][1]['is_liked'])
+        self.assertEqual(first['posts'][1]['shares_count'], 1)
+        self.assertEqual(newest['tags'], ['주식'])
+
+    def test_anonymous_feed_has_no_user_flags(self):
+        data, _ = self.fetch_page()
+        self.assertFalse(any(post['is_liked'] for post in data['posts']))
+
+    def test_cursor_walks_every_post_once_with_timestamp_ties(self):
+        # 같은 created_at 은 id 로 순서 결정
+        Post.objects.filter(id__in=[p.id for p in self.posts[5:15]]).update(
+            created_at=self.posts[10].created_at
+        )
+        seen, cursor = [], None
+        while True:
+            data, _ = self.fetch_page(cursor)
+            seen.extend(post['id'] for post in data['posts'])
+            cursor = data['next_cursor']
+            if not data['has_next']:
+                break
+        self.assertEqual(sorted(seen), sorted(p.id for p in self.posts))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse('home:load_more_posts'), {'cursor': '!!!'})
+        self.assertEqual(response.status_code, 400)
+
+
+class CommentThreadTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            my_ID='writer', email='writer@example.com', password='password123', nickname='writer'
+        )
+        self.post = Post.objects.create(user=self.user, content='post', embed_payload_json={})
+        self.parents = []
+        for i in range(25):
+            parent = Comment.objects.create(journal=self.post, user=self.user, content=f'c{i}')
+            for j in range(i % 6):
+                Comment.objects.create(journal=self.post, user=self.user, parent=parent, content=f'r{i}-{j}')
+            self.parents.append(parent)
+
+    def fetch_comments(self, cursor=None):
+        params = {'cursor': cursor} if cursor else {}
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('home:get_comments', args=[self.post.id]), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json(), len(ctx.captured_queries)
+
+    def test_threads_are_loaded_in_constant_queries(self):
+        first, first_queries = self.fetch_comments()
+        second, second_queries = self.fetch_comments(first['next_cursor'])
+        # 게시글 조회 1 + 스레드 1
+        self.assertEqual(first_queries, 2)
+        self.assertEqual(second_queries, 2)
+        self.assertEqual(len(first['comments']), 20)
+        self.assertTrue(first['has_next'])
+        self.assertEqual([c['content'] for c in second['comments']], [f'c{i}' for i in range(20, 25)])
+        self.assertFalse(second['has_next'])
+
+    def test_reply_preview_and_lazy_load(self):
+        data, _ = self.fetch_comments()
+        thread = data['comments'][5]
+        self.assertEqual(thread['replies_count'], 5)
+        self.assertEqual([r['content'] for r in thread['replies']], ['r5-0', 'r5-1', 'r5-2'])
+        self.assertTrue(thread['has_more_replies'])
+        self.assertFalse(data['comments'][2]['has_more_replies'])
+
+        # 댓글 목록과 같이 비로그인 사용자도 조회 가능
+        url = reverse('home:get_replies', args=[thread['id']])
+        self.assertEqual(self.client.post(url).status_code, 405)
+        response = self.client.get(url, {'cursor': thread['replies_cursor']})
+        self.assertEqual([r['content'] for r in response.json()['replies']], ['r5-3', 'r5-4'])
+
+    def test_reply_count_follows_deletes(self):
+        parent = self.parents[4]
+        parent.refresh_from_db()
+        self.assertEqual(parent.reply_count, 4)
+        Comment.objects.filter(parent=parent).first().delete()
+        parent.refresh_from_db()
+        self.assertEqual(parent.reply_count, 3)
+
+
+class PostCounterTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            my_ID='counter', email='counter@example.com', password='password123', nickname='counter'
+        )
+        self.post = Post.objects.create(user=self.user, content='post', embed_payload_json={})
+        self.client.login(my_ID='counter', password='password123')
+
+    def test_toggle_views_update_counters(self):
+        url = reverse('home:toggle_like', args=[self.post.id])
+        self.assertEqual(self.client.post(url).json()['likes_count'], 1)
+        self.assertEqual(self.client.post(url).json()['likes_count'], 0)
+        response = self.client.post(reverse('home:toggle_bookmark', args=[self.post.id]))
+        self.assertEqual(response.json()['bookmarks_count'], 1)
+        response = self.client.post(reverse('home:toggle_share', args=[self.post.id]))
+        self.assertEqual(response.json()['shares_count'], 1)
+
+        self.post.refresh_from_db()
+        self.assertEqual(
+            (self.post.likes_count, self.post.bookmarks_count, self.post.shares_count), (0, 1, 1)
+        )
+
+    def test_comment_counter_includes_cascaded_replies(self):
+        parent = Comment.objects.create(journal=self.post, user=self.user, content='c')
+        Comment.objects.create(journal=self.post, user=self.user, parent=parent, content='r1')
+        Comment.objects.create(journal=self.post, user=self.user, parent=parent, content='r2')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 3)
+
+        response = self.client.post(reverse('home:delete_comment', args=[parent.id]))
+        self.assertTrue(response.json()['success'])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 0)
+
+    def test_reconcile_command_repairs_drift(self):
+        Like.objects.create(journal=self.post, user=self.user)
+        Post.objects.filter(pk=self.post.pk).update(likes_count=7, comments_count=2)
+        call_command('reconcile_post_counters', '--dry-run', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 7)
+
+        out = StringIO()
+        call_command('reconcile_post_counters', stdout=out)
+        self.assertIn('likes_count 7 -> 1', out.getvalue())
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.likes_count, self.post.comments_count), (1, 0))
+
+
+@override_settings(MARKET_PANEL_BACKGROUND_REFRESH=False)
+class PostPayloadColumnTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            my_ID='columns', email='columns@example.com', password='password123', nickname='columns'
+        )
+
+    def test_columns_follow_payload_on_save(self):
+        post = Post.objects.create(user=self.user, content='buy', embed_payload_json={
+            'asset_type': 'stock', 'ticker_symbol': ' AAPL ', 'trade_date': '2025-03-04',
+        })
+        self.assertEqual((post.asset_type, post.ticker_symbol), ('stock', 'AAPL'))
+        self.assertEqual(post.trade_date.isoformat(), '2025-03-04')
+
+        post.embed_payload_json = {'asset_type': 'real_estate', 'trade_date': 'not a date'}
+        post.save(update_fields=['embed_payload_json'])
+        post.refresh_from_db()
+        self.assertEqual((post.asset_type, post.ticker_symbol, post.trade_date), ('real_estate', '', None))
+
+    def test_backfill_command_fills_existing_rows_in_batches(self):
+        for i in range(5):
+            Post.objects.create(user=self.user, content=f'p{i}', embed_payload_json={
+                'asset_type': 'stock', 'ticker_symbol': f'T{i}', 'trade_date': f'2025-01-0{i + 1}',
+            })
+        # 컬럼 추가 전 상태 재현
+        Post.objects.update(asset_type='', ticker_symbol='', trade_date=None)
+
+        out = StringIO()
+        call_command('backfill_post_columns', batch_size=2, stdout=out)
+        self.assertIn('updated 5', out.getvalue())
+        self.assertEqual(Post.objects.filter(user=self.user, ticker_symbol='T3').get().trade_date.day, 4)
+
+        out = StringIO()
+        call_command('backfill_post_columns', stdout=out)
+        self.assertIn('updated 0', out.getvalue())
+
+
+class MarketPanelTests(TestCase):
+    def setUp(self):
+        today = timezone.localdate()
+        rows = []
+        for ticker, base in [('^KS11', 2500), ('005930', 70000), ('AAPL', 200), ('USDKRW=X', 1300)]:
+            for i in range(40):
+                rows.append(DailyPrice(
+                    ticker=ticker, date=today - timedelta(days=39 - i), close=Decimal(base + i)
+                ))
+        DailyPrice.objects.bulk_create(rows)
+        patcher = mock.patch('home.services.market_panel.ensure_history')
+        self.ensure_history = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_refresh_writes_every_period_from_one_fetch(self):
+        self.assertEqual(refresh_market_panel(), len(MARKET_PERIODS))
+        self.assertEqual(self.ensure_history.call_count, 1)
+
+        panel = MarketPanelSnapshot.objects.get(period='1d').payload
+        kospi = panel['indices'][0]
+        self.assertEqual((kospi['current_price'], kospi['change']), (2539, 1))
+        self.assertTrue(panel['indices'][1]['error'])  # KOSDAQ 데이터 없음
+        samsung = next(s for s in panel['stocks'] if s['symbol'] == '005930')
+        self.assertEqual((samsung['current_price'], samsung['change']), (70039, 1))
+        self.assertEqual(panel['exchange'][0]['current_rate'], 1339)
+        self.assertEqual(MarketPanelSnapshot.objects.get(period='1y').payload['exchange'], [])
+
+    def test_requests_read_snapshot_without_upstream_calls(self):
+        refresh_market_panel(['5d'])
+        self.ensure_history.reset_mock()
+        with mock.patch('home.services.market_panel._schedule_refresh') as schedule:
+            response = self.client.get(reverse('home:financial_data'), {'period': '5d', 'tab': 'stocks'})
+            self.assertFalse(schedule.called)
+            data = response.json()['data']
+            self.assertEqual(data[0]['symbol'], 'AAPL')
+            self.assertEqual(data[0]['change'], 4)
+
+            # 스냅샷이 없는 기간은 빈 목록 + 백그라운드 갱신 예약
+            response = self.client.get(reverse('home:financial_data'), {'period': '1mo', 'tab': 'indices'})
+            self.assertEqual(response.json()['data'], [])
+            self.assertTrue(schedule.called)
+        self.ensure_history.assert_not_called()
+
+
+RSS_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>stub</title>{items}</channel></rss>"""
+RSS_ITEM = """<item><title>{title}</title><link>{link}</link>
+<pubDate>{date}</pubDate><description>{title} 요약</description></item>"""
+
+
+class _StubFeedHandler(BaseHTTPRequestHandler):
+    feeds = {}
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append((self.path, self.headers.get('If-None-Match'), self.headers.get('If-Modified-Since')))
+        body, etag, last_modified = self.feeds[self.path]
+        if (etag and self.headers.get('If-None-Match') == etag) or (
+            last_modified and self.headers.get('If-Modified-Since') == last_modified
+        ):
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml; charset=utf-8')
+        if etag:
+            self.send_header('ETag', etag)
+        if last_modified:
+            self.send_header('Last-Modified', last_modified)
+        self.end_headers()
+        self.wfile.write(body.encode('utf-8'))
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(NEWS_BACKGROUND_REFRESH=False)
+class NewsIngestTests(TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _StubFeedHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        base = f'http://127.0.0.1:{self.server.server_port}'
+        self.feed_a, self.feed_b = f'{base}/a.xml', f'{base}/b.xml'
+
+        def items(*entries):
+            return RSS_TEMPLATE.format(items=''.join(RSS_ITEM.format(title=t, link=l, date=d) for t, l, d in entries))
+
+        _StubFeedHandler.requests_seen = []
+        _StubFeedHandler.feeds = {
+            '/a.xml': (items(
+                ('금리 동결', 'https://news.example.com/1', 'Mon, 06 Oct 2025 01:00:00 GMT'),
+                ('환율 급등', 'https://news.example.com/2', 'Mon, 06 Oct 2025 03:00:00 GMT'),
+            ), '"v1"', None),
+            '/b.xml': (items(
+                ('환율 급등', 'https://news.example.com/2', 'Mon, 06 Oct 2025 03:00:00 GMT'),
+                ('코스피 상승', 'https://www.yna.co.kr/view/3', 'Mon, 06 Oct 2025 02:00:00 GMT'),
+            ), None, 'Mon, 06 Oct 2025 03:00:00 GMT'),
+        }
+
+    def test_ingest_dedupes_by_link_and_skips_unchanged_feeds(self):
+        results = ingest_news([self.feed_a, self.feed_b])
+        self.assertEqual([len(r.articles) for r in results], [2, 2])
+        self.assertEqual(NewsArticle.objects.count(), 3)
+        self.assertEqual(NewsArticle.objects.get(link='https://www.yna.co.kr/view/3').news_source, 'yonhap')
+
+        results = ingest_news([self.feed_a, self.feed_b])
+        self.assertTrue(all(r.not_modified for r in results))
+        conditional = sorted(_StubFeedHandler.requests_seen[2:])
+        self.assertEqual(conditional, [
+            ('/a.xml', '"v1"', None),
+            ('/b.xml', None, 'Mon, 06 Oct 2025 03:00:00 GMT'),
+        ])
+        self.assertEqual(NewsArticle.objects.count(), 3)
+        self.assertEqual(NewsFeedState.objects.get(url=self.feed_a).etag, '"v1"')
+
+    def test_latest_news_reads_stored_articles_newest_first(self):
+        ingest_news([self.feed_a, self.feed_b])
+        with mock.patch('home.services.news._schedule_ingest') as schedule:
+            articles = get_latest_news(limit=2)
+        # 기본 피드는 아직 수집 전이므로 백그라운드 수집 예약
+        self.assertTrue(schedule.called)
+        self.assertEqual([a['title'] for a in articles], ['환율 급등', '코스피 상승'])
+        self.assertEqual(articles[0]['summary'], '환율 급등 요약...')
@@ -26,4 +26,5 @@ urlpatterns = [
     path('comment/<int:comment_id>/edit/', views.edit_comment, name='edit_comment'),
     path('comment/<int:comment_id>/delete/', views.delete_comment, name='delete_comment'),
     path('comment/<int:comment_id>/reply/', views.create_reply, name='create_reply'),
+    path('comment/<int:comment_id>/replies/', views.get_replies, name='get_replies'),
 ]
\ No newline at end of file
@@ -3,123 +3,56 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
 from .models import Post, Like, Comment, Bookmark, Share, Tag
-from django.core.paginator import Paginator
-import feedparser
 from datetime import datetime
-import requests
 from bs4 import BeautifulSoup
 import yfinance as yf
-import FinanceDataReader as fdr
 from django.views.decorators.http import require_http_methods
 import json
 import re
+from home.services.feed import InvalidCursor, feed_queryset, paginate_by_cursor, serialize_post
+from home.services.comments import load_comment_threads, load_replies
+from home.services.market_panel import get_market_panel, get_market_section
+from home.services.news import get_latest_news
 from home.services.trading import (
     build_embed_payload_from_payload,
     create_real_estate_journal_from_embed,
     create_stock_journal_from_embed,
 )
 from .models import PostReport, HiddenPost
+from dashboard.services.http import yfinance_session
+from dashboard.services.prices import get_recent_bars, period_to_days
 
+# 피드 한 번에 불러오는 포스트 수
+FEED_PAGE_SIZE = 10
+# 댓글 한 페이지 최상위 댓글 수 / 스레드별 대댓글 미리보기 수
+COMMENT_PAGE_SIZE = 20
+REPLY_PREVIEW_SIZE = 3
+# 사이드바 뉴스 기사 수
+NEWS_ARTICLE_COUNT = 9
 
 
 def load_more_posts(request):
     """무한 스크롤용 추가 포스트 로드"""
-    page = request.GET.get('page', 1)
-    posts_per_page = 10
-    
-    posts = Post.objects.select_related('user').prefetch_related('likes', 'comments', 'tags').order_by('-created_at')
-    paginator = Paginator(posts, posts_per_page)
-    
     try:
-        posts_page = paginator.page(page)
-    except:
-        return JsonResponse({'posts': [], 'has_next': False})
-    
-    posts_data = []
-    for post in posts_page:
-        # 사용자 좋아요 상태
-        is_liked = False
-        if request.user.is_authenticated:
-            is_liked = Like.objects.filter(user=request.user, journal=post).exists()
-        
-        posts_data.append({
-            'id': post.id,
-            'username': post.user.my_ID, 
-            'my_ID': post.user.my_ID,
-            'content': post.content,
-            'image_url': post.image.url if post.image else None,
-            'screenshot_url': post.screenshot_url,
-            'created_at': post.created_at.strftime('%Y-%m-%d %H:%M'),
-            'likes_count': post.likes.count(),
-            'comments_count': post.comments.count(),
-            'bookmarks_count': post.bookmarks.count(),
-            'shares_count': post.shares.count(),
-            'is_liked': is_liked,
-            'tags': [tag.name for tag in post.tags.all()]
-        })
+        posts, next_cursor = paginate_by_cursor(
+            feed_queryset(request.user), request.GET.get('cursor'), FEED_PAGE_SIZE
+        )
+    except InvalidCursor:
+        return JsonResponse({'posts': [], 'has_next': False, 'next_cursor': None}, status=400)
     
+    # 좋아요 여부/카운트는 feed_queryset 에서 한 번에 주석됨
     return JsonResponse({
-        'posts': posts_data,
-        'has_next': posts_page.has_next(),
-        'next_page': posts_page.next_page_number() if posts_page.has_next() else None
+        'posts': [serialize_post(post) for post in posts],
+        'has_next': next_cursor is not None,
+        'next_cursor': next_cursor,
     })
 
 def get_finance_news():
-    """금융 뉴스 RSS 파싱"""
+    """금융 뉴스 (백그라운드 수집된 기사 테이블에서 최신순 조회)"""
     try:
-        rss_urls = [
-            'https://www.hankyung.com/feed/economy',
-            'https://www.yna.co.kr/rss/economy.xml',
-            'https://kr.investing.com/rss/news_285.rss',
-        ]
-        
-        articles = []
-        
-        for rss_url in rss_urls:
-            feed = feedparser.parse(rss_url)
-            
-            for entry in feed.entries[:3]:
-                # 시간 계산
-                try:
-                    if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                        published_date = datetime(*entry.published_parsed[:6])
-                    else:
-                        published_date = datetime.now()
-                except:
-                    published_date = datetime.now()
-
-                time_diff = datetime.now() - published_date
-                minutes_ago = int(time_diff.total_seconds() / 60)
-
-                # 하이브리드 이미지 추출
-                image_url = None
-
-                # 1. RSS에서 이미지 확인 (연합뉴스)
-                if hasattr(entry, 'media_content') and entry.media_content:
-                    image_url = entry.media_content[0].get('url')
-                # 뉴스 소스 식별
-                news_source = 'default'
-                if 'hankyung' in entry.link:
-                    news_source = 'hankyung'
-                elif 'yna.co.kr' in entry.link:
-                    news_source = 'yonhap'
-                elif 'investing.com' in entry.link:
-                    news_source = 'investing'
-
-                articles.append({
-                    'title': entry.title,
-                    'link': entry.link,
-                    'published': published_date,
-                    'minutes_ago': minutes_ago,
-                    'summary': entry.get('summary', '')[:100] + '...',
-                    'image_url': image_url,
-                    'news_source': news_source,
-                })
-
-        return articles[:9]
-        
+        return get_latest_news(NEWS_ARTICLE_COUNT)
     except Exception as e:
-        print(f"RSS 파싱 오류: {e}")
+        print(f"뉴스 조회 오류: {e}")
         return []
 
 
@@ -402,33 +335,28 @@ def create_reply(request, comment_id):
             'nickname': reply.user.nickname,
             'content': reply.content,
             'created_at': reply.created_at.strftime('%Y-%m-%d %H:%M'),
-            'comments_count': parent_comment.journal.comments.count()
+            'comments_count': Post.objects.values_list('comments_count', flat=True).get(pk=parent_comment.journal_id)
         })
         
     except json.JSONDecodeError:
         return JsonResponse({'error': '잘못된 요청입니다.'}, status=400)
     
 def home_view(request):
-    posts = Post.objects.select_related('user').prefetch_related('likes', 'comments', 'tags')[:10]
-    
-    # 사용자 좋아요 상태 추가
-    if request.user.is_authenticated:
-        for post in posts:
-            post.is_liked_by_user = Like.objects.filter(user=request.user, journal=post).exists()
-            post.is_bookmarked_by_user = Bookmark.objects.filter(user=request.user, journal=post).exists()
-    else:
-        for post in posts:
-            post.is_liked_by_user = False
-            post.is_bookmarked_by_user = False
-            post.is_shared_by_user = False 
+    # 사용자 좋아요/북마크 상태와 카운트는 쿼리에서 주석
+    posts, next_cursor = paginate_by_cursor(feed_queryset(request.user), None, FEED_PAGE_SIZE)
     
     context = {
         'posts': posts,
+        'next_cursor': next_cursor,
         'news_articles': get_finance_news(),
-        'stock_indices': get_stock_indices('1d'),
-        'individual_stocks': get_individual_stocks('1d'),
-        'exchange_rates': get_exchange_rates('1d'),
     }
+    # 지수/주식/환율은 사전 계산된 스냅샷 한 건에서 조회
+    panel = get_market_panel('1d')
+    context.update({
+        'stock_indices': panel['indices'],
+        'individual_stocks': panel['stocks'],
+        'exchange_rates': panel['exchange'],
+    })
     return render(request, 'home/feed.html', context)
 
 @login_required
@@ -466,349 +394,80 @@ def delete_post(request, post_id):
     
     return JsonResponse({'success': True})
 def get_stock_indices(period='1d'):
-    """주요 지수 데이터 가져오기 (기간별) - 에러 처리 강화"""
-    try:
-        indices = {
-            'KOSPI': '^KS11',      
-            'KOSDAQ': '^KQ11',     
-            'NASDAQ': '^IXIC',     
-            'S&P500': '^GSPC'      
-        }
-        
-        # 기간에 따른 데이터 범위 설정
-        if period == '1d':
-            data_period = '5d'
-        elif period == '5d':
-            data_period = '1mo'
-        else:
-            data_period = period
-        
-        index_data = []
-        for name, symbol in indices.items():
-            try:
-                ticker = yf.Ticker(symbol)
-                
-                # 한국 지수는 추가 처리
-                if symbol in ['^KS11', '^KQ11']:
-                    # 더 긴 기간으로 데이터 요청 (휴장일 대비)
-                    hist = ticker.history(period='1mo')
-                else:
-                    hist = ticker.history(period=data_period)
-                
-                # 데이터 검증 강화
-                if len(hist) < 1:
-                    print(f"데이터 부족: {name}")
-                    continue
-                    
-                current_price = hist['Close'].iloc[-1]
-                
-                # 비교 기준점 설정 (더 안전하게)
-                if period == '1d':
-                    if len(hist) >= 2:
-                        prev_price = hist['Close'].iloc[-2]
-                    else:
-                        # 데이터가 1개밖에 없으면 변동 없음으로 처리
-                        prev_price = current_price
-                        print(f"Warning: {name} 비교 데이터 부족, 변동 없음으로 처리")
-                elif period == '5d':
-                    if len(hist) >= 5:
-                        prev_price = hist['Close'].iloc[-5]
-                    else:
-                        prev_price = hist['Close'].iloc[0]
-                else:
-                    prev_price = hist['Close'].iloc[0]
-                
-                change = current_price - prev_price
-                change_percent = (change / prev_price) * 100 if prev_price != 0 else 0
-                
-                index_data.append({
-                    'name': name,
-                    'symbol': symbol,
-                    'current_price': round(current_price, 2),
-                    'change': round(change, 2),
-                    'change_percent': round(change_percent, 2),
-                    'is_positive': bool(change >= 0),
-                    'period': period
-                })
-                
-            except Exception as e:
-                print(f"지수 데이터 오류 ({name}): {e}")
-                # 오류 발생시 기본값으로 처리 (서비스 중단 방지)
-                index_data.append({
-                    'name': name,
-                    'symbol': symbol,
-                    'current_price': 0,
-                    'change': 0,
-                    'change_percent': 0,
-                    'is_positive': True,
-                    'period': period,
-                    'error': True  # 에러 플래그
-                })
-                
-        return index_data
-        
-    except Exception as e:
-        print(f"지수 데이터 전체 오류: {e}")
-        # 전체 오류시 빈 리스트 대신 기본 구조 반환
-        return []
+    """주요 지수 데이터 (백그라운드 갱신된 시장 패널에서 조회)"""
+    return get_market_section('indices', period)
 
 def get_individual_stocks(period='1d'):
-    """개별 주식 데이터 가져오기 (기간별)"""
-    try:
-        stocks = [
-            {'name': '테슬라', 'symbol': 'TSLA', 'market': 'US'},
-            {'name': '엔비디아', 'symbol': 'NVDA', 'market': 'US'},
-            {'name': '애플', 'symbol': 'AAPL', 'market': 'US'},
-            {'name': '삼성전자', 'symbol': '005930', 'market': 'KR'},
-            {'name': 'SK하이닉스', 'symbol': '000660', 'market': 'KR'},
-            {'name': '카카오', 'symbol': '035720', 'market': 'KR'},
-        ]
-        
-        stock_data = []
-        
-        for stock in stocks:
-            try:
-                if stock['market'] == 'US':
-                    # 미국 주식 - yfinance 사용
-                    ticker = yf.Ticker(stock['symbol'])
-                    hist = ticker.history(period=period)
-                    
-                    if len(hist) >= 1:  # 1개 이상이면 처리
-                        current_price = hist['Close'].iloc[-1]
-                        
-                        # 기간별 비교 기준점 설정
-                        if period == '1d':
-                            if len(hist) >= 2:
-                                prev_price = hist['Close'].iloc[-2]
-                            else:
-                                prev_price = current_price
-                        elif period == '5d':
-                            if len(hist) >= 5:
-                                prev_price = hist['Close'].iloc[-5]
-                            else:
-                                prev_price = hist['Close'].iloc[0]
-                        else:
-                            prev_price = hist['Close'].iloc[0]
-                        
-                        change = current_price - prev_price
-                        change_percent = (change / prev_price) * 100 if prev_price != 0 else 0
-                        
-                        stock_data.append({
-                            'name': stock['name'],
-                            'symbol': stock['symbol'],
-                            'market': stock['market'],
-                            'current_price': round(current_price, 2),
-                            'change': round(change, 2),
-                            'change_percent': round(change_percent, 2),
-                            'is_positive': bool(change >= 0),
-                            'period': period
-                        })
-                        
-                elif stock['market'] == 'KR':
-                    # 한국 주식 - finance-datareader 사용
-                    from datetime import datetime, timedelta
-                    
-                    # 기간별 날짜 범위 설정
-                    end_date = datetime.now()
-                    if period == '1d':
-                        start_date = end_date - timedelta(days=7)
-                    elif period == '5d':
-                        start_date = end_date - timedelta(days=14)
-                    elif period == '1mo':
-                        start_date = end_date - timedelta(days=60)
-                    elif period == '6mo':
-                        start_date = end_date - timedelta(days=210)
-                    elif period == '1y':
-                        start_date = end_date - timedelta(days=400)
-                    elif period == '5y':
-                        start_date = end_date - timedelta(days=1900)
-                    else:
-                        start_date = end_date - timedelta(days=30)
-                    
-                    df = fdr.DataReader(stock['symbol'], start_date, end_date)
-                    
-                    if len(df) >= 2:
-                        current_price = df['Close'].iloc[-1]
-                        
-                        # 기간별 비교 기준점 설정
-                        if period == '1d':
-                            prev_price = df['Close'].iloc[-2] if len(df) >= 2 else current_price
-                        else:
-                            prev_price = df['Close'].iloc[0] if len(df) > 1 else current_price
-                        
-                        change = current_price - prev_price
-                        change_percent = (change / prev_price) * 100 if prev_price != 0 else 0
-                        
-                        stock_data.append({
-                            'name': stock['name'],
-                            'symbol': stock['symbol'],
-                            'market': stock['market'],
-                            'current_price': int(current_price),
-                            'change': int(change),
-                            'change_percent': round(change_percent, 2),
-                            'is_positive': bool(change >= 0),
-                            'period': period
-                        })
-                        
-            except Exception as e:
-                print(f"주식 데이터 오류 ({stock['name']}): {e}")
-                continue
-                
-        return stock_data
-        
-    except Exception as e:
-        print(f"주식 데이터 전체 오류: {e}")
-        return []
+    """개별 주식 데이터 (백그라운드 갱신된 시장 패널에서 조회)"""
+    return get_market_section('stocks', period)
 
 def get_exchange_rates(period='1d'):
-    """환율 데이터 가져오기 (기간별)"""
-    try:
-        # 환율은 장기간 데이터 제한
-        if period in ['6mo', '1y', '5y', 'max']:
-            return []  # 빈 리스트 반환하여 에러 처리
-        
-        base_url = "https://api.exchangerate-api.com/v4/latest/USD"
-        
-        try:
-            response = requests.get(base_url, timeout=5)
-            data = response.json()
-            rates = data.get('rates', {})
-            
-            exchange_pairs = [
-                {'name': 'USD/KRW', 'rate_key': 'KRW', 'symbol': 'USD'},
-                {'name': 'JPY/KRW', 'rate_key': 'KRW', 'symbol': 'JPY'},  
-                {'name': 'EUR/KRW', 'rate_key': 'KRW', 'symbol': 'EUR'},
-                {'name': 'CNY/KRW', 'rate_key': 'KRW', 'symbol': 'CNY'},
-            ]
-            
-            exchange_data = []
-            krw_rate = rates.get('KRW', 1300)
-            
-            for pair in exchange_pairs:
-                try:
-                    if pair['symbol'] == 'USD':
-                        current_rate = krw_rate
-                    else:
-                        other_rate = rates.get(pair['symbol'], 1)
-                        current_rate = krw_rate / other_rate
-                    
-                    # 기간별 변동률 (임시로 랜덤 생성, 실제로는 historical API 필요)
-                    import random
-                    if period == '1d':
-                        change_percent = random.uniform(-2, 2)
-                    elif period == '5d':
-                        change_percent = random.uniform(-5, 5)
-                    else:
-                        change_percent = random.uniform(-10, 10)
-                    
-                    change = current_rate * (change_percent / 100)
-                    
-                    exchange_data.append({
-                        'name': pair['name'],
-                        'symbol': pair['symbol'],
-                        'current_rate': round(current_rate, 2 if pair['symbol'] == 'JPY' else 0),
-                        'change': round(change, 1),
-                        'change_percent': round(change_percent, 2),
-                        'is_positive': change_percent >= 0,
-                        'period': period
-                    })
-                    
-                except Exception as e:
-                    print(f"환율 계산 오류 ({pair['name']}): {e}")
-                    continue
-                    
-        except Exception as e:
-            print(f"환율 API 오류: {e}")
-            return []  # API 실패시 빈 리스트
-            
-        return exchange_data
-        
-    except Exception as e:
-        print(f"환율 데이터 전체 오류: {e}")
-        return []
+    """환율 데이터 (백그라운드 갱신된 시장 패널에서 조회)"""
+    return get_market_section('exchange', period)
+
+
+def _daily_chart_from_store(symbol, period):
+    """로컬 일봉 저장소 기반 차트 데이터"""
+    bars = get_recent_bars(symbol, period_to_days(period))
+    if not bars:
+        return None
 
+    # 기간별 X축 라벨 포맷 설정
+    if period in ['5d', '1mo']:
+        label_format = '%m/%d'      # 1주/1달: 월/일
+    elif period in ['6mo', '1y']:
+        label_format = '%Y/%m'      # 6개월/1년: 년/월
+    else:  # 5y
+        label_format = '%Y'         # 5년: 년도만
+
+    return {
+        'labels': [bar.date.strftime(label_format) for bar in bars],
+        'data': [round(float(bar.close), 2) for bar in bars],
+        'symbol': symbol
+    }
 
 
 def get_chart_data(symbol, data_type='stock', period='1d'):
     """차트용 데이터 가져오기 (1일 분봉)"""
     try:
-        from datetime import datetime, timedelta
-        
-        if data_type == 'index':
-            # 지수 데이터 (yfinance)
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period=period, interval="5m" if period == '1d' else "1d")
+        if data_type in ('index', 'us_stock'):
+            if period != '1d':
+                # 일봉은 로컬 가격 저장소 사용
+                return _daily_chart_from_store(symbol, period)
+
+            # 1일 분봉은 저장하지 않으므로 yfinance 직접 조회
+            ticker = yf.Ticker(symbol, session=yfinance_session())
+            hist = ticker.history(period=period, interval="5m")
             
             if len(hist) > 0:
-                # 기간별 X축 라벨 포맷 설정
-                labels = []
-                for dt in hist.index:
-                    py_dt = dt.to_pydatetime()
-                    if period == '1d':
-                        labels.append(py_dt.strftime('%H:%M'))      # 1일: 시간
-                    elif period in ['5d', '1mo']:
-                        labels.append(py_dt.strftime('%m/%d'))      # 1주/1달: 월/일
-                    elif period in ['6mo', '1y']:
-                        labels.append(py_dt.strftime('%Y/%m'))      # 6개월/1년: 년/월
-                    else:  # 5y
-                        labels.append(py_dt.strftime('%Y'))         # 5년: 년도만
-                    
-                chart_data = {
-                    'labels': labels,
-                    'data': [round(price, 2) for price in hist['Close'].tolist()],
-                    'symbol': symbol
-                }
-                return chart_data
-                
-        elif data_type == 'us_stock':
-            # 미국 주식 데이터 (yfinance)
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period=period, interval="5m" if period == '1d' else "1d")
-            
-            if len(hist) > 0:
-                labels = []
-                for dt in hist.index:
-                    py_dt = dt.to_pydatetime()
-                    if period == '1d':
-                        labels.append(py_dt.strftime('%H:%M'))      # 1일: 시간
-                    elif period in ['5d', '1mo']:
-                        labels.append(py_dt.strftime('%m/%d'))      # 1주/1달: 월/일
-                    elif period in ['6mo', '1y']:
-                        labels.append(py_dt.strftime('%Y/%m'))      # 6개월/1년: 년/월
-                    else:  # 5y
-                        labels.append(py_dt.strftime('%Y'))         # 5년: 년도만
-                    
                 chart_data = {
-                    'labels': labels,
+                    'labels': [dt.to_pydatetime().strftime('%H:%M') for dt in hist.index],
                     'data': [round(price, 2) for price in hist['Close'].tolist()],
                     'symbol': symbol
                 }
                 return chart_data
                 
         elif data_type == 'kr_stock':
-            # 한국 주식 데이터 (finance-datareader) - 일봉으로 대체
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=30)  # 1개월 데이터
-            
-            df = fdr.DataReader(symbol, start_date, end_date)
+            # 한국 주식 데이터 - 일봉으로 대체
+            bars = get_recent_bars(symbol, 30)  # 1개월 데이터
             
-            if len(df) > 0:
+            if len(bars) > 0:
                 # 기간별 데이터 조정
                 if period == '1d':
-                    df_recent = df.tail(5)   # 1일이면 5일치만
+                    recent = bars[-5:]   # 1일이면 5일치만
                 else:
-                    df_recent = df.tail(20)  # 나머지는 20일치
+                    recent = bars[-20:]  # 나머지는 20일치
                 # 기간별 X축 라벨 포맷 설정
                 if period in ['1d', '5d']:
-                    labels = [dt.strftime('%m/%d') for dt in df_recent.index]
+                    labels = [bar.date.strftime('%m/%d') for bar in recent]
                 elif period in ['1mo', '6mo']:
-                    labels = [dt.strftime('%m/%d') for dt in df_recent.index]  
+                    labels = [bar.date.strftime('%m/%d') for bar in recent]  
                 else:
-                    labels = [dt.strftime('%Y/%m') for dt in df_recent.index]
+                    labels = [bar.date.strftime('%Y/%m') for bar in recent]
 
                 chart_data = {
                     'labels': labels,
-                    'data': [int(price) for price in df_recent['Close'].tolist()],
+                    'data': [int(bar.close) for bar in recent],
                     'symbol': symbol
                 }
                 return chart_data
@@ -953,8 +612,9 @@ def toggle_like(request, post_id):
         # 새로 좋아요 추가
         liked = True
     
-    # 전체 좋아요 수 계산
-    likes_count = post.likes.count()
+    # 모델 save/delete 에서 F() 로 갱신된 좋아요 수
+    post.refresh_from_db(fields=['likes_count'])
+    likes_count = post.likes_count
     
     return JsonResponse({
         'liked': liked,
@@ -979,8 +639,9 @@ def toggle_bookmark(request, post_id):
         # 새로 북마크 추가
         bookmarked = True
     
-    # 전체 북마크 수 계산
-    bookmarks_count = post.bookmarks.count()
+    # 모델 save/delete 에서 F() 로 갱신된 북마크 수
+    post.refresh_from_db(fields=['bookmarks_count'])
+    bookmarks_count = post.bookmarks_count
     
     return JsonResponse({
         'bookmarked': bookmarked,
@@ -1005,8 +666,9 @@ def toggle_share(request, post_id):
         # 새로 공유 추가
         shared = True
     
-    # 전체 공유 수 계산
-    shares_count = post.shares.count()
+    # 모델 save/delete 에서 F() 로 갱신된 공유 수
+    post.refresh_from_db(fields=['shares_count'])
+    shares_count = post.shares_count
     
     return JsonResponse({
         'shared': shared,
@@ -1043,7 +705,7 @@ def create_comment(request, post_id):
             'my_ID': comment.user.my_ID,
             'content': comment.content,
             'created_at': comment.created_at.strftime('%Y-%m-%d %H:%M'),
-            'comments_count': post.comments.count()
+            'comments_count': Post.objects.values_list('comments_count', flat=True).get(pk=post.pk)
         })
         
     except json.JSONDecodeError:
@@ -1051,38 +713,44 @@ def create_comment(request, post_id):
 
 @require_http_methods(["GET"])
 def get_comments(request, post_id):
-    """댓글 목록 조회 API"""
+    """댓글 목록 조회 API (최상위 댓글 커서 페이지 + 대댓글 미리보기)"""
     post = get_object_or_404(Post, id=post_id)
-    comments = Comment.objects.filter(journal=post, parent=None).select_related('user').order_by('created_at')
-    
-    comments_data = []
-    for comment in comments:
-        # 대댓글도 가져오기
-        replies = Comment.objects.filter(parent=comment).select_related('user').order_by('created_at')
-        replies_data = [
-            {
-                'id': reply.id,
-                'my_ID': reply.user.my_ID,
-                'nickname': reply.user.nickname,
-                'content': reply.content,
-                'is_edited': reply.is_edited,
-                'created_at': reply.created_at.strftime('%Y-%m-%d %H:%M')
-            }
-            for reply in replies
-        ]
-        
-        comments_data.append({
-            'id': comment.id,
-            'my_ID': comment.user.my_ID,
-            'content': comment.content,
-            'is_edited': comment.is_edited, 
-            'nickname': comment.user.nickname,
-            'created_at': comment.created_at.strftime('%Y-%m-%d %H:%M'),
-            'replies': replies_data,
-            'replies_count': len(replies_data) 
-        })
-    
-    return JsonResponse({'comments': comments_data})
+    try:
+        comments_data, next_cursor = load_comment_threads(
+            post.id,
+            cursor=request.GET.get('cursor'),
+            limit=COMMENT_PAGE_SIZE,
+            reply_preview=REPLY_PREVIEW_SIZE,
+        )
+    except InvalidCursor:
+        return JsonResponse({'error': '잘못된 커서입니다.'}, status=400)
+
+    return JsonResponse({
+        'comments': comments_data,
+        'has_next': next_cursor is not None,
+        'next_cursor': next_cursor,
+    })
+
+
+@require_http_methods(["GET"])
+def get_replies(request, comment_id):
+    """대댓글 지연 로딩 API"""
+    comment = get_object_or_404(Comment, id=comment_id)
+    try:
+        replies_data, next_cursor = load_replies(
+            comment.id, cursor=request.GET.get('cursor'), limit=COMMENT_PAGE_SIZE
+        )
+    except InvalidCursor:
+        return JsonResponse({'error': '잘못된 커서입니다.'}, status=400)
+
+    return JsonResponse({
+        'replies': replies_data,
+        'replies_count': comment.reply_count,
+        'has_next': next_cursor is not None,
+        'next_cursor': next_cursor,
+    })
+
+
 @login_required
 @require_http_methods(["POST"])
 def edit_comment(request, comment_id):
@@ -12,6 +12,7 @@ urlpatterns = [
     path('stock/<str:ticker>/history/', views.stock_history_api, name='stock_history'),
     path('stock/journals/', views.stock_journals_api, name='stock_journals'),
     path('stock/journals/<int:journal_id>/trades/', views.add_stock_trade_api, name='add_stock_trade'),
+    path('trades/import/', views.trade_import_api, name='trade_import'),
     path('realty/suggest/', views.realty_suggest_api, name='realty_suggest'),
     path('realty/deals/', views.realty_deals_api, name='realty_deals'),
     path('journal-posts/<int:post_id>/', views.journal_post_api, name='journal_post_api'),
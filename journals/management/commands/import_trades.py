@@ -0,0 +1,48 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from journals.services.trade_import import DEFAULT_CHUNK_SIZE, TradeImporter
+
+
+class Command(BaseCommand):
+    help = 'Imports stock trades and real estate deals for one user from a broker CSV export.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', help='Path to the CSV file (UTF-8, header row required)')
+        parser.add_argument('--user', required=True, help='my_ID or numeric id of the owner')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Rows parsed and written per batch (default: {DEFAULT_CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        lookup = options['user']
+        user = User.objects.filter(my_ID=lookup).first()
+        if user is None and lookup.isdigit():
+            user = User.objects.filter(pk=int(lookup)).first()
+        if user is None:
+            raise CommandError(f'User not found: {lookup}')
+
+        started = time.perf_counter()
+        try:
+            with open(options['csv_path'], encoding='utf-8-sig', newline='') as stream:
+                result = TradeImporter(user, chunk_size=max(1, options['chunk_size'])).run(stream)
+        except OSError as e:
+            raise CommandError(f'Could not open {options["csv_path"]}: {e}')
+
+        for error in result.errors:
+            self.stderr.write(self.style.WARNING(error))
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result.stock_trades} trades and {result.re_deals} deals '
+            f'({result.journals} new journals, {result.error_count} rejected rows) '
+            f'in {time.perf_counter() - started:.2f}s'
+        ))
+        if result.stopped_at_line is not None:
+            self.stderr.write(self.style.ERROR(
+                f'Stopped at line {result.stopped_at_line}: rows before it were imported'
+            ))
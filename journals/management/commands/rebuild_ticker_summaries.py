@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from journals.models import StockJournal, StockTickerSummary
+
+
+class Command(BaseCommand):
+    help = 'Recomputes StockTickerSummary rows from StockJournal totals (after manual edits or bulk fixes).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='Only rebuild this user id')
+
+    def handle(self, *args, **options):
+        journals = StockJournal.objects.order_by()
+        summaries = StockTickerSummary.objects.all()
+        if options['user']:
+            journals = journals.filter(user_id=options['user'])
+            summaries = summaries.filter(user_id=options['user'])
+
+        pairs = set(journals.values_list('user_id', 'ticker_symbol_id').distinct())
+        for user_id, ticker in sorted(pairs):
+            StockTickerSummary.refresh(user_id, ticker)
+
+        orphans = [pk for pk, user_id, ticker in summaries.values_list('id', 'user_id', 'ticker_symbol_id')
+                   if (user_id, ticker) not in pairs]
+        StockTickerSummary.objects.filter(id__in=orphans).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {len(pairs)} ticker summaries, removed {len(orphans)} orphaned rows.'
+        ))
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from journals.services.stock_universe import (
+    DEFAULT_MARKETS,
+    EnrichmentCheckpoint,
+    enrich_metadata,
+    fetch_listings,
+    sync_universe,
+)
+
+
+class Command(BaseCommand):
+    help = 'Loads the KRX and US stock listings into StockInfo in one bulk pass, then optionally enriches sector/currency.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--market',
+            action='append',
+            help=f'Listing to load (repeatable, default: {", ".join(DEFAULT_MARKETS)})',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the diff without writing',
+        )
+        parser.add_argument(
+            '--enrich',
+            action='store_true',
+            help='Fetch missing sector/currency from yfinance after the listing sync',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Concurrent metadata requests (default: 4)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Tickers per enrichment batch / checkpoint (default: 200)',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            default=os.path.join(tempfile.gettempdir(), 'stock_enrich_checkpoint.json'),
+            help='Checkpoint file for resuming enrichment (default: system temp directory)',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore and clear the existing checkpoint',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        markets = options['market'] or DEFAULT_MARKETS
+        listings = fetch_listings(markets)
+        self.stdout.write(f'Fetched {len(listings)} listed tickers in {time.monotonic() - started:.1f}s')
+
+        if listings:
+            result = sync_universe(listings, dry_run=options['dry_run'])
+            prefix = '[dry-run] ' if options['dry_run'] else ''
+            self.stdout.write(self.style.SUCCESS(
+                f'{prefix}created={result.created} updated={result.updated} '
+                f'unchanged={result.unchanged} not-listed={len(result.missing)}'
+            ))
+            if result.missing and options['verbosity'] >= 2:
+                self.stdout.write('Not listed anymore: ' + ', '.join(result.missing))
+        else:
+            self.stderr.write('No listings fetched; StockInfo left unchanged.')
+
+        if not options['enrich'] or options['dry_run']:
+            return
+
+        checkpoint = EnrichmentCheckpoint(options['checkpoint'])
+        if options['restart']:
+            checkpoint.clear()
+        elif checkpoint.done:
+            self.stdout.write(f'Resuming: {len(checkpoint.done)} tickers already enriched')
+
+        def progress(r):
+            self.stdout.write(f'  enriched {r.attempted} (updated={r.updated}, failed={r.failed})')
+
+        result = enrich_metadata(
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+            checkpoint=checkpoint,
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Enrichment done: attempted={result.attempted} updated={result.updated} '
+            f'failed={result.failed} in {time.monotonic() - started:.1f}s'
+        ))
+        if not result.failed:
+            checkpoint.clear()
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from journals.models import StockInfo
+from journals.services.close_prices import refresh_close_prices
+
+
+class Command(BaseCommand):
+    help = 'Refreshes StockInfo.last_close_price for every referenced ticker with batched downloads and one bulk update.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Refresh every StockInfo row instead of only tickers used by journals/holdings',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Parallel download chunks (default: 4)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=200,
+            help='Tickers per multi-ticker download (default: 200)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        tickers = StockInfo.objects.values_list('ticker_symbol', flat=True) if options['all'] else None
+        result = refresh_close_prices(tickers, workers=options['workers'], chunk_size=options['chunk_size'])
+        if result.missing:
+            self.stderr.write(f'No recent close for {len(result.missing)} tickers: {", ".join(result.missing[:20])}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Updated {result.updated}/{result.tickers} close prices in {time.monotonic() - started:.1f}s'
+        ))
@@ -0,0 +1,56 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db.models import F, Sum
+
+from journals.models import StockJournal, StockTrade
+
+
+class Command(BaseCommand):
+    help = 'Compares incrementally maintained StockJournal totals against a full recompute from trades.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Run recalculate_aggregates() on journals whose totals drifted',
+        )
+
+    def handle(self, *args, **options):
+        # One grouped query for the whole trade table
+        expected = {}
+        rows = (
+            StockTrade.objects.values('journal_id', 'side')
+            .annotate(qty=Sum('quantity'), amount=Sum(F('quantity') * F('price_per_share')))
+        )
+        for row in rows:
+            totals = expected.setdefault(row['journal_id'], {})
+            totals[row['side']] = (row['qty'] or Decimal('0'), row['amount'] or Decimal('0'))
+
+        zero = (Decimal('0'), Decimal('0'))
+        drifted = []
+        journals = StockJournal.objects.values_list(
+            'id', 'total_buy_qty', 'total_buy_amount', 'total_sell_qty', 'total_sell_amount'
+        )
+        checked = 0
+        for journal_id, buy_qty, buy_amount, sell_qty, sell_amount in journals:
+            checked += 1
+            totals = expected.get(journal_id, {})
+            exp_buy = totals.get(StockTrade.Side.BUY, zero)
+            exp_sell = totals.get(StockTrade.Side.SELL, zero)
+            # Compare at the stored precision
+            stored = [buy_qty, buy_amount, sell_qty, sell_amount]
+            wanted = [exp_buy[0], exp_buy[1], exp_sell[0], exp_sell[1]]
+            if any(abs(a - b) > Decimal('0.000001') for a, b in zip(stored, wanted)):
+                drifted.append(journal_id)
+                self.stdout.write(self.style.WARNING(
+                    f'Journal {journal_id}: stored buy={buy_qty}/{buy_amount} sell={sell_qty}/{sell_amount}, '
+                    f'expected buy={exp_buy[0]}/{exp_buy[1]} sell={exp_sell[0]}/{exp_sell[1]}'
+                ))
+
+        if drifted and options['fix']:
+            for journal in StockJournal.objects.filter(id__in=drifted):
+                journal.recalculate_aggregates()
+            self.stdout.write(self.style.SUCCESS(f'Recalculated {len(drifted)} journals.'))
+
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} journals, {len(drifted)} drifted.'))
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:55
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import F, Sum
+
+
+def backfill_trade_amounts(apps, schema_editor):
+    StockJournal = apps.get_model('journals', 'StockJournal')
+    StockTrade = apps.get_model('journals', 'StockTrade')
+
+    amounts = {}
+    rows = (
+        StockTrade.objects.values('journal_id', 'side')
+        .annotate(amount=Sum(F('quantity') * F('price_per_share')))
+    )
+    for row in rows:
+        amounts.setdefault(row['journal_id'], {})[row['side']] = row['amount'] or Decimal('0')
+
+    for journal_id, by_side in amounts.items():
+        StockJournal.objects.filter(pk=journal_id).update(
+            total_buy_amount=by_side.get('BUY', Decimal('0')),
+            total_sell_amount=by_side.get('SELL', Decimal('0')),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journals', '0002_alter_repropertyinfo_lawd_cd'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stockjournal',
+            name='total_buy_amount',
+            field=models.DecimalField(decimal_places=6, default=Decimal('0.0'), max_digits=24),
+        ),
+        migrations.AddField(
+            model_name='stockjournal',
+            name='total_sell_amount',
+            field=models.DecimalField(decimal_places=6, default=Decimal('0.0'), max_digits=24),
+        ),
+        migrations.RunPython(backfill_trade_amounts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journals', '0003_stockjournal_trade_amounts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stockinfo',
+            name='last_close_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='stockinfo',
+            name='last_close_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journals', '0004_stockinfo_last_close'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='repropertyinfo',
+            name='address_base',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+    ]
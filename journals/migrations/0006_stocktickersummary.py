@@ -0,0 +1,74 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:18
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_summaries(apps, schema_editor):
+    StockJournal = apps.get_model('journals', 'StockJournal')
+    StockTickerSummary = apps.get_model('journals', 'StockTickerSummary')
+    rows = (
+        StockJournal.objects.order_by()
+        .values('user_id', 'ticker_symbol_id')
+        .annotate(
+            buy_qty=Sum('total_buy_qty'), buy_amount=Sum('total_buy_amount'),
+            sell_qty=Sum('total_sell_qty'), sell_amount=Sum('total_sell_amount'),
+            journals=Count('id'),
+        )
+    )
+    summaries = []
+    for row in rows:
+        buy_qty, buy_amount = row['buy_qty'] or Decimal('0'), row['buy_amount'] or Decimal('0')
+        sell_qty, sell_amount = row['sell_qty'] or Decimal('0'), row['sell_amount'] or Decimal('0')
+        avg_buy = buy_amount / buy_qty if buy_qty > 0 else None
+        avg_sell = sell_amount / sell_qty if sell_qty > 0 else None
+        pnl = rate = None
+        if sell_qty > 0 and avg_buy is not None:
+            cost = avg_buy * sell_qty
+            pnl = sell_amount - cost
+            if cost > 0:
+                rate = pnl / cost * 100
+        summaries.append(StockTickerSummary(
+            user_id=row['user_id'], ticker_symbol_id=row['ticker_symbol_id'],
+            total_buy_qty=buy_qty, total_buy_amount=buy_amount,
+            total_sell_qty=sell_qty, total_sell_amount=sell_amount,
+            avg_buy_price=avg_buy, avg_sell_price=avg_sell,
+            realized_pnl=pnl, return_rate=rate, journal_count=row['journals'],
+        ))
+    StockTickerSummary.objects.bulk_create(summaries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journals', '0005_repropertyinfo_address_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockTickerSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_buy_qty', models.DecimalField(decimal_places=6, default=Decimal('0.0'), max_digits=18)),
+                ('total_sell_qty', models.DecimalField(decimal_places=6, default=Decimal('0.0'), max_digits=18)),
+                ('total_buy_amount', models.DecimalField(decimal_places=6, default=Decimal('0.0'), max_digits=24)),
+                ('total_sell_amount', models.DecimalField(decimal_places=6, default=Decimal('0.0'), max_digits=24)),
+                ('avg_buy_price', models.DecimalField(blank=True, decimal_places=4, max_digits=18, null=True)),
+                ('avg_sell_price', models.DecimalField(blank=True, decimal_places=4, max_digits=18, null=True)),
+                ('realized_pnl', models.DecimalField(blank=True, decimal_places=2, max_digits=18, null=True)),
+                ('return_rate', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True)),
+                ('journal_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('ticker_symbol', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='summaries', to='journals.stockinfo')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_ticker_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'ticker_symbol'), name='uniq_stock_summary_user_ticker')],
+            },
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
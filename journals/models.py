@@ -1,8 +1,8 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from decimal import Decimal
-from django.db.models import Sum, F
+from django.db.models import Min, Sum, F
 from django.db.models.functions import Coalesce
 from django.utils import timezone
 
@@ -18,11 +18,26 @@ class StockInfo(models.Model):
     exchange = models.CharField(max_length=50, blank=True, null=True)
     currency = models.CharField(max_length=10, blank=True, null=True)
     last_close_price = models.DecimalField(max_digits=18, decimal_places=4, null=True, blank=True)
+    # Trading day of last_close_price and when the close-price job wrote it
+    last_close_date = models.DateField(null=True, blank=True)
+    last_close_updated_at = models.DateTimeField(null=True, blank=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.stock_name} ({self.ticker_symbol})"
 
+    @property
+    def is_close_price_stale(self):
+        """True when there is no close or it is older than STOCK_CLOSE_MAX_AGE_DAYS calendar days."""
+        if self.last_close_price is None or self.last_close_date is None:
+            return True
+        max_age = getattr(settings, 'STOCK_CLOSE_MAX_AGE_DAYS', 5)
+        return (timezone.localdate() - self.last_close_date).days > max_age
+
+    def fresh_close_price(self):
+        """last_close_price, or None when it is stale (callers pick their own fallback)."""
+        return None if self.is_close_price_stale else self.last_close_price
+
 
 class StockJournal(models.Model):
     class Status(models.TextChoices):
@@ -37,6 +52,9 @@ class StockJournal(models.Model):
 
     total_buy_qty = models.DecimalField(max_digits=18, decimal_places=6, default=Decimal('0.0'))
     total_sell_qty = models.DecimalField(max_digits=18, decimal_places=6, default=Decimal('0.0'))
+    # Gross buy/sell values; kept so a single trade can be applied without re-aggregating
+    total_buy_amount = models.DecimalField(max_digits=24, decimal_places=6, default=Decimal('0.0'))
+    total_sell_amount = models.DecimalField(max_digits=24, decimal_places=6, default=Decimal('0.0'))
 
     avg_buy_price = models.DecimalField(max_digits=18, decimal_places=4, null=True, blank=True)
     avg_sell_price = models.DecimalField(max_digits=18, decimal_places=4, null=True, blank=True)
@@ -55,34 +73,20 @@ class StockJournal(models.Model):
             models.Index(fields=['user', 'ticker_symbol']),
         ]
 
-    def recalculate_aggregates(self):
-        """Recalculates all aggregate fields for the journal based on its trades."""
-        trades = self.trades.all()
-
-        # Calculate total buy/sell quantities and gross values (ignoring fees/taxes as per user)
-        buy_data = trades.filter(side=StockTrade.Side.BUY).aggregate(
-            total_qty=Coalesce(Sum('quantity'), Decimal(0)),
-            total_value=Coalesce(Sum(F('quantity') * F('price_per_share')), Decimal(0))
-        )
-        sell_data = trades.filter(side=StockTrade.Side.SELL).aggregate(
-            total_qty=Coalesce(Sum('quantity'), Decimal(0)),
-            total_value=Coalesce(Sum(F('quantity') * F('price_per_share')), Decimal(0))
-        )
-
-        total_buy_qty = buy_data['total_qty']
-        total_sell_qty = sell_data['total_qty']
-
+    @classmethod
+    def _aggregate_fields(cls, total_buy_qty, total_buy_amount, total_sell_qty, total_sell_amount):
+        """Derives every aggregate column from the four running totals."""
         # Calculate average prices (based on gross values)
-        avg_buy_price = buy_data['total_value'] / total_buy_qty if total_buy_qty > 0 else None
-        avg_sell_price = sell_data['total_value'] / total_sell_qty if total_sell_qty > 0 else None
+        avg_buy_price = total_buy_amount / total_buy_qty if total_buy_qty > 0 else None
+        avg_sell_price = total_sell_amount / total_sell_qty if total_sell_qty > 0 else None
 
         # Calculate net quantity
         net_qty = total_buy_qty - total_sell_qty
 
         # Update status
-        new_status = self.Status.OPEN
+        new_status = cls.Status.OPEN
         if net_qty == 0 and total_buy_qty > 0:
-            new_status = self.Status.COMPLETED
+            new_status = cls.Status.COMPLETED
 
         # Calculate realized PnL and Return Rate for sold shares
         realized_pnl = None
@@ -91,23 +95,100 @@ class StockJournal(models.Model):
             # Cost basis for the shares that were sold
             cost_of_sold_shares = avg_buy_price * total_sell_qty
             # Realized PnL is the net from selling minus the cost basis of what was sold
-            realized_pnl = sell_data['total_value'] - cost_of_sold_shares
+            realized_pnl = total_sell_amount - cost_of_sold_shares
             
             if cost_of_sold_shares > 0:
                 return_rate = (realized_pnl / cost_of_sold_shares) * 100
 
-        # Use a direct update to prevent save signal recursion
-        StockJournal.objects.filter(pk=self.pk).update(
-            total_buy_qty=total_buy_qty,
-            total_sell_qty=total_sell_qty,
-            avg_buy_price=avg_buy_price,
-            avg_sell_price=avg_sell_price,
-            net_qty=net_qty,
-            realized_pnl=realized_pnl,
-            return_rate=return_rate,
-            status=new_status,
-            updated_at=timezone.now()
+        return {
+            'total_buy_qty': total_buy_qty,
+            'total_sell_qty': total_sell_qty,
+            'total_buy_amount': total_buy_amount,
+            'total_sell_amount': total_sell_amount,
+            'avg_buy_price': avg_buy_price,
+            'avg_sell_price': avg_sell_price,
+            'net_qty': net_qty,
+            'realized_pnl': realized_pnl,
+            'return_rate': return_rate,
+            'status': new_status,
+        }
+
+    def recalculate_aggregates(self):
+        """Recalculates all aggregate fields for the journal based on its trades.
+
+        O(trades); trade saves use apply_trade_delta instead. Kept for verification
+        (see the verify_journal_aggregates command) and after bulk imports.
+        """
+        trades = self.trades.all()
+
+        # Calculate total buy/sell quantities and gross values (ignoring fees/taxes as per user)
+        buy_data = trades.filter(side=StockTrade.Side.BUY).aggregate(
+            total_qty=Coalesce(Sum('quantity'), Decimal(0)),
+            total_value=Coalesce(Sum(F('quantity') * F('price_per_share')), Decimal(0))
         )
+        sell_data = trades.filter(side=StockTrade.Side.SELL).aggregate(
+            total_qty=Coalesce(Sum('quantity'), Decimal(0)),
+            total_value=Coalesce(Sum(F('quantity') * F('price_per_share')), Decimal(0))
+        )
+
+        fields = self._aggregate_fields(
+            buy_data['total_qty'], buy_data['total_value'],
+            sell_data['total_qty'], sell_data['total_value'],
+        )
+        # Use a direct update to prevent save signal recursion
+        StockJournal.objects.filter(pk=self.pk).update(updated_at=timezone.now(), **fields)
+        StockTickerSummary.refresh(self.user_id, self.ticker_symbol_id)
+
+    @classmethod
+    def apply_trade_delta(cls, journal_id, removed=None, added=None):
+        """Applies one trade change to the stored totals in O(1).
+
+        `removed` / `added` are (side, price_per_share, quantity) tuples for the
+        trade's previous and new state (None for inserts / deletes).
+        """
+        with transaction.atomic():
+            journal = cls.objects.select_for_update().filter(pk=journal_id).values(
+                'user_id', 'ticker_symbol_id',
+                'total_buy_qty', 'total_buy_amount', 'total_sell_qty', 'total_sell_amount'
+            ).first()
+            if journal is None:
+                return
+            totals = {
+                StockTrade.Side.BUY: [journal['total_buy_qty'], journal['total_buy_amount']],
+                StockTrade.Side.SELL: [journal['total_sell_qty'], journal['total_sell_amount']],
+            }
+            for sign, trade in ((-1, removed), (1, added)):
+                if trade is None:
+                    continue
+                side, price, quantity = trade
+                price, quantity = Decimal(str(price)), Decimal(str(quantity))
+                totals[side][0] += sign * quantity
+                totals[side][1] += sign * quantity * price
+
+            fields = cls._aggregate_fields(*totals[StockTrade.Side.BUY], *totals[StockTrade.Side.SELL])
+            cls.objects.filter(pk=journal_id).update(updated_at=timezone.now(), **fields)
+            StockTickerSummary.refresh(journal['user_id'], journal['ticker_symbol_id'])
+
+    def save(self, *args, **kwargs):
+        previous_ticker = None
+        if self.pk:
+            previous_ticker = StockJournal.objects.filter(pk=self.pk).values_list('ticker_symbol_id', flat=True).first()
+        super().save(*args, **kwargs)
+        StockTickerSummary.refresh(self.user_id, self.ticker_symbol_id)
+        if previous_ticker and previous_ticker != self.ticker_symbol_id:
+            StockTickerSummary.refresh(self.user_id, previous_ticker)
+
+    def delete(self, *args, **kwargs):
+        user_id, ticker_symbol_id = self.user_id, self.ticker_symbol_id
+        # 거래는 CASCADE 로 지워져 StockTrade.delete() 훅이 돌지 않으므로 보유/시계열을 직접 갱신
+        first_trade_date = self.trades.aggregate(first=Min('trade_date'))['first']
+        result = super().delete(*args, **kwargs)
+        StockTickerSummary.refresh(user_id, ticker_symbol_id)
+        from dashboard.services.holdings import rebuild_stock_holdings
+        from dashboard.services.timeseries import mark_timeseries_stale
+        rebuild_stock_holdings(pairs={(user_id, ticker_symbol_id)})
+        mark_timeseries_stale(user_id, first_trade_date)
+        return result
 
 
 class StockTrade(models.Model):
@@ -139,32 +220,123 @@ class StockTrade(models.Model):
             models.Index(fields=['journal', 'trade_date']),
         ]
 
+    def _as_delta(self):
+        return (self.side, self.price_per_share, self.quantity)
+
     def save(self, *args, **kwargs):
+        previous = None
+        if self.pk:
+            previous = StockTrade.objects.filter(pk=self.pk).values(
+                'journal_id', 'side', 'price_per_share', 'quantity', 'trade_date'
+            ).first()
         super().save(*args, **kwargs)
+
+        # Apply only this trade's change to the journal totals
+        if previous and previous['journal_id'] != self.journal_id:
+            StockJournal.apply_trade_delta(
+                previous['journal_id'],
+                removed=(previous['side'], previous['price_per_share'], previous['quantity']),
+            )
+            previous = None
+        StockJournal.apply_trade_delta(
+            self.journal_id,
+            removed=(previous['side'], previous['price_per_share'], previous['quantity']) if previous else None,
+            added=self._as_delta(),
+        )
+
         from dashboard.views.services import process_trade_for_portfolio
+        from dashboard.services.timeseries import mark_timeseries_stale
         process_trade_for_portfolio(self.id)
+        mark_timeseries_stale(self.user_id, self.trade_date)
+        if previous and previous['trade_date'] != self.trade_date:
+            mark_timeseries_stale(self.user_id, previous['trade_date'])
 
     def delete(self, *args, **kwargs):
         journal = self.journal
+        removed = self._as_delta()
         super().delete(*args, **kwargs)
+        from dashboard.services.timeseries import mark_timeseries_stale
+        mark_timeseries_stale(self.user_id, self.trade_date)
         # After a trade is deleted, we still need to update the portfolio
         from dashboard.views.services import process_trade_for_portfolio
         # We can't pass the deleted trade, so we trigger from the journal.
         # This is a simplification; a full implementation might need to handle this differently,
-        # but for now, recalculating the journal and updating the portfolio from its last known state is sufficient.
-        journal.recalculate_aggregates()
-        journal.refresh_from_db()
+        # but for now, updating the portfolio from the journal's last known state is sufficient.
+        StockJournal.apply_trade_delta(journal.pk, removed=removed)
         # Find the last trade to update the snapshot, or just update holding
         last_trade = journal.trades.order_by('-trade_date').first()
         if last_trade:
             process_trade_for_portfolio(last_trade.id)
 
 
+class StockTickerSummary(models.Model):
+    """Per-(user, ticker) totals across that user's journals, read by the journal list.
+
+    Kept in step with StockJournal by refresh(); rebuild_ticker_summaries recomputes all rows.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='stock_ticker_summaries')
+    ticker_symbol = models.ForeignKey(StockInfo, on_delete=models.PROTECT, related_name='summaries')
+
+    total_buy_qty = models.DecimalField(max_digits=18, decimal_places=6, default=Decimal('0.0'))
+    total_sell_qty = models.DecimalField(max_digits=18, decimal_places=6, default=Decimal('0.0'))
+    total_buy_amount = models.DecimalField(max_digits=24, decimal_places=6, default=Decimal('0.0'))
+    total_sell_amount = models.DecimalField(max_digits=24, decimal_places=6, default=Decimal('0.0'))
+
+    avg_buy_price = models.DecimalField(max_digits=18, decimal_places=4, null=True, blank=True)
+    avg_sell_price = models.DecimalField(max_digits=18, decimal_places=4, null=True, blank=True)
+    realized_pnl = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)
+    return_rate = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
+    journal_count = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'ticker_symbol'], name='uniq_stock_summary_user_ticker'),
+        ]
+
+    @classmethod
+    def values_from_totals(cls, total_buy_qty, total_buy_amount, total_sell_qty, total_sell_amount, journal_count):
+        fields = StockJournal._aggregate_fields(total_buy_qty, total_buy_amount, total_sell_qty, total_sell_amount)
+        return {
+            'total_buy_qty': total_buy_qty,
+            'total_sell_qty': total_sell_qty,
+            'total_buy_amount': total_buy_amount,
+            'total_sell_amount': total_sell_amount,
+            'avg_buy_price': fields['avg_buy_price'],
+            'avg_sell_price': fields['avg_sell_price'],
+            'realized_pnl': fields['realized_pnl'],
+            'return_rate': fields['return_rate'],
+            'journal_count': journal_count,
+        }
+
+    @classmethod
+    def refresh(cls, user_id, ticker_symbol_id):
+        """Recomputes one summary row from the user's journals for the ticker (deleted when none are left)."""
+        totals = StockJournal.objects.filter(user_id=user_id, ticker_symbol_id=ticker_symbol_id).aggregate(
+            buy_qty=Coalesce(Sum('total_buy_qty'), Decimal(0)),
+            buy_amount=Coalesce(Sum('total_buy_amount'), Decimal(0)),
+            sell_qty=Coalesce(Sum('total_sell_qty'), Decimal(0)),
+            sell_amount=Coalesce(Sum('total_sell_amount'), Decimal(0)),
+            journals=models.Count('id'),
+        )
+        if not totals['journals']:
+            cls.objects.filter(user_id=user_id, ticker_symbol_id=ticker_symbol_id).delete()
+            return
+        cls.objects.update_or_create(
+            user_id=user_id,
+            ticker_symbol_id=ticker_symbol_id,
+            defaults=cls.values_from_totals(
+                totals['buy_qty'], totals['buy_amount'], totals['sell_qty'], totals['sell_amount'], totals['journals']
+            ),
+        )
+
+
 class REPropertyInfo(models.Model):
     property_info_id = models.AutoField(primary_key=True)
     property_type = models.CharField(max_length=50)
     building_name = models.CharField(max_length=255)
-    address_base = models.CharField(max_length=255)
+    address_base = models.CharField(max_length=255, db_index=True)  # 주소 자동완성 접두어 검색
     lawd_cd = models.CharField(max_length=5, blank=True, null=True)  # 법정동 코드
 
 
@@ -221,6 +393,27 @@ class REDeal(models.Model):
             models.Index(fields=['contract_date']),
         ]
 
+    def save(self, *args, **kwargs):
+        previous = None
+        if self.pk:
+            previous = REDeal.objects.filter(pk=self.pk).values('property_info_id', 'contract_date').first()
+        super().save(*args, **kwargs)
+        from dashboard.services.holdings import sync_real_estate_holdings
+        from dashboard.services.timeseries import mark_timeseries_stale
+        property_ids = {self.property_info_id}
+        if previous:
+            property_ids.add(previous['property_info_id'])
+        sync_real_estate_holdings(self.user_id, property_ids)
+        mark_timeseries_stale(self.user_id, min(self.contract_date, previous['contract_date']) if previous else self.contract_date)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        from dashboard.services.holdings import sync_real_estate_holdings
+        from dashboard.services.timeseries import mark_timeseries_stale
+        sync_real_estate_holdings(self.user_id, [self.property_info_id])
+        mark_timeseries_stale(self.user_id, self.contract_date)
+        return result
+
 
 class JournalPost(models.Model):
     class Visibility(models.TextChoices):
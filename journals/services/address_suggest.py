@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+from journals.models import REPropertyInfo
+
+__all__ = [
+    "AddressSuggester",
+    "KakaoError",
+    "address_suggester",
+    "fetch_kakao_addresses",
+    "normalize_query",
+]
+
+
+KAKAO_ADDRESS_URL = "https://dapi.kakao.com/v2/local/search/address.json"
+KAKAO_PAGE_SIZE = 10
+KAKAO_TIMEOUT_SECONDS = 5
+
+# Shortest cached query that may answer a longer one locally
+MIN_PREFIX_LENGTH = 2
+# Stored properties needed before a query is answered without Kakao
+LOCAL_MIN_RESULTS = 5
+# Sorts after any character that appears in an address, so [q, q + bound) is "starts with q"
+PREFIX_UPPER_BOUND = "\uffff"
+
+# (suggestions, complete) - complete means Kakao returned every match on one page
+Suggestions = List[Dict[str, object]]
+FetchResult = Tuple[Suggestions, bool]
+
+
+class KakaoError(Exception):
+    pass
+
+
+def normalize_query(text: str) -> str:
+    return " ".join((text or "").split())
+
+
+def _matches(query: str, address: str) -> bool:
+    """Every query token is a prefix of an address token, in order (서울 강남 -> 서울 강남구 역삼동)."""
+    tokens = address.split()
+    pos = 0
+    for part in query.split():
+        while pos < len(tokens) and not tokens[pos].startswith(part):
+            pos += 1
+        if pos == len(tokens):
+            return False
+        pos += 1
+    return True
+
+
+def fetch_kakao_addresses(query: str, api_key: str) -> FetchResult:
+    from dashboard.services.http import http_client
+
+    try:
+        resp = http_client.get(
+            KAKAO_ADDRESS_URL,
+            params={"query": query, "size": KAKAO_PAGE_SIZE},
+            headers={"Authorization": f"KakaoAK {api_key}"},
+            timeout=KAKAO_TIMEOUT_SECONDS,
+        )
+    except Exception as e:
+        raise KakaoError(f"Kakao request failed: {e}") from e
+    if resp.status_code != 200:
+        raise KakaoError(f"Kakao API error {resp.status_code}")
+
+    try:
+        data = resp.json()
+    except ValueError as e:
+        raise KakaoError(f"Kakao request failed: {e}") from e
+    suggestions = []
+    for d in data.get("documents", []):
+        addr = d.get("address") or d.get("road_address") or {}
+        road = d.get("road_address") or {}
+        suggestions.append({
+            "name": addr.get("address_name") or query,
+            "address": addr.get("address_name") or query,
+            # Kakao also matches on the road address; kept so cached results can be narrowed correctly
+            "road_address": road.get("address_name"),
+            "lat": d.get("y"),
+            "lng": d.get("x"),
+            "region_1depth_name": addr.get("region_1depth_name"),
+            "region_2depth_name": addr.get("region_2depth_name"),
+            "region_3depth_name": addr.get("region_3depth_name"),
+        })
+    return suggestions, bool((data.get("meta") or {}).get("is_end", False))
+
+
+def local_suggestions(query: str, limit: int = KAKAO_PAGE_SIZE) -> Suggestions:
+    """Addresses of stored properties starting with the query (geocoded rows only)."""
+    # A range instead of startswith: LIKE ... ESCAPE cannot use the address_base index
+    rows = (
+        REPropertyInfo.objects.filter(address_base__gte=query, address_base__lt=query + PREFIX_UPPER_BOUND)
+        .exclude(lat=0, lng=0)
+        .order_by("address_base")
+        .values_list("address_base", "lat", "lng")
+        .distinct()[:limit]
+    )
+    suggestions = []
+    for address, lat, lng in rows:
+        parts = address.split() + [None, None, None]
+        suggestions.append({
+            "name": address,
+            "address": address,
+            "lat": str(lat),
+            "lng": str(lng),
+            "region_1depth_name": parts[0],
+            "region_2depth_name": parts[1],
+            "region_3depth_name": parts[2],
+        })
+    return suggestions
+
+
+@dataclass
+class _Entry:
+    suggestions: Suggestions
+    complete: bool
+    expires_at: float
+
+
+@dataclass
+class _Call:
+    event: threading.Event = field(default_factory=threading.Event)
+    result: Optional[FetchResult] = None
+    error: Optional[Exception] = None
+
+
+class AddressSuggester:
+    """
+    Typeahead address lookup in front of the Kakao local API.
+
+    In order: LRU+TTL cache on the normalized query; a cached shorter query whose
+    result was complete, filtered locally; stored REPropertyInfo addresses; and
+    finally Kakao, with concurrent identical queries sharing one upstream call.
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        ttl: Optional[float] = None,
+        fetcher: Callable[[str, str], FetchResult] = fetch_kakao_addresses,
+        local: Callable[[str], Suggestions] = local_suggestions,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize or getattr(settings, "ADDRESS_SUGGEST_CACHE_SIZE", 2048)
+        self.ttl = ttl if ttl is not None else getattr(settings, "ADDRESS_SUGGEST_TTL_SECONDS", 24 * 3600)
+        self.fetcher = fetcher
+        self.local = local
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._inflight: Dict[str, _Call] = {}
+        self._stats = {"hits": 0, "prefix_hits": 0, "local_hits": 0, "upstream": 0, "coalesced": 0}
+
+    def _get(self, key: str, now: float) -> Optional[_Entry]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= now:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return entry
+
+    def _put(self, key: str, suggestions: Suggestions, complete: bool):
+        with self._lock:
+            self._cache[key] = _Entry(suggestions, complete, self.clock() + self.ttl)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def _cached(self, key: str) -> Optional[Suggestions]:
+        now = self.clock()
+        with self._lock:
+            entry = self._get(key, now)
+            if entry is not None:
+                self._stats["hits"] += 1
+                return entry.suggestions
+            # Longest cached prefix whose answer held every match. The parent needs at least
+            # one finished token: a bare fragment like "서울" matches too broadly upstream for
+            # its "complete" flag to vouch for the narrowed list
+            for end in range(len(key) - 1, MIN_PREFIX_LENGTH - 1, -1):
+                parent_key = key[:end]
+                if " " not in parent_key.strip():
+                    break
+                parent = self._get(parent_key, now)
+                if parent is None or not parent.complete:
+                    continue
+                narrowed = [
+                    s for s in parent.suggestions
+                    if any(_matches(key, str(s.get(field) or "")) for field in ("address", "road_address"))
+                ]
+                if narrowed:
+                    self._stats["prefix_hits"] += 1
+                    return narrowed
+                break
+        return None
+
+    def _fetch_once(self, key: str, api_key: str) -> FetchResult:
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self.fetcher(key, api_key)
+            with self._lock:
+                self._stats["upstream"] += 1
+            self._put(key, *call.result)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.event.set()
+
+    def suggest(self, query: str, api_key: str) -> Suggestions:
+        """Suggestions for `query`; raises KakaoError when the upstream call fails."""
+        key = normalize_query(query)
+        if not key:
+            return []
+
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        local = self.local(key)
+        if len(local) >= LOCAL_MIN_RESULTS or any(s["address"] == key for s in local):
+            with self._lock:
+                self._stats["local_hits"] += 1
+            return local
+
+        suggestions, _ = self._fetch_once(key, api_key)
+        return suggestions
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            data = dict(self._stats)
+            data["size"] = len(self._cache)
+            return data
+
+    def reset(self):
+        """Clears the cache and counters (for tests)."""
+        with self._lock:
+            self._cache.clear()
+            for key in self._stats:
+                self._stats[key] = 0
+
+
+address_suggester = AddressSuggester()
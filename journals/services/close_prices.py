@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Iterable, List, Optional
+
+from django.utils import timezone
+
+from journals.models import StockInfo, StockJournal
+
+__all__ = [
+    "CloseRefreshResult",
+    "referenced_tickers",
+    "refresh_close_prices",
+]
+
+
+# Calendar days looked back for the latest close (covers long holidays)
+LOOKBACK_DAYS = 14
+BULK_BATCH_SIZE = 1000
+
+
+@dataclass
+class CloseRefreshResult:
+    tickers: int = 0
+    updated: int = 0
+    missing: List[str] = field(default_factory=list)
+
+
+def referenced_tickers() -> List[str]:
+    """StockInfo tickers that some journal or dashboard holding points at."""
+    from dashboard.models import PortfolioHolding
+
+    tickers = set(StockJournal.objects.values_list("ticker_symbol_id", flat=True).distinct())
+    held = (
+        PortfolioHolding.objects.filter(asset_type="stock", stock_ticker_symbol__isnull=False)
+        .values_list("stock_ticker_symbol", flat=True)
+        .distinct()
+    )
+    tickers.update(StockInfo.objects.filter(ticker_symbol__in=list(held)).values_list("ticker_symbol", flat=True))
+    return sorted(tickers)
+
+
+def refresh_close_prices(tickers: Optional[Iterable[str]] = None, workers: int = 1,
+                         chunk_size: Optional[int] = None) -> CloseRefreshResult:
+    """
+    Writes the latest end-of-day close into StockInfo.last_close_price/_date.
+
+    Prices come from the daily price store, which only downloads the missing
+    range and batches non-KRX tickers into one yf.download per chunk; the
+    StockInfo rows are then written with a single bulk_update.
+    """
+    from dashboard.models import DailyPrice
+    from dashboard.services.payload_cache import bump_price_version
+    from dashboard.services.prices import ensure_history
+
+    tickers = sorted(set(tickers) if tickers is not None else referenced_tickers())
+    result = CloseRefreshResult(tickers=len(tickers))
+    if not tickers:
+        return result
+
+    today = timezone.localdate()
+    start = today - timedelta(days=LOOKBACK_DAYS)
+    ensure_history(tickers, start, today, workers=workers, chunk_size=chunk_size)
+
+    latest = {}
+    rows = (
+        DailyPrice.objects.filter(ticker__in=tickers, date__gte=start, date__lte=today)
+        .order_by("ticker", "date")
+        .values_list("ticker", "date", "close")
+    )
+    for ticker, day, close in rows:
+        latest[ticker] = (day, close)
+
+    now = timezone.now()
+    changed = []
+    for info in StockInfo.objects.filter(ticker_symbol__in=list(latest)):
+        day, close = latest[info.ticker_symbol]
+        info.last_close_price = close
+        info.last_close_date = day
+        info.last_close_updated_at = now
+        changed.append(info)
+    StockInfo.objects.bulk_update(
+        changed, ["last_close_price", "last_close_date", "last_close_updated_at"], batch_size=BULK_BATCH_SIZE
+    )
+    if changed:
+        bump_price_version()
+    result.updated = len(changed)
+    result.missing = [t for t in tickers if t not in latest]
+    return result
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Max
+
+from journals.models import StockInfo, StockJournal
+
+__all__ = [
+    "StockSearchIndex",
+    "chosung",
+    "get_stock_search_index",
+    "invalidate_stock_search_index",
+    "search_stocks",
+]
+
+
+# How often a process re-checks whether StockInfo / journals changed
+SIGNATURE_CHECK_SECONDS = getattr(settings, "STOCK_SEARCH_CHECK_SECONDS", 30)
+
+# Substring matches are only tried for queries at least this long
+MIN_SUBSTRING_QUERY = 2
+
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_CHOSUNG_SET = frozenset(CHOSUNG)
+_STRIP = re.compile(r"[\s\-_.,&()'/]+")
+
+
+def normalize(text: str) -> str:
+    return _STRIP.sub("", (text or "").casefold())
+
+
+def chosung(text: str) -> str:
+    """Initial consonants of Hangul syllables (삼성전자 -> ㅅㅅㅈㅈ); other characters pass through."""
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(CHOSUNG[code // 588])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def _is_chosung_query(text: str) -> bool:
+    return bool(text) and all(ch in _CHOSUNG_SET for ch in text)
+
+
+@dataclass(frozen=True)
+class _Entry:
+    ticker: str
+    name: str
+    popularity: int
+
+
+class _PrefixList:
+    """Sorted (key, entry index) pairs; a prefix lookup is two bisects."""
+
+    def __init__(self, pairs: Iterable[Tuple[str, int]]):
+        pairs = sorted(set(pairs))
+        self.keys = [key for key, _ in pairs]
+        self.ids = [idx for _, idx in pairs]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def prefix(self, text: str) -> Iterable[int]:
+        lo = bisect_left(self.keys, text)
+        hi = bisect_left(self.keys, text + "\U0010ffff", lo)
+        return self.ids[lo:hi]
+
+
+class StockSearchIndex:
+    """
+    In-memory typeahead index over StockInfo.
+
+    Tickers, normalized names and Hangul initial-consonant strings are kept in
+    sorted lists (plus every suffix for substring matches), so a lookup is a
+    couple of bisects and a scan of the matching slice. Results are ranked by
+    tier (exact ticker, ticker prefix, name prefix, chosung prefix, substring),
+    then by how many journals use the stock, then by shorter name.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[str, str, int]]):
+        # Entry ids follow the in-tier ranking, so ranking a slice is just min(ids)
+        ranked = sorted(
+            ((ticker, name or ticker, popularity or 0) for ticker, name, popularity in rows),
+            key=lambda row: (-row[2], len(row[1]), row[0]),
+        )
+        self.entries: List[_Entry] = []
+        tickers, names, initials, substrings = [], [], [], []
+        for ticker, name, popularity in ranked:
+            idx = len(self.entries)
+            self.entries.append(_Entry(ticker, name, popularity))
+            ticker_key = normalize(ticker)
+            name_key = normalize(name)
+            initial_key = chosung(name_key)
+            tickers.append((ticker_key, idx))
+            # 005930.KS is also found as 005930
+            base = ticker_key.split(".", 1)[0]
+            if base != ticker_key:
+                tickers.append((base, idx))
+            if name_key:
+                names.append((name_key, idx))
+            if initial_key != name_key:
+                initials.append((initial_key, idx))
+            for key in {ticker_key, name_key, initial_key}:
+                substrings.extend((key[i:], idx) for i in range(1, len(key) - MIN_SUBSTRING_QUERY + 1))
+        self.tickers = _PrefixList(tickers)
+        self.names = _PrefixList(names)
+        self.initials = _PrefixList(initials)
+        self.substrings = _PrefixList(substrings)
+        self._exact = {}
+        for key, idx in tickers:
+            self._exact.setdefault(key, []).append(idx)
+
+    @classmethod
+    def from_db(cls) -> "StockSearchIndex":
+        popularity = dict(
+            StockJournal.objects.order_by()
+            .values_list("ticker_symbol_id")
+            .annotate(n=Count("id"))
+        )
+        rows = StockInfo.objects.values_list("ticker_symbol", "stock_name").iterator(chunk_size=5000)
+        return cls((ticker, name, popularity.get(ticker, 0)) for ticker, name in rows)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, str]]:
+        text = normalize(query)
+        if not text:
+            return []
+
+        # Best tier first: exact ticker, ticker prefix, name prefix, chosung prefix, substring
+        tiers: List[Sequence[int]] = [
+            self._exact.get(text, ()),
+            self.tickers.prefix(text),
+            self.names.prefix(text),
+        ]
+        if _is_chosung_query(text):
+            tiers.append(self.initials.prefix(text))
+        if len(text) >= MIN_SUBSTRING_QUERY:
+            tiers.append(self.substrings.prefix(text))
+
+        seen = set()
+        results = []
+        for ids in tiers:
+            candidates = set(ids) - seen
+            results.extend(heapq.nsmallest(limit - len(results), candidates))
+            seen |= candidates
+            # Lower tiers can never outrank a full page from higher ones
+            if len(results) >= limit:
+                break
+
+        return [{"ticker": self.entries[i].ticker, "name": self.entries[i].name} for i in results]
+
+
+_lock = threading.Lock()
+_index: Optional[StockSearchIndex] = None
+_signature = None
+_checked_at = 0.0
+_rebuilding = False
+
+
+def _db_signature():
+    info = StockInfo.objects.aggregate(n=Count("ticker_symbol"), updated=Max("updated_at"))
+    # Popularity is the journal count per ticker, so new or deleted journals re-rank too
+    journals = StockJournal.objects.aggregate(n=Count("id"), last=Max("id"))
+    return info["n"], info["updated"], journals["n"], journals["last"]
+
+
+def _rebuild(signature):
+    global _index, _signature, _rebuilding
+    try:
+        index = StockSearchIndex.from_db()
+        with _lock:
+            _index, _signature = index, signature
+    except Exception as e:
+        print(f"Stock search index rebuild failed: {e}")
+    finally:
+        _rebuilding = False
+        connection.close()
+
+
+def invalidate_stock_search_index():
+    """Forces the next search in this process to rebuild (call after bulk loads)."""
+    global _index, _checked_at
+    with _lock:
+        _index = None
+        _checked_at = 0.0
+
+
+def get_stock_search_index() -> StockSearchIndex:
+    """
+    Process-wide index.
+
+    Built on first use; afterwards the StockInfo/StockJournal signature is re-checked at
+    most every SIGNATURE_CHECK_SECONDS and a changed table is re-indexed in a background
+    thread while the current index keeps serving.
+    """
+    global _index, _signature, _checked_at, _rebuilding
+    now = time.monotonic()
+    index = _index
+    if index is not None and now - _checked_at < SIGNATURE_CHECK_SECONDS:
+        return index
+    with _lock:
+        if _index is not None and now - _checked_at < SIGNATURE_CHECK_SECONDS:
+            return _index
+        signature = _db_signature()
+        _checked_at = now
+        if _index is None:
+            _index, _signature = StockSearchIndex.from_db(), signature
+        elif signature != _signature and not _rebuilding:
+            _rebuilding = True
+            threading.Thread(target=_rebuild, args=(signature,), daemon=True).start()
+        return _index
+
+
+def search_stocks(query: str, limit: int = 10) -> List[Dict[str, str]]:
+    return get_stock_search_index().search(query, limit)
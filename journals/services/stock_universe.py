@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from journals.models import StockInfo
+
+__all__ = [
+    "EnrichResult",
+    "EnrichmentCheckpoint",
+    "SyncResult",
+    "enrich_metadata",
+    "fetch_listings",
+    "fetch_yfinance_metadata",
+    "sync_universe",
+]
+
+
+DEFAULT_MARKETS = ("KOSPI", "KOSDAQ", "NASDAQ", "NYSE", "AMEX")
+
+# Listing market -> (yfinance suffix, exchange label, currency)
+MARKET_FORMATS = {
+    "KOSPI": (".KS", "KOSPI", "KRW"),
+    "KOSDAQ": (".KQ", "KOSDAQ", "KRW"),
+    "KOSDAQ GLOBAL": (".KQ", "KOSDAQ", "KRW"),
+    "NASDAQ": ("", "NASDAQ", "USD"),
+    "NYSE": ("", "NYSE", "USD"),
+    "AMEX": ("", "AMEX", "USD"),
+}
+
+BULK_BATCH_SIZE = 1000
+LISTING_FIELDS = ("stock_name", "exchange", "currency")
+
+
+@dataclass
+class SyncResult:
+    listed: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    missing: List[str] = field(default_factory=list)
+
+
+@dataclass
+class EnrichResult:
+    attempted: int = 0
+    updated: int = 0
+    failed: int = 0
+    skipped: int = 0
+
+
+def _clean(value) -> Optional[str]:
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text if text and text.lower() != "nan" else None
+
+
+def fetch_listings(markets: Sequence[str] = DEFAULT_MARKETS) -> Dict[str, Dict[str, Optional[str]]]:
+    """
+    {ticker: fields} for every listed common stock, in the ticker format the
+    rest of the app uses (005930.KS / 035720.KQ / AAPL).
+
+    `KRX` is fetched once and split by its Market column; US markets come from
+    separate listings. A market that fails to download is skipped with a message.
+    """
+    import FinanceDataReader as fdr
+
+    wanted = {m.upper() for m in markets}
+    sources = []
+    if wanted & {"KRX", "KOSPI", "KOSDAQ"}:
+        sources.append("KRX")
+    sources.extend(m for m in ("NASDAQ", "NYSE", "AMEX") if m in wanted)
+
+    listings: Dict[str, Dict[str, Optional[str]]] = {}
+    for source in sources:
+        try:
+            frame = fdr.StockListing(source)
+        except Exception as e:
+            print(f"Listing download failed ({source}): {e}")
+            continue
+        for row in frame.to_dict("records"):
+            code = _clean(row.get("Code") or row.get("Symbol"))
+            name = _clean(row.get("Name"))
+            market = (_clean(row.get("Market")) or source).upper()
+            if not code or not name or market not in MARKET_FORMATS:
+                continue
+            suffix, exchange, currency = MARKET_FORMATS[market]
+            if source == "KRX" and "KRX" not in wanted and exchange not in wanted:
+                continue
+            sector = _clean(row.get("Sector") or row.get("Industry"))
+            listings[f"{code}{suffix}".upper()] = {
+                "stock_name": name[:255],
+                "exchange": exchange,
+                "currency": currency,
+                "sector": sector[:100] if sector else None,
+            }
+    return listings
+
+
+def sync_universe(listings: Dict[str, Dict[str, Optional[str]]], dry_run: bool = False) -> SyncResult:
+    """
+    Diffs the listings against StockInfo and writes only the differences.
+
+    New tickers go through one bulk_create (update_conflicts guards a concurrent
+    insert); changed rows go through bulk_update of the listing fields. Sector is
+    only filled where it is empty so enrichment results are not overwritten.
+    Tickers no longer listed are reported, never deleted (journals reference them).
+    """
+    result = SyncResult(listed=len(listings))
+    now = timezone.now()
+    existing = {info.ticker_symbol: info for info in StockInfo.objects.all().iterator(chunk_size=5000)}
+
+    to_create, to_update = [], []
+    for ticker, fields in listings.items():
+        info = existing.get(ticker)
+        if info is None:
+            to_create.append(StockInfo(ticker_symbol=ticker, updated_at=now, **fields))
+            continue
+        changed = False
+        for name in LISTING_FIELDS:
+            if fields.get(name) and getattr(info, name) != fields[name]:
+                setattr(info, name, fields[name])
+                changed = True
+        if fields.get("sector") and not info.sector:
+            info.sector = fields["sector"]
+            changed = True
+        if changed:
+            info.updated_at = now
+            to_update.append(info)
+        else:
+            result.unchanged += 1
+
+    result.created, result.updated = len(to_create), len(to_update)
+    result.missing = sorted(set(existing) - set(listings))
+    if dry_run:
+        return result
+
+    with transaction.atomic():
+        if to_create:
+            StockInfo.objects.bulk_create(
+                to_create,
+                batch_size=BULK_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=["ticker_symbol"],
+                update_fields=[*LISTING_FIELDS, "sector", "updated_at"],
+            )
+        if to_update:
+            StockInfo.objects.bulk_update(
+                to_update, [*LISTING_FIELDS, "sector", "updated_at"], batch_size=BULK_BATCH_SIZE
+            )
+    _invalidate_search()
+    return result
+
+
+def _invalidate_search():
+    from journals.services.stock_search import invalidate_stock_search_index
+
+    invalidate_stock_search_index()
+
+
+class EnrichmentCheckpoint:
+    """
+    JSON file of tickers already processed, so an interrupted enrichment run
+    resumes where it stopped. Saved atomically after every batch.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.done = set()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as fp:
+                self.done = set(json.load(fp).get("done", []))
+
+    def mark(self, tickers: Iterable[str]):
+        self.done.update(tickers)
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fp:
+            json.dump({"done": sorted(self.done), "saved_at": timezone.now().isoformat()}, fp)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        self.done = set()
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def fetch_yfinance_metadata(ticker: str) -> Dict[str, Optional[str]]:
+    """Sector and currency from yfinance .info (one HTTP round trip per ticker)."""
+    import yfinance as yf
+
+    from dashboard.services.http import yfinance_session
+
+    info = yf.Ticker(ticker, session=yfinance_session()).info or {}
+    currency = _clean(info.get("currency"))
+    return {
+        "sector": _clean(info.get("sector")),
+        "currency": currency.upper() if currency else None,
+    }
+
+
+def enrich_metadata(
+    tickers: Optional[Sequence[str]] = None,
+    workers: int = 4,
+    batch_size: int = 200,
+    checkpoint: Optional[EnrichmentCheckpoint] = None,
+    fetcher: Callable[[str], Dict[str, Optional[str]]] = fetch_yfinance_metadata,
+    only_missing: bool = True,
+    progress: Optional[Callable[[EnrichResult], None]] = None,
+) -> EnrichResult:
+    """
+    Fills sector/currency through `fetcher` with at most `workers` requests in flight.
+
+    Tickers are processed in batches: each batch is fetched in the pool, written
+    with one bulk_update on the calling thread, then recorded in the checkpoint.
+    Failed tickers are not checkpointed, so a rerun retries them.
+    """
+    checkpoint = checkpoint or EnrichmentCheckpoint(None)
+    queryset = StockInfo.objects.order_by("ticker_symbol")
+    if tickers is not None:
+        queryset = queryset.filter(ticker_symbol__in=list(tickers))
+    if only_missing:
+        queryset = queryset.filter(Q(sector__isnull=True) | Q(sector="") | Q(currency__isnull=True))
+    pending = [t for t in queryset.values_list("ticker_symbol", flat=True) if t not in checkpoint.done]
+
+    result = EnrichResult(skipped=len(checkpoint.done))
+
+    def safe_fetch(ticker):
+        try:
+            return ticker, fetcher(ticker), None
+        except Exception as e:
+            return ticker, None, e
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            fetched = list(executor.map(safe_fetch, batch))
+            infos = StockInfo.objects.in_bulk([t for t, data, _ in fetched if data])
+            now = timezone.now()
+            changed, done = [], []
+            for ticker, data, error in fetched:
+                result.attempted += 1
+                if error is not None:
+                    result.failed += 1
+                    print(f"Metadata fetch failed ({ticker}): {error}")
+                    continue
+                done.append(ticker)
+                info = infos.get(ticker)
+                if info is None:
+                    continue
+                dirty = False
+                for name in ("sector", "currency"):
+                    value = (data.get(name) or "")[:StockInfo._meta.get_field(name).max_length]
+                    if value and getattr(info, name) != value:
+                        setattr(info, name, value)
+                        dirty = True
+                if dirty:
+                    info.updated_at = now
+                    changed.append(info)
+            if changed:
+                StockInfo.objects.bulk_update(changed, ["sector", "currency", "updated_at"])
+                result.updated += len(changed)
+            checkpoint.mark(done)
+            if progress:
+                progress(result)
+    return result
@@ -0,0 +1,370 @@
+from __future__ import annotations
+
+import csv
+import io
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from journals.models import (
+    REDeal,
+    REPropertyInfo,
+    StockInfo,
+    StockJournal,
+    StockTrade,
+)
+
+__all__ = [
+    "ImportResult",
+    "TradeImporter",
+    "open_csv_upload",
+]
+
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+# Canonical field -> accepted header names (broker exports use either language)
+FIELD_ALIASES = {
+    "asset_type": ("asset_type", "type", "자산구분"),
+    "ticker_symbol": ("ticker_symbol", "ticker", "symbol", "종목코드"),
+    "stock_name": ("stock_name", "name", "종목명"),
+    "currency": ("currency", "currency_code", "통화"),
+    "side": ("side", "구분", "매매구분"),
+    "trade_date": ("trade_date", "date", "거래일", "체결일"),
+    "price_per_share": ("price_per_share", "price", "단가", "체결가"),
+    "quantity": ("quantity", "qty", "수량"),
+    "fee_amount": ("fee_amount", "fee", "수수료"),
+    "tax_amount": ("tax_amount", "tax", "세금"),
+    "building_name": ("building_name", "건물명"),
+    "address_base": ("address_base", "address", "주소"),
+    "property_type": ("property_type", "유형"),
+    "deal_type": ("deal_type", "거래유형"),
+    "contract_date": ("contract_date", "계약일"),
+    "amount_main": ("amount_main", "amount", "거래금액"),
+    "area_m2": ("area_m2", "area", "전용면적"),
+    "floor": ("floor", "층"),
+}
+
+SIDE_ALIASES = {
+    "BUY": StockTrade.Side.BUY, "B": StockTrade.Side.BUY, "매수": StockTrade.Side.BUY,
+    "SELL": StockTrade.Side.SELL, "S": StockTrade.Side.SELL, "매도": StockTrade.Side.SELL,
+}
+
+
+class RowError(ValueError):
+    pass
+
+
+@dataclass
+class ImportResult:
+    stock_trades: int = 0
+    re_deals: int = 0
+    journals: int = 0
+    errors: List[str] = field(default_factory=list)
+    error_count: int = 0
+    # Line at which an unreadable file stopped the import (earlier rows stay imported)
+    stopped_at_line: Optional[int] = None
+
+    def add_error(self, line_no, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"line {line_no}: {message}")
+
+    @property
+    def imported(self) -> bool:
+        return bool(self.stock_trades or self.re_deals)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "stock_trades": self.stock_trades,
+            "re_deals": self.re_deals,
+            "journals": self.journals,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "stopped_at_line": self.stopped_at_line,
+        }
+
+
+def open_csv_upload(uploaded_file) -> io.TextIOBase:
+    """Wraps an uploaded (binary) file so csv can stream it without reading it whole."""
+    return io.TextIOWrapper(uploaded_file.file, encoding="utf-8-sig", newline="")
+
+
+def _decimal(value: Optional[str], label: str, required: bool = True) -> Optional[Decimal]:
+    if value in (None, ""):
+        if required:
+            raise RowError(f"{label} is required")
+        return None
+    try:
+        return Decimal(value.replace(",", ""))
+    except InvalidOperation:
+        raise RowError(f"invalid {label}: {value}")
+
+
+def _date(value: Optional[str], label: str):
+    parsed = parse_date((value or "").replace(".", "-").replace("/", "-"))
+    if parsed is None:
+        raise RowError(f"invalid {label}: {value}")
+    return parsed
+
+
+class TradeImporter:
+    """
+    Streams a broker CSV export into StockTrade / REDeal rows for one user.
+
+    Rows are parsed and written chunk by chunk with bulk_create, which skips the
+    per-row StockTrade/REDeal save() hooks; journal aggregates, holdings and the
+    timeseries watermark are brought up to date once in finish(), which also runs
+    for the chunks already committed when a later chunk fails.
+    """
+
+    def __init__(self, user, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.user = user
+        self.chunk_size = chunk_size
+        self.result = ImportResult()
+        self._stock_infos: Dict[str, StockInfo] = {}
+        self._journal_ids: Dict[str, int] = {}
+        self._properties: Dict[tuple, REPropertyInfo] = {}
+        self._touched_tickers = set()
+        self._touched_properties = set()
+        self._earliest_date = None
+        self._next_line = 2
+
+    def run(self, stream: Iterable[str]) -> ImportResult:
+        reader = csv.DictReader(stream)
+        columns = self._map_columns(reader.fieldnames or [])
+        rows = enumerate(reader, start=2)  # line 1 is the header
+        try:
+            while self.result.stopped_at_line is None:
+                chunk = self._read_chunk(rows)
+                if not chunk:
+                    break
+                self.import_chunk(
+                    [(line_no, {key: (raw.get(col) or "").strip() for key, col in columns.items()})
+                     for line_no, raw in chunk]
+                )
+        finally:
+            self.finish()
+        return self.result
+
+    def _read_chunk(self, rows):
+        """
+        Next chunk of (line_no, row) pairs. A decode/CSV error mid-file ends the
+        import there: rows read before it are still returned and imported, and the
+        first unread line is recorded so the caller can report a partial import.
+        """
+        chunk = []
+        try:
+            for item in rows:
+                chunk.append(item)
+                if len(chunk) >= self.chunk_size:
+                    break
+        except (UnicodeDecodeError, csv.Error) as e:
+            line_no = chunk[-1][0] + 1 if chunk else self._next_line
+            self.result.stopped_at_line = line_no
+            self.result.add_error(line_no, f"could not read CSV from here, rows before this line were imported: {e}")
+        if chunk:
+            self._next_line = chunk[-1][0] + 1
+        return chunk
+
+    def _map_columns(self, fieldnames) -> Dict[str, str]:
+        normalized = {name.strip().lower(): name for name in fieldnames if name}
+        columns = {}
+        for key, aliases in FIELD_ALIASES.items():
+            for alias in aliases:
+                if alias.lower() in normalized:
+                    columns[key] = normalized[alias.lower()]
+                    break
+        return columns
+
+    def import_chunk(self, rows):
+        stock_rows, re_rows = [], []
+        for line_no, row in rows:
+            try:
+                asset_type = (row.get("asset_type") or "").lower()
+                if asset_type in ("real_estate", "realestate", "부동산") or (
+                    not asset_type and not row.get("ticker_symbol") and row.get("building_name")
+                ):
+                    re_rows.append(self._parse_deal(row))
+                else:
+                    stock_rows.append(self._parse_trade(row))
+            except RowError as e:
+                self.result.add_error(line_no, str(e))
+
+        touched = (set(self._touched_tickers), set(self._touched_properties), self._earliest_date)
+        try:
+            with transaction.atomic():
+                if stock_rows:
+                    self._write_trades(stock_rows)
+                if re_rows:
+                    self._write_deals(re_rows)
+        except Exception:
+            # A rolled-back chunk leaves nothing for finish() to recompute
+            self._touched_tickers, self._touched_properties, self._earliest_date = touched
+            raise
+
+    def _parse_trade(self, row):
+        ticker = row.get("ticker_symbol")
+        if not ticker:
+            raise RowError("ticker_symbol is required")
+        side = SIDE_ALIASES.get((row.get("side") or "").upper())
+        if side is None:
+            raise RowError(f"invalid side: {row.get('side')}")
+        quantity = _decimal(row.get("quantity"), "quantity")
+        if quantity <= 0:
+            raise RowError("quantity must be positive")
+        return {
+            "ticker": ticker.upper(),
+            "stock_name": row.get("stock_name"),
+            "currency": row.get("currency") or None,
+            "side": side,
+            "trade_date": _date(row.get("trade_date"), "trade_date"),
+            "price_per_share": _decimal(row.get("price_per_share"), "price_per_share"),
+            "quantity": quantity,
+            "fee_amount": _decimal(row.get("fee_amount"), "fee_amount", required=False),
+            "tax_amount": _decimal(row.get("tax_amount"), "tax_amount", required=False),
+        }
+
+    def _parse_deal(self, row):
+        building_name = row.get("building_name")
+        address_base = row.get("address_base")
+        if not (building_name and address_base):
+            raise RowError("building_name and address_base are required")
+        floor = row.get("floor") or "0"
+        try:
+            floor = int(float(floor))
+        except ValueError:
+            raise RowError(f"invalid floor: {floor}")
+        return {
+            "building_name": building_name,
+            "address_base": address_base,
+            "property_type": row.get("property_type") or "apartment",
+            "deal_type": row.get("deal_type") or REDeal.DealType.BUY_SELL,
+            "contract_date": _date(row.get("contract_date") or row.get("trade_date"), "contract_date"),
+            "amount_main": _decimal(row.get("amount_main"), "amount_main"),
+            "area_m2": _decimal(row.get("area_m2"), "area_m2", required=False) or Decimal("0"),
+            "floor": floor,
+        }
+
+    def _track_date(self, day):
+        if self._earliest_date is None or day < self._earliest_date:
+            self._earliest_date = day
+
+    def _resolve_stock_infos(self, rows):
+        missing = {r["ticker"] for r in rows} - set(self._stock_infos)
+        if not missing:
+            return
+        found = StockInfo.objects.in_bulk(list(missing))
+        new_infos = {}
+        for row in rows:
+            ticker = row["ticker"]
+            if ticker in missing and ticker not in found and ticker not in new_infos:
+                new_infos[ticker] = StockInfo(
+                    ticker_symbol=ticker,
+                    stock_name=row["stock_name"] or ticker,
+                    currency=row["currency"],
+                )
+        if new_infos:
+            StockInfo.objects.bulk_create(list(new_infos.values()), ignore_conflicts=True)
+            found.update(StockInfo.objects.in_bulk(list(new_infos)))
+        self._stock_infos.update(found)
+
+    def _resolve_journals(self, tickers):
+        missing = set(tickers) - set(self._journal_ids)
+        if not missing:
+            return
+        # Same rule as add_stock_asset: one journal per (user, ticker), reuse the oldest
+        existing = (
+            StockJournal.objects.filter(user=self.user, ticker_symbol_id__in=missing)
+            .order_by("-created_at")
+            .values_list("ticker_symbol_id", "id")
+        )
+        self._journal_ids.update(dict(existing))
+        for ticker in sorted(missing - set(self._journal_ids)):
+            journal = StockJournal.objects.create(
+                user=self.user, ticker_symbol=self._stock_infos[ticker], target_price=0, stop_price=0
+            )
+            self._journal_ids[ticker] = journal.id
+            self.result.journals += 1
+
+    def _write_trades(self, rows):
+        self._resolve_stock_infos(rows)
+        self._resolve_journals({r["ticker"] for r in rows})
+        trades = []
+        for row in rows:
+            journal_id = self._journal_ids[row["ticker"]]
+            trades.append(StockTrade(
+                journal_id=journal_id,
+                user=self.user,
+                ticker_symbol_id=row["ticker"],
+                side=row["side"],
+                trade_date=row["trade_date"],
+                price_per_share=row["price_per_share"],
+                quantity=row["quantity"],
+                fee_amount=row["fee_amount"],
+                tax_amount=row["tax_amount"],
+            ))
+            self._touched_tickers.add(row["ticker"])
+            self._track_date(row["trade_date"])
+        StockTrade.objects.bulk_create(trades, batch_size=self.chunk_size)
+        self.result.stock_trades += len(trades)
+
+    def _resolve_properties(self, rows):
+        keys = {(r["address_base"], r["building_name"]) for r in rows} - set(self._properties)
+        if not keys:
+            return
+        candidates = REPropertyInfo.objects.filter(
+            address_base__in={k[0] for k in keys}, building_name__in={k[1] for k in keys}
+        )
+        for prop in candidates:
+            key = (prop.address_base, prop.building_name)
+            if key in keys:
+                self._properties.setdefault(key, prop)
+        for row in rows:
+            key = (row["address_base"], row["building_name"])
+            if key not in self._properties:
+                dong = "-"
+                for part in row["address_base"].split():
+                    if part.endswith(("동", "읍", "면")):
+                        dong = part
+                        break
+                self._properties[key] = REPropertyInfo.objects.create(
+                    property_type=row["property_type"], building_name=row["building_name"],
+                    address_base=row["address_base"], dong=dong, lat=0, lng=0,
+                )
+
+    def _write_deals(self, rows):
+        self._resolve_properties(rows)
+        deals = []
+        for row in rows:
+            deals.append(REDeal(
+                user=self.user,
+                property_info=self._properties[(row["address_base"], row["building_name"])],
+                deal_type=row["deal_type"],
+                contract_date=row["contract_date"],
+                amount_main=row["amount_main"],
+                area_m2=row["area_m2"],
+                floor=row["floor"],
+                snapshot_source="import",
+            ))
+            self._touched_properties.add(deals[-1].property_info_id)
+            self._track_date(row["contract_date"])
+        REDeal.objects.bulk_create(deals, batch_size=self.chunk_size)
+        self.result.re_deals += len(deals)
+
+    def finish(self):
+        """Recomputes every affected journal and holding exactly once."""
+        from dashboard.services.holdings import rebuild_stock_holdings, sync_real_estate_holdings
+        from dashboard.services.timeseries import mark_timeseries_stale
+
+        # Also runs recalculate_aggregates() once per affected journal
+        if self._touched_tickers:
+            rebuild_stock_holdings(pairs={(self.user.id, t) for t in self._touched_tickers})
+        if self._touched_properties:
+            sync_real_estate_holdings(self.user.id, self._touched_properties)
+        if self._earliest_date:
+            mark_timeseries_stale(self.user.id, self._earliest_date)
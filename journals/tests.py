@@ -1,9 +1,11 @@
 from django.test import TestCase, Client
 from decimal import Decimal
 from django.contrib.auth import get_user_model
-from .models import StockInfo, StockJournal, StockTrade, JournalPost, REDeal, REPropertyInfo
+from .models import StockInfo, StockJournal, StockTickerSummary, StockTrade, JournalPost, REDeal, REPropertyInfo
 import json
 
+from .services.stock_search import invalidate_stock_search_index
+
 # Per prompt_master.md:
 # 단위테스트:
 #  · 집계 로직(평단/손익/상태)
@@ -97,6 +99,423 @@ class StockJournalAggregationTests(TestCase):
         self.assertEqual(self.journal.status, StockJournal.Status.OPEN)
         self.assertIsNone(self.journal.realized_pnl, "PnL should be null for open journals")
 
+class StockJournalDeltaTests(TestCase):
+    AGGREGATE_FIELDS = [
+        'total_buy_qty', 'total_sell_qty', 'total_buy_amount', 'total_sell_amount',
+        'avg_buy_price', 'avg_sell_price', 'net_qty', 'realized_pnl', 'return_rate', 'status',
+    ]
+
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            my_ID='deltauser', email='delta@example.com', password='password123', nickname='delta'
+        )
+        self.stock_info = StockInfo.objects.create(ticker_symbol='AAPL', stock_name='Apple')
+        self.journal = StockJournal.objects.create(
+            user=self.user, ticker_symbol=self.stock_info, target_price=1, stop_price=1
+        )
+
+    def add_trade(self, side, price, quantity, trade_date='2025-01-01'):
+        return StockTrade.objects.create(
+            journal=self.journal, user=self.user, ticker_symbol=self.stock_info, side=side,
+            trade_date=trade_date, price_per_share=Decimal(price), quantity=Decimal(quantity)
+        )
+
+    def assertMatchesFullRecompute(self):
+        self.journal.refresh_from_db()
+        incremental = {f: getattr(self.journal, f) for f in self.AGGREGATE_FIELDS}
+        self.journal.recalculate_aggregates()
+        self.journal.refresh_from_db()
+        self.assertEqual(incremental, {f: getattr(self.journal, f) for f in self.AGGREGATE_FIELDS})
+
+    def test_insert_update_delete_match_full_recompute(self):
+        self.add_trade('BUY', '100', '10')
+        buy = self.add_trade('BUY', '130', '5', '2025-01-02')
+        sell = self.add_trade('SELL', '150', '15', '2025-01-03')
+        self.assertMatchesFullRecompute()
+        self.assertEqual(self.journal.status, StockJournal.Status.COMPLETED)
+
+        buy.quantity = Decimal('10')
+        buy.save()
+        self.assertMatchesFullRecompute()
+        self.assertEqual(self.journal.net_qty, Decimal('5'))
+
+        sell.delete()
+        self.assertMatchesFullRecompute()
+        self.assertEqual(self.journal.total_sell_qty, Decimal('0'))
+        self.assertIsNone(self.journal.realized_pnl)
+
+    def test_verify_command_repairs_drift(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        self.add_trade('BUY', '100', '10')
+        StockJournal.objects.filter(pk=self.journal.pk).update(total_buy_qty=Decimal('3'))
+
+        out = StringIO()
+        call_command('verify_journal_aggregates', fix=True, stdout=out)
+        self.assertIn('1 drifted', out.getvalue())
+        self.journal.refresh_from_db()
+        self.assertEqual(self.journal.total_buy_qty, Decimal('10'))
+
+
+class TradeImportTests(TestCase):
+    CSV = (
+        "ticker,종목명,side,date,price,qty,building_name,address,amount,area\n"
+        "AAPL,Apple,BUY,2025-01-02,100,10,,,,\n"
+        "AAPL,Apple,매도,2025.01.03,\"1,200\",4,,,,\n"
+        "005930.KS,삼성전자,BUY,2025-01-02,70000,3,,,,\n"
+        "MSFT,Microsoft,HOLD,2025-01-02,300,1,,,,\n"
+        ",,,2025-02-01,,,래미안,서울 강남구 대치동 1,1500000000,84.5\n"
+    )
+
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            my_ID='importer', email='importer@example.com', password='password123', nickname='importer'
+        )
+        StockInfo.objects.create(ticker_symbol='AAPL', stock_name='Apple Inc.', currency='USD')
+
+    def test_upload_imports_in_chunks_and_recomputes_once(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from dashboard.models import PortfolioHolding
+
+        self.client.login(my_ID='importer', password='password123')
+        upload = SimpleUploadedFile('trades.csv', self.CSV.encode('utf-8'), content_type='text/csv')
+        response = self.client.post('/api/trades/import/', {'file': upload, 'chunk_size': 2})
+
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(data['stock_trades'], 3)
+        self.assertEqual(data['re_deals'], 1)
+        self.assertEqual(data['journals'], 2)
+        self.assertEqual(data['error_count'], 1)
+        self.assertIn('line 5', data['errors'][0])
+
+        journal = StockJournal.objects.get(user=self.user, ticker_symbol_id='AAPL')
+        self.assertEqual(journal.net_qty, Decimal('6'))
+        self.assertEqual(journal.realized_pnl, Decimal('4400'))
+        self.assertEqual(StockInfo.objects.get(pk='005930.KS').stock_name, '삼성전자')
+        self.assertEqual(
+            PortfolioHolding.objects.get(user_id=self.user.id, asset_key='stock:AAPL').total_quantity,
+            Decimal('6'),
+        )
+        self.assertEqual(REDeal.objects.get(user=self.user).property_info.dong, '대치동')
+        deal = REDeal.objects.get(user=self.user)
+        self.assertEqual(
+            PortfolioHolding.objects.get(user_id=self.user.id, asset_key=f're:{deal.property_info_id}').invested_amount,
+            Decimal('1500000000'),
+        )
+
+    def test_failed_chunk_still_finishes_committed_chunks(self):
+        from io import StringIO
+        from unittest import mock
+        from dashboard.models import PortfolioHolding
+        from journals.services.trade_import import TradeImporter
+
+        importer = TradeImporter(self.user, chunk_size=1)
+        write_trades = importer._write_trades
+
+        def fail_on_samsung(rows):
+            if rows[0]['ticker'] == '005930.KS':
+                raise RuntimeError('boom')
+            write_trades(rows)
+
+        with mock.patch.object(importer, '_write_trades', side_effect=fail_on_samsung):
+            with self.assertRaises(RuntimeError):
+                importer.run(StringIO(self.CSV))
+
+        # The two AAPL chunks were committed before the failure and are fully applied
+        holding = PortfolioHolding.objects.get(user_id=self.user.id, asset_key='stock:AAPL')
+        self.assertEqual(holding.total_quantity, Decimal('6'))
+        self.assertFalse(StockTrade.objects.filter(ticker_symbol_id='005930.KS').exists())
+
+    def test_unreadable_line_reports_partial_import(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        self.client.login(my_ID='importer', password='password123')
+        header = 'ticker,side,date,price,qty\n'
+        good = ''.join(f'AAPL,BUY,2025-01-02,100,{n}\n' for n in range(1, 1001))
+        # 업로드는 블록 단위로 디코딩되므로 첫 블록 이후에 UTF-8 이 아닌 줄을 둠
+        data = (header + good).encode('utf-8') + '005930.KS,매수,2025-01-02,70000,1\n'.encode('cp949')
+        upload = SimpleUploadedFile('trades.csv', data, content_type='text/csv')
+        response = self.client.post('/api/trades/import/', {'file': upload, 'chunk_size': 100})
+
+        self.assertEqual(response.status_code, 201)
+        result = response.json()
+        self.assertIsNotNone(result['stopped_at_line'])
+        self.assertIn(f"line {result['stopped_at_line']}", result['errors'][-1])
+        # 멈춘 줄 이전 행은 모두 반영되고 그 수가 그대로 보고됨
+        self.assertEqual(result['stock_trades'], result['stopped_at_line'] - 2)
+        self.assertEqual(StockTrade.objects.filter(user=self.user).count(), result['stock_trades'])
+        self.assertFalse(StockTrade.objects.filter(ticker_symbol_id='005930.KS').exists())
+
+    def test_management_command_reads_file(self):
+        import os
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8', delete=False) as f:
+            f.write(self.CSV)
+        self.addCleanup(os.unlink, f.name)
+        out = StringIO()
+        call_command('import_trades', f.name, user='importer', chunk_size=1, stdout=out, stderr=StringIO())
+        self.assertIn('Imported 3 trades and 1 deals', out.getvalue())
+
+
+class StockTickerSummaryTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            my_ID='summaryuser', email='summary@example.com', password='password123', nickname='summary'
+        )
+        self.samsung = StockInfo.objects.create(ticker_symbol='005930.KS', stock_name='삼성전자')
+        self.apple = StockInfo.objects.create(ticker_symbol='AAPL', stock_name='Apple')
+
+    def journal(self, stock):
+        return StockJournal.objects.create(user=self.user, ticker_symbol=stock, target_price=1, stop_price=1)
+
+    def trade(self, journal, side, price, qty):
+        return StockTrade.objects.create(
+            journal=journal, user=self.user, ticker_symbol=journal.ticker_symbol, side=side,
+            trade_date='2025-01-01', price_per_share=Decimal(price), quantity=Decimal(qty),
+        )
+
+    def test_summary_follows_trades_across_journals(self):
+        first, second = self.journal(self.samsung), self.journal(self.samsung)
+        self.trade(first, StockTrade.Side.BUY, '100', '10')
+        self.trade(second, StockTrade.Side.BUY, '130', '10')
+        sell = self.trade(first, StockTrade.Side.SELL, '150', '5')
+
+        summary = StockTickerSummary.objects.get(user=self.user, ticker_symbol=self.samsung)
+        self.assertEqual(summary.journal_count, 2)
+        self.assertEqual(summary.avg_buy_price, Decimal('115'))
+        self.assertEqual(summary.realized_pnl, Decimal('175'))
+        self.assertEqual(summary.return_rate.quantize(Decimal('0.01')), Decimal('30.43'))
+
+        sell.delete()
+        summary.refresh_from_db()
+        self.assertIsNone(summary.realized_pnl)
+
+        first.delete()
+        second.delete()
+        self.assertFalse(StockTickerSummary.objects.filter(user=self.user).exists())
+
+    def test_list_view_reads_summaries(self):
+        self.trade(self.journal(self.apple), StockTrade.Side.BUY, '10', '1')
+        self.trade(self.journal(self.samsung), StockTrade.Side.BUY, '70000', '1')
+        self.client.force_login(self.user)
+
+        response = self.client.get('/journals/my-list/')
+        self.assertEqual([s.ticker_symbol_id for s in response.context['stock_summaries']], ['AAPL', '005930.KS'])
+        response = self.client.get('/journals/my-list/', {'q': '삼성'})
+        self.assertEqual([s.ticker_symbol_id for s in response.context['stock_summaries']], ['005930.KS'])
+        self.assertContains(response, '70000.00')
+
+    def test_rebuild_command_restores_rows(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        self.trade(self.journal(self.apple), StockTrade.Side.BUY, '10', '2')
+        StockTickerSummary.objects.all().delete()
+        call_command('rebuild_ticker_summaries', stdout=StringIO())
+        self.assertEqual(StockTickerSummary.objects.get(ticker_symbol=self.apple).total_buy_qty, Decimal('2'))
+
+
+class StockSearchTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        user = User.objects.create_user(
+            my_ID='searcher', email='searcher@example.com', password='password123', nickname='searcher'
+        )
+        for ticker, name in [
+            ('005930.KS', '삼성전자'), ('006400.KS', '삼성SDI'), ('028260.KS', '삼성물산'),
+            ('066570.KS', 'LG전자'), ('AAPL', 'Apple Inc.'), ('APP', 'AppLovin Corp'), ('A', 'Agilent Technologies'),
+        ]:
+            StockInfo.objects.create(ticker_symbol=ticker, stock_name=name)
+        # 일지가 많은 종목이 같은 매칭 등급에서 먼저
+        for _ in range(3):
+            StockJournal.objects.create(user=user, ticker_symbol_id='028260.KS', target_price=0, stop_price=0)
+        invalidate_stock_search_index()
+        self.addCleanup(invalidate_stock_search_index)
+
+    def search(self, q):
+        response = self.client.get('/api/stock/search/', {'q': q})
+        self.assertEqual(response.status_code, 200)
+        return [r['ticker'] for r in response.json()['results']]
+
+    def test_ranking_exact_ticker_then_prefix(self):
+        self.assertEqual(self.search('a')[:3], ['A', 'AAPL', 'APP'])
+        self.assertEqual(self.search('app')[:2], ['APP', 'AAPL'])
+        self.assertEqual(self.search('005930'), ['005930.KS'])
+
+    def test_korean_name_prefix_substring_and_chosung(self):
+        self.assertEqual(self.search('삼성'), ['028260.KS', '005930.KS', '006400.KS'])
+        self.assertEqual(self.search('전자'), ['005930.KS', '066570.KS'])
+        self.assertEqual(self.search('ㅅㅅㅈㅈ'), ['005930.KS'])
+        self.assertEqual(self.search('ㅈㅈ'), ['005930.KS', '066570.KS'])
+        self.assertEqual(self.search('apple inc'), ['AAPL'])
+
+    def test_index_picks_up_new_rows_after_invalidation(self):
+        self.assertEqual(self.search('카카오'), [])
+        StockInfo.objects.create(ticker_symbol='035720.KS', stock_name='카카오')
+        invalidate_stock_search_index()
+        self.assertEqual(self.search('ㅋㅋㅇ'), ['035720.KS'])
+
+    def test_signature_tracks_journal_popularity(self):
+        from .services.stock_search import _db_signature
+
+        before = _db_signature()
+        journal = StockJournal.objects.create(
+            user=StockJournal.objects.first().user, ticker_symbol_id='005930.KS', target_price=0, stop_price=0
+        )
+        self.assertNotEqual(_db_signature(), before)
+        journal.delete()
+        self.assertEqual(_db_signature(), before)
+
+
+class StockUniverseTests(TestCase):
+    def setUp(self):
+        StockInfo.objects.create(ticker_symbol='005930.KS', stock_name='Samsung Electronics', currency='KRW')
+        StockInfo.objects.create(ticker_symbol='OLD', stock_name='Delisted Corp', currency='USD')
+
+    def listing_frames(self, market):
+        import pandas as pd
+        if market == 'KRX':
+            return pd.DataFrame([
+                {'Code': '005930', 'Name': '삼성전자', 'Market': 'KOSPI'},
+                {'Code': '035720', 'Name': '카카오', 'Market': 'KOSPI'},
+                {'Code': '247540', 'Name': '에코프로비엠', 'Market': 'KOSDAQ'},
+                {'Code': '123456', 'Name': '코넥스종목', 'Market': 'KONEX'},
+            ])
+        return pd.DataFrame([{'Symbol': 'AAPL', 'Name': 'Apple Inc', 'Industry': '하드웨어'}])
+
+    def test_sync_bulk_upserts_listing_diff(self):
+        from unittest import mock
+        from .services.stock_universe import fetch_listings, sync_universe
+
+        with mock.patch('FinanceDataReader.StockListing', side_effect=self.listing_frames):
+            listings = fetch_listings(['KOSPI', 'KOSDAQ', 'NASDAQ'])
+        self.assertEqual(set(listings), {'005930.KS', '035720.KS', '247540.KQ', 'AAPL'})
+
+        result = sync_universe(listings)
+        self.assertEqual((result.created, result.updated, result.unchanged), (3, 1, 0))
+        self.assertEqual(result.missing, ['OLD'])
+        samsung = StockInfo.objects.get(pk='005930.KS')
+        self.assertEqual((samsung.stock_name, samsung.exchange), ('삼성전자', 'KOSPI'))
+        self.assertEqual(StockInfo.objects.get(pk='AAPL').sector, '하드웨어')
+        self.assertTrue(StockInfo.objects.filter(pk='OLD').exists())
+
+        again = sync_universe(listings)
+        self.assertEqual((again.created, again.updated, again.unchanged), (0, 0, 4))
+
+    def test_enrichment_resumes_from_checkpoint(self):
+        import os
+        import tempfile
+        from .services.stock_universe import EnrichmentCheckpoint, enrich_metadata
+
+        for ticker in ['A1', 'A2', 'A3', 'A4']:
+            StockInfo.objects.create(ticker_symbol=ticker, stock_name=ticker)
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        path = os.path.join(tmpdir.name, 'checkpoint.json')
+        calls = []
+
+        def flaky(ticker):
+            calls.append(ticker)
+            if ticker == 'A3':
+                raise RuntimeError('rate limited')
+            return {'sector': 'Tech', 'currency': 'USD'}
+
+        first = enrich_metadata(workers=2, batch_size=2, checkpoint=EnrichmentCheckpoint(path), fetcher=flaky)
+        self.assertEqual((first.updated, first.failed), (5, 1))
+        self.assertEqual(StockInfo.objects.get(pk='A1').sector, 'Tech')
+
+        calls.clear()
+        second = enrich_metadata(
+            workers=2, batch_size=2, checkpoint=EnrichmentCheckpoint(path),
+            fetcher=lambda t: {'sector': 'Retry', 'currency': 'USD'}, only_missing=False,
+        )
+        # 체크포인트에 없는 실패 종목만 다시 조회
+        self.assertEqual(second.attempted, 1)
+        self.assertEqual(StockInfo.objects.get(pk='A3').sector, 'Retry')
+
+
+class AddressSuggestTests(TestCase):
+    def setUp(self):
+        from .services.address_suggest import AddressSuggester
+
+        self.calls = []
+
+        def fetcher(query, api_key):
+            self.calls.append(query)
+            docs = [
+                {'address': '서울 강남구 역삼동', 'lat': '37.5', 'lng': '127.0'},
+                {'address': '서울 강남구 삼성동', 'lat': '37.5', 'lng': '127.1'},
+                {'address': '서울 강동구 천호동', 'road_address': '서울 강동구 천호대로 1', 'lat': '37.5', 'lng': '127.2'},
+            ]
+            return [dict(d, name=d['address']) for d in docs], True
+
+        self.suggester = AddressSuggester(fetcher=fetcher)
+
+    def addresses(self, query):
+        return [s['address'] for s in self.suggester.suggest(query, 'key')]
+
+    def test_cache_and_prefix_reuse_skip_upstream(self):
+        self.assertEqual(len(self.addresses('서울  강')), 3)
+        self.assertEqual(len(self.addresses('서울 강')), 3)
+        # 완결된 "서울 강" 결과를 좁혀서 응답
+        self.assertEqual(self.addresses('서울 강남구'), ['서울 강남구 역삼동', '서울 강남구 삼성동'])
+        self.assertEqual(self.calls, ['서울 강'])
+        stats = self.suggester.stats()
+        self.assertEqual((stats['hits'], stats['prefix_hits'], stats['upstream']), (1, 1, 1))
+
+    def test_prefix_reuse_matches_road_address_and_needs_a_full_token(self):
+        self.addresses('서울 강')
+        # 지번 주소가 아니라 도로명 주소로 매칭되는 결과도 유지
+        self.assertEqual(self.addresses('서울 강동구 천호대로'), ['서울 강동구 천호동'])
+        self.assertEqual(self.calls, ['서울 강'])
+
+        # 토큰이 하나뿐인 캐시 결과로는 좁히지 않고 업스트림 조회
+        self.suggester.reset()
+        self.addresses('서울')
+        self.addresses('서울 강남구')
+        self.assertEqual(self.calls, ['서울 강', '서울', '서울 강남구'])
+
+    def test_stored_property_address_answers_locally(self):
+        REPropertyInfo.objects.create(
+            property_type='아파트', building_name='래미안', address_base='서울 서초구 반포동 1',
+            dong='반포동', lat=Decimal('37.5'), lng=Decimal('127.0'),
+        )
+        suggestions = self.suggester.suggest('서울 서초구 반포동 1', 'key')
+        self.assertEqual(suggestions[0]['region_2depth_name'], '서초구')
+        self.assertEqual(self.calls, [])
+
+    def test_concurrent_identical_queries_share_one_call(self):
+        import threading
+        from .services.address_suggest import AddressSuggester
+
+        release = threading.Event()
+
+        def slow(query, api_key):
+            self.calls.append(query)
+            release.wait(5)
+            return [{'address': '부산 해운대구', 'name': '부산 해운대구'}], False
+
+        suggester = AddressSuggester(fetcher=slow, local=lambda q: [])
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(suggester.suggest('부산', 'key'))) for _ in range(4)]
+        for t in threads:
+            t.start()
+        while not self.calls:
+            pass
+        release.set()
+        for t in threads:
+            t.join()
+        self.assertEqual(self.calls, ['부산'])
+        self.assertEqual(len(results), 4)
+
+
 class JournalAPITests(TestCase):
     def setUp(self):
         User = get_user_model()
@@ -11,15 +11,20 @@ from django.db.models.functions import Coalesce
 from decimal import Decimal
 
 from decouple import config
+import csv
 import json
-import requests
 import yfinance as yf
 
 from .models import (
-    StockInfo, StockJournal, StockTrade,
+    StockInfo, StockJournal, StockTickerSummary, StockTrade,
     REPropertyInfo, REDeal, JournalPost
 )
 from home.models import Post
+from dashboard.services.http import yfinance_session
+from dashboard.services.prices import get_recent_bars, period_to_days
+from .services.address_suggest import KakaoError, address_suggester
+from .services.stock_search import search_stocks
+from .services.trade_import import DEFAULT_CHUNK_SIZE, TradeImporter, open_csv_upload
 
 
 # Page Views
@@ -43,80 +48,10 @@ def compose(request):
 def my_journal_list(request):
     query = request.GET.get('q', '').strip()
 
-    # Aggregate StockJournal data by ticker_symbol for the current user
-    # This will give us one entry per unique stock ticker
-    stock_summaries = StockJournal.objects.filter(user=request.user) \
-        .values('ticker_symbol__ticker_symbol', 'ticker_symbol__stock_name') \
-        .annotate(
-            # Sum up quantities and PnL from all journals for this ticker
-            total_buy_qty_sum=Coalesce(Sum('total_buy_qty'), Decimal(0)),
-            total_sell_qty_sum=Coalesce(Sum('total_sell_qty'), Decimal(0)),
-            realized_pnl_sum=Coalesce(Sum('realized_pnl', filter=Q(realized_pnl__isnull=False)), Decimal(0)),
-
-            # Calculate total value of buys and sells across all journals for this ticker
-            # Need to be careful with avg_buy_price * total_buy_qty as avg_buy_price can be None
-            total_buy_value_sum=Coalesce(Sum(ExpressionWrapper(
-                F('avg_buy_price') * F('total_buy_qty'),
-                output_field=DecimalField()
-            ), filter=Q(avg_buy_price__isnull=False)), Decimal(0)),
-            total_sell_value_sum=Coalesce(Sum(ExpressionWrapper(
-                F('avg_sell_price') * F('total_sell_qty'),
-                output_field=DecimalField()
-            ), filter=Q(avg_sell_price__isnull=False)), Decimal(0)),
-        ) \
-        .annotate(
-            # Calculate overall average buy/sell prices
-            overall_avg_buy_price=Case(
-                When(total_buy_qty_sum__gt=0, then=ExpressionWrapper(
-                    F('total_buy_value_sum') / F('total_buy_qty_sum'),
-                    output_field=DecimalField()
-                )),
-                default=Value(None, output_field=DecimalField()),
-                output_field=DecimalField()
-            ),
-            overall_avg_sell_price=Case(
-                When(total_sell_qty_sum__gt=0, then=ExpressionWrapper(
-                    F('total_sell_value_sum') / F('total_sell_qty_sum'),
-                    output_field=DecimalField()
-                )),
-                default=Value(None, output_field=DecimalField()),
-                output_field=DecimalField()
-            ),
-        ) \
-        .annotate(
-            # Calculate cost basis of sold shares
-            cost_of_sold_shares=Case(
-                When(total_sell_qty_sum__gt=0, overall_avg_buy_price__isnull=False, then=ExpressionWrapper(
-                    F('overall_avg_buy_price') * F('total_sell_qty_sum'),
-                    output_field=DecimalField()
-                )),
-                default=Value(None, output_field=DecimalField()),
-                output_field=DecimalField()
-            )
-        ) \
-        .annotate(
-            # Calculate realized PnL directly: total_sell_value - cost_of_sold_shares
-            calculated_realized_pnl=Case(
-                When(total_sell_qty_sum__gt=0, cost_of_sold_shares__isnull=False, then=ExpressionWrapper(
-                    F('total_sell_value_sum') - F('cost_of_sold_shares'),
-                    output_field=DecimalField()
-                )),
-                default=Value(None, output_field=DecimalField()),
-                output_field=DecimalField()
-            )
-        ) \
-        .annotate(
-            # Calculate overall return rate using directly calculated PnL
-            overall_return_rate=Case(
-                When(cost_of_sold_shares__gt=0, calculated_realized_pnl__isnull=False, then=ExpressionWrapper(
-                    (F('calculated_realized_pnl') / F('cost_of_sold_shares')) * 100,
-                    output_field=DecimalField()
-                )),
-                default=Value(None, output_field=DecimalField()),
-                output_field=DecimalField()
-            )
-        ) \
-        .order_by('ticker_symbol__stock_name') # Order by stock name for consistency
+    # One precomputed row per ticker (StockTickerSummary is kept in step with the journals)
+    stock_summaries = StockTickerSummary.objects.filter(user=request.user) \
+        .select_related('ticker_symbol') \
+        .order_by('ticker_symbol__stock_name')
 
     # Filter stock_summaries if query is present
     if query:
@@ -180,7 +115,7 @@ def stock_detail_view(request, pk):
     ticker_symbol = stock_journal.ticker_symbol.ticker_symbol
     related_posts_raw = Post.objects.filter(
         user=request.user,
-        embed_payload_json__ticker_symbol=ticker_symbol
+        ticker_symbol=ticker_symbol
     ).order_by('-created_at')
 
     # 필요한 정보만 추출해서 간단한 딕셔너리 리스트로 변환
@@ -299,10 +234,15 @@ def stock_summary_detail(request, ticker_symbol):
     if avg_buy_price is not None and net_qty and net_qty > 0:
         principal = avg_buy_price * net_qty
 
-    # Try to use last_close_price from StockInfo as a quick current price
+    # Close price written by the update_close_prices job; a stale value is not used for valuation
     current_price = None
-    if stock_journals.first():
-        current_price = stock_journals.first().ticker_symbol.last_close_price
+    price_as_of = None
+    price_is_stale = True
+    stock_info = StockInfo.objects.filter(ticker_symbol=ticker_symbol).first()
+    if stock_info:
+        current_price = stock_info.fresh_close_price()
+        price_as_of = stock_info.last_close_date
+        price_is_stale = stock_info.is_close_price_stale
 
     current_value = None
     if current_price is not None and net_qty and net_qty > 0:
@@ -316,10 +256,10 @@ def stock_summary_detail(request, ticker_symbol):
             return_rate = None
 
     # 해당 종목과 관련된 포스트들을 가져오기
-    # embed_payload_json에서 ticker_symbol이 일치하는 포스트들을 찾음
+    # Post.ticker_symbol (embed_payload_json에서 저장 시 채움, 인덱스) 으로 조회
     posts = Post.objects.filter(
         user=request.user,
-        embed_payload_json__ticker_symbol=ticker_symbol
+        ticker_symbol=ticker_symbol
     ).order_by('-created_at')
 
     # 필터 적용
@@ -356,6 +296,8 @@ def stock_summary_detail(request, ticker_symbol):
             'net_qty': net_qty,
             'principal': principal,
             'current_price': current_price,
+            'price_as_of': price_as_of,
+            'price_is_stale': price_is_stale,
             'current_value': current_value,
             'return_rate': return_rate,
             'total_buy_amount': agg.get('total_buy_value_sum') or Decimal(0),
@@ -397,7 +339,7 @@ def realty_detail(request, pk):
 def stock_search_api(request):
     """
     GET /api/stock/search/?q=...
-    Searches for stocks by ticker or name from the local DB.
+    Searches for stocks by ticker, name or Hangul initials (e.g. ㅅㅅㅈㅈ) from the local index.
     This is optimized for speed and does not fetch real-time data.
     """
     query = request.GET.get('q', '').strip()
@@ -405,16 +347,8 @@ def stock_search_api(request):
     if not query or len(query) < 1:
         return JsonResponse({'results': []})
 
-    # Search in both ticker and name, case-insensitive, from our local database
-    stocks = StockInfo.objects.filter(
-        Q(ticker_symbol__icontains=query) | Q(stock_name__icontains=query)
-    ).values('ticker_symbol', 'stock_name')[:10]  # Limit to 10 results
-
-    # Format the results to match the frontend expectation ('ticker' and 'name')
-    results = [
-        {'ticker': stock['ticker_symbol'], 'name': stock['stock_name']}
-        for stock in stocks
-    ]
+    # In-memory prefix/substring index (ticker, name, chosung), ranked by match type and popularity
+    results = search_stocks(query, limit=10)
 
     return JsonResponse({'results': results})
 
@@ -446,29 +380,18 @@ def stock_card_details_api(request, ticker):
         return JsonResponse({'error': 'Ticker symbol is required.'}, status=400)
 
     try:
-        t = yf.Ticker(ticker)
-
-        # Using 'fast_info' is quicker than history for current price
-        info = t.fast_info
-        last_close = info.get('lastPrice')
-        prev_close = info.get('previousPrice') # Corrected: 'previousClose' to 'previousPrice'
-        stock_name = info.get('longName', ticker.upper())
-
-        if last_close is None or prev_close is None:
-            # Fallback to history if fast_info is not enough
-            hist_2d = t.history(period="2d")
-            if hist_2d.empty:
-                return JsonResponse({'error': 'No market data available.'}, status=404)
-            last_close = float(hist_2d['Close'].iloc[-1])
-            prev_close = float(hist_2d['Close'].iloc[-2]) if len(hist_2d) > 1 else last_close
+        # 로컬 일봉 저장소에서 최근 30일 (없는 구간만 업스트림 조회)
+        bars = get_recent_bars(ticker, period_to_days('30d'))
+        if not bars:
+            return JsonResponse({'error': 'No market data available.'}, status=404)
 
+        last_close = float(bars[-1].close)
+        prev_close = float(bars[-2].close) if len(bars) > 1 else last_close
         change_pct = ((last_close - prev_close) / prev_close * 100.0) if prev_close else 0.0
+        sparkline_data = [float(bar.close) for bar in bars]
 
-        # Get 30 days of history for the sparkline
-        hist_30d = t.history(period="30d")
-        sparkline_data = []
-        if not hist_30d.empty:
-            sparkline_data = hist_30d['Close'].tolist()
+        stock_info = StockInfo.objects.filter(ticker_symbol=ticker).only('stock_name').first()
+        stock_name = stock_info.stock_name if stock_info else ticker.upper()
 
         # 로고 URL을 기본값으로 설정 (외부 서비스 의존성 제거)
         logo_url = "/static/icon/journal.svg"  # 기본 아이콘 사용
@@ -494,13 +417,12 @@ def stock_quote_api(request):
         return JsonResponse({'error': 'Ticker symbol is required.'}, status=400)
 
     try:
-        t = yf.Ticker(ticker)
-        hist = t.history(period="2d")
-        if hist is None or hist.empty:
+        bars = get_recent_bars(ticker, period_to_days('2d'))
+        if not bars:
             return JsonResponse({'error': 'No market data available.'}, status=404)
 
-        last_close = float(hist['Close'].iloc[-1])
-        prev_close = float(hist['Close'].iloc[-2]) if len(hist) > 1 else last_close
+        last_close = float(bars[-1].close)
+        prev_close = float(bars[-2].close) if len(bars) > 1 else last_close
         change_pct = ((last_close - prev_close) / prev_close * 100.0) if prev_close else 0.0
 
         return JsonResponse({
@@ -523,20 +445,15 @@ def stock_history_api(request, ticker):
         return JsonResponse({'error': 'Ticker symbol is required.'}, status=400)
 
     try:
-        t = yf.Ticker(ticker)
-        # Get 1 year of daily data
-        hist = t.history(period="1y")
-        if hist.empty:
+        bars = get_recent_bars(ticker, period_to_days('1y'))
+        if not bars:
             return JsonResponse({'error': 'No historical data available.'}, status=404)
 
         # Format data for charting libraries
-        # Reset index to make 'Date' a column
-        hist = hist.reset_index()
-        # Ensure Date is in string format
-        hist['Date'] = hist['Date'].dt.strftime('%Y-%m-%d')
-
-        # Select only Date and Close columns
-        chart_data = hist[['Date', 'Close']].to_dict(orient='records')
+        chart_data = [
+            {'Date': bar.date.strftime('%Y-%m-%d'), 'Close': float(bar.close)}
+            for bar in bars
+        ]
 
         return JsonResponse({'ticker': ticker.upper(), 'history': chart_data})
     except Exception as e:
@@ -731,6 +648,32 @@ def add_stock_trade_api(request, journal_id):
     }, status=201)
 
 
+@login_required
+@require_http_methods(["POST"])
+def trade_import_api(request):
+    """
+    POST /api/trades/import/ (multipart, field "file")
+    Imports a broker CSV export of stock trades and real estate deals in chunks.
+    """
+    upload = request.FILES.get('file')
+    if not upload:
+        return JsonResponse({'error': 'CSV file is required.'}, status=400)
+
+    try:
+        chunk_size = int(request.POST.get('chunk_size') or DEFAULT_CHUNK_SIZE)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid chunk_size.'}, status=400)
+
+    try:
+        result = TradeImporter(request.user, chunk_size=max(1, chunk_size)).run(open_csv_upload(upload))
+    except (UnicodeDecodeError, csv.Error) as e:
+        return JsonResponse({'error': f'Could not read CSV: {e}'}, status=400)
+
+    # Rows before a mid-file read error are already committed, so a partial import is still 201
+    # (stopped_at_line tells the client where to resume instead of re-uploading everything)
+    return JsonResponse(result.as_dict(), status=201 if result.imported else 400)
+
+
 @require_http_methods(["GET"])
 def realty_suggest_api(request):
     """
@@ -744,31 +687,10 @@ def realty_suggest_api(request):
         return JsonResponse({'error': 'Kakao REST key not configured.'}, status=500)
 
     try:
-        resp = requests.get(
-            'https://dapi.kakao.com/v2/local/search/address.json',
-            params={'query': address},
-            headers={'Authorization': f'KakaoAK {kakao_key}'},
-            timeout=5
-        )
-        if resp.status_code != 200:
-            return JsonResponse({'error': f'Kakao API error {resp.status_code}'}, status=502)
-        data = resp.json()
-        docs = data.get('documents', [])
-        suggestions = []
-        for d in docs:
-            addr = d.get('address') or d.get('road_address') or {}
-            suggestions.append({
-                'name': addr.get('address_name') or address,
-                'address': addr.get('address_name') or address,
-                'lat': d.get('y'),
-                'lng': d.get('x'),
-                'region_1depth_name': addr.get('region_1depth_name'),
-                'region_2depth_name': addr.get('region_2depth_name'),
-                'region_3depth_name': addr.get('region_3depth_name'),
-            })
-        return JsonResponse({'suggestions': suggestions})
-    except Exception as e:
-        return JsonResponse({'error': f'Kakao request failed: {e}'}, status=502)
+        suggestions = address_suggester.suggest(address, kakao_key)
+    except KakaoError as e:
+        return JsonResponse({'error': str(e)}, status=502)
+    return JsonResponse({'suggestions': suggestions})
 
 
 @login_required
@@ -973,7 +895,7 @@ def posts_api(request):
     current_prices = {}
     if tickers_to_fetch:
         try:
-            ticker_data = yf.Tickers(' '.join(tickers_to_fetch))
+            ticker_data = yf.Tickers(' '.join(tickers_to_fetch), session=yfinance_session())
             for ticker_str, ticker_obj in ticker_data.tickers.items():
                 last_price = ticker_obj.fast_info.get('lastPrice') # Corrected: 'info.get' to 'ticker_obj.fast_info.get'
                 if last_price:
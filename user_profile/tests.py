@@ -1,3 +1,36 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from home.models import Like, Post
+
+
+class ProfilePostListTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            my_ID='profileuser', email='profile@example.com', password='password123', nickname='profile'
+        )
+        self.posts = [
+            Post.objects.create(user=self.user, content=f'post {i}', embed_payload_json={})
+            for i in range(25)
+        ]
+        for post in self.posts[:22]:
+            Like.objects.create(journal=post, user=self.user)
+        self.client.login(my_ID='profileuser', password='password123')
+
+    def test_liked_posts_are_paged_by_cursor(self):
+        response = self.client.get(reverse('user_profile:liked_posts'))
+        first_page = response.context['posts']
+        self.assertEqual(len(first_page), 20)
+        self.assertEqual(first_page[0].likes_count, 1)
+
+        response = self.client.get(reverse('user_profile:liked_posts'), {'cursor': response.context['next_cursor']})
+        self.assertEqual(len(response.context['posts']), 2)
+        self.assertIsNone(response.context['next_cursor'])
+
+    def test_my_posts_first_page(self):
+        response = self.client.get(reverse('user_profile:my_posts'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['posts'][0].id, self.posts[-1].id)
+        self.assertIsNotNone(response.context['next_cursor'])
@@ -8,7 +8,9 @@ from journals.models import StockInfo, StockJournal, StockTrade, REDeal, REPrope
 from decimal import Decimal
 from django.http import JsonResponse
 import json
+from django.db.models import Exists, OuterRef
 from home.models import Post, Like, Bookmark
+from home.services.feed import InvalidCursor, feed_queryset, paginate_by_cursor
 
 # 프로필 보기 페이지
 @login_required
@@ -181,49 +183,51 @@ def user_likes_view(request):
             #   }
               return render(request, 'user_profile/user_likes.html')
 
+# 프로필 게시물 목록 한 페이지 크기
+POSTS_PAGE_SIZE = 20
+
+
+def _render_post_list(request, queryset, template_name, title):
+    """커서 기반으로 한 페이지만 조회해서 게시물 목록 렌더링"""
+    try:
+        posts, next_cursor = paginate_by_cursor(
+            feed_queryset(request.user, queryset), request.GET.get('cursor'), POSTS_PAGE_SIZE
+        )
+    except InvalidCursor:
+        posts, next_cursor = paginate_by_cursor(feed_queryset(request.user, queryset), None, POSTS_PAGE_SIZE)
+
+    context = {
+        'posts': posts,
+        'next_cursor': next_cursor,
+        'title': title,
+        'user_to_view': request.user
+    }
+    return render(request, template_name, context)
+
 @login_required
 def my_posts_view(request):
     """
     사용자가 작성한 게시물 목록 뷰
     """
-    user = request.user
-    my_posts = Post.objects.filter(user=user).order_by('-created_at')
-    
-    context = {
-        'posts': my_posts,
-        'title': '내가 작성한 게시물',
-        'user_to_view': user
-    }
-    return render(request, 'user_profile/my_posts.html', context)
+    my_posts = Post.objects.filter(user=request.user)
+    return _render_post_list(request, my_posts, 'user_profile/my_posts.html', '내가 작성한 게시물')
 
 @login_required
 def liked_posts_view(request):
     """
     사용자가 좋아요를 누른 게시물 목록 뷰
     """
-    user = request.user
-    liked_posts_ids = Like.objects.filter(user=user).values_list('journal_id', flat=True)
-    liked_posts = Post.objects.filter(id__in=liked_posts_ids).order_by('-created_at')
-    
-    context = {
-        'posts': liked_posts,
-        'title': '좋아요 누른 게시물',
-        'user_to_view': user
-    }
-    return render(request, 'user_profile/liked_posts.html', context)
+    liked_posts = Post.objects.filter(
+        Exists(Like.objects.filter(user=request.user, journal=OuterRef('pk')))
+    )
+    return _render_post_list(request, liked_posts, 'user_profile/liked_posts.html', '좋아요 누른 게시물')
 
 @login_required
 def bookmarked_posts_view(request):
     """
     사용자가 북마크한 게시물 목록 뷰
     """
-    user = request.user
-    bookmarked_posts_ids = Bookmark.objects.filter(user=user).values_list('journal_id', flat=True)
-    bookmarked_posts = Post.objects.filter(id__in=bookmarked_posts_ids).order_by('-created_at')
-    
-    context = {
-        'posts': bookmarked_posts,
-        'title': '북마크한 게시물',
-        'user_to_view': user
-    }
-    return render(request, 'user_profile/bookmarked_posts.html', context)
\ No newline at end of file
+    bookmarked_posts = Post.objects.filter(
+        Exists(Bookmark.objects.filter(user=request.user, journal=OuterRef('pk')))
+    )
+    return _render_post_list(request, bookmarked_posts, 'user_profile/bookmarked_posts.html', '북마크한 게시물')